@@ -0,0 +1,223 @@
+"""Headless orchestrator API: one event loop, shared clients, many concurrent requests.
+
+Run with ``python api.py`` (or ``uvicorn api:app``); the Streamlit UI in
+``app.py`` is a thin client of this service.
+
+    POST /invoke    {"tenant_id": "acme", "user_input": "..."} -> result + trace
+                    (429 with Retry-After when the tenant is over its admission limits)
+    POST /invoke/stream  same body; NDJSON tool events as they arrive, then the result
+    GET  /tenants   configured tenant ids
+    GET  /health    liveness plus catalog and cache stats
+    GET  /metrics   Prometheus text format (latency histograms, counters, cache stats)
+"""
+from __future__ import annotations
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import os
+from dataclasses import asdict
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import uvicorn
+from dotenv import load_dotenv
+from openai import AsyncOpenAI
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+from host.admission import DEFAULT_MAX_CONCURRENT, AdmissionController, AdmissionRejected
+from host.fast_router import FastPathRouter
+from host.metrics import REGISTRY
+from host.oai_router import OAIRouter
+from host.orchestrator import MCPOrchestrator, OrchestratorResult
+from host.preview import preview
+from host.result_cache import ResultCache
+from host.types import ToolEvent
+from host.route_cache import RouteCache
+from host.telemetry import configure_otel, orchestrator_collector
+from host.tenant_policy import TENANTS
+
+load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+INVOKE_TIMEOUT = float(os.getenv("INVOKE_TIMEOUT", "120"))
+# Invokes running at once across all tenants; queued tenants share it by weight
+MAX_CONCURRENT_INVOKES = int(os.getenv("MAX_CONCURRENT_INVOKES", str(DEFAULT_MAX_CONCURRENT)))
+STREAM_PREVIEW_CHARS = 1000
+
+def _json(payload: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    # Tool results are plain JSON; default=str covers anything exotic in traces
+    return Response(json.dumps(payload, default=str), status_code=status_code, headers=headers, media_type="application/json")
+
+def _error(status_code: int, message: str) -> Response:
+    return _json({"error": message}, status_code)
+
+def result_payload(tenant_id: str, result: OrchestratorResult) -> Dict[str, Any]:
+    return {
+        "tenant_id": tenant_id,
+        "selected_tool": result.selected_tool,
+        "selected_tools": result.selected_tools,
+        "result": result.result,
+        "tool_calls": [asdict(t) for t in result.trace],
+        "unavailable_servers": result.unavailable_servers,
+        "routing": asdict(result.routing) if result.routing else None,
+        "stages": [asdict(stage) for stage in result.stages],
+    }
+
+@contextlib.asynccontextmanager
+async def lifespan(app: Starlette) -> AsyncIterator[None]:
+    """Build the shared OpenAI client, caches and orchestrator once per process."""
+    api_key = os.getenv("OPENAI_API_KEY", "")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY is not set (see .env)")
+    configure_otel()
+    client = AsyncOpenAI(api_key=api_key)
+    route_cache = RouteCache(path=os.getenv("ROUTE_CACHE_PATH") or None)
+    router = OAIRouter(client=client, model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"), cache=route_cache)
+    app.state.orchestrator = MCPOrchestrator(
+        router=router,
+        pre_routers=[FastPathRouter()],
+        result_cache=ResultCache(),
+        admission=AdmissionController(max_concurrent=MAX_CONCURRENT_INVOKES),
+    )
+    collector = orchestrator_collector(app.state.orchestrator)
+    REGISTRY.add_collector(collector)
+    logger.info("✓ Orchestrator API ready")
+    try:
+        yield
+    finally:
+        REGISTRY.remove_collector(collector)
+        await app.state.orchestrator.aclose()
+        route_cache.save()
+        await client.close()
+        logger.info("✓ Orchestrator API stopped")
+
+def _failure(e: Exception) -> Tuple[int, Dict[str, Any]]:
+    """HTTP status and error body for an exception raised by ``invoke``."""
+    if isinstance(e, AdmissionRejected):
+        return 429, {"error": str(e), "reason": e.reason, "retry_after": e.retry_after}
+    if isinstance(e, asyncio.TimeoutError):
+        return 504, {"error": f"Orchestration timed out after {INVOKE_TIMEOUT:.0f} seconds"}
+    if isinstance(e, PermissionError):
+        return 403, {"error": str(e)}
+    if isinstance(e, ConnectionError):
+        return 503, {"error": str(e)}
+    if isinstance(e, ValueError):
+        return 400, {"error": str(e)}
+    logger.error(f"✗ Orchestration failed: {e}", exc_info=True)
+    return 502, {"error": str(e)}
+
+def _failure_response(e: Exception) -> Response:
+    status, body = _failure(e)
+    retry_after = body.get("retry_after")
+    headers = {"Retry-After": str(max(1, math.ceil(retry_after)))} if retry_after is not None else None
+    return _json(body, status, headers)
+
+async def _invoke_args(request: Request) -> Tuple[str, str]:
+    """``(tenant_id, user_input)`` from the request body; ValueError if malformed."""
+    try:
+        body = await request.json()
+    except ValueError:
+        raise ValueError("Request body must be JSON")
+    tenant_id = body.get("tenant_id") if isinstance(body, dict) else None
+    user_input = body.get("user_input") if isinstance(body, dict) else None
+    if not isinstance(tenant_id, str) or not isinstance(user_input, str) or not user_input.strip():
+        raise ValueError("Expected {\"tenant_id\": str, \"user_input\": str}")
+    return tenant_id, user_input
+
+async def invoke(request: Request) -> Response:
+    try:
+        tenant_id, user_input = await _invoke_args(request)
+    except ValueError as e:
+        return _error(400, str(e))
+
+    orch: MCPOrchestrator = request.app.state.orchestrator
+    try:
+        result = await asyncio.wait_for(orch.invoke(tenant_id=tenant_id, user_input=user_input), timeout=INVOKE_TIMEOUT)
+    except Exception as e:
+        return _failure_response(e)
+    return _json(result_payload(tenant_id, result))
+
+async def invoke_stream(request: Request) -> Response:
+    """Like /invoke, but tool progress and content blocks are sent as soon as they arrive.
+
+    Each line is a JSON object: ``{"event": "progress" | "content", "tool_id", "data"}``
+    while tools run, then one ``{"event": "result", ...}`` (the /invoke payload)
+    or ``{"event": "error", "status", "error", ...}``. Content events carry a bounded
+    preview of each block; full tool results are only sent once, in the last line.
+    """
+    try:
+        tenant_id, user_input = await _invoke_args(request)
+    except ValueError as e:
+        return _error(400, str(e))
+    orch: MCPOrchestrator = request.app.state.orchestrator
+    lines: asyncio.Queue = asyncio.Queue()
+
+    def on_event(tool_id: str, event: ToolEvent) -> None:
+        if event.kind == "progress":
+            lines.put_nowait({"event": "progress", "tool_id": tool_id, "data": event.data})
+        elif event.kind == "content":
+            lines.put_nowait({"event": "content", "tool_id": tool_id, "data": preview(event.data, STREAM_PREVIEW_CHARS)})
+
+    async def run() -> None:
+        try:
+            result = await asyncio.wait_for(orch.invoke(tenant_id, user_input, on_event=on_event), timeout=INVOKE_TIMEOUT)
+            lines.put_nowait({"event": "result", **result_payload(tenant_id, result)})
+        except Exception as e:
+            status, error = _failure(e)
+            lines.put_nowait({"event": "error", "status": status, **error})
+        finally:
+            lines.put_nowait(None)
+
+    async def body() -> AsyncIterator[str]:
+        task = asyncio.create_task(run())
+        try:
+            while (line := await lines.get()) is not None:
+                yield json.dumps(line, default=str) + "\n"
+        finally:
+            # Client went away: stop the invoke (and cancel its tool calls)
+            task.cancel()
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+async def tenants(request: Request) -> Response:
+    return _json({"tenants": list(TENANTS)})
+
+async def health(request: Request) -> Response:
+    orch: MCPOrchestrator = request.app.state.orchestrator
+    return _json({
+        "status": "ok",
+        "catalog_version": orch.catalog.version,
+        "unavailable_servers": orch.catalog.unavailable(),
+        "replicas": orch.pool.replica_stats(),
+        "admission": orch.admission.stats(),
+        "route_cache": orch.router.cache.stats() if orch.router.cache else None,
+        "result_cache": orch.result_cache.stats(),
+        "fast_path_hit_rate": orch.routing_stats.hit_rate,
+        "coalescing": {"routing": orch.route_flights.stats(), "tool_call": orch.tool_flights.stats()},
+    })
+
+async def metrics(request: Request) -> Response:
+    return Response(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+app = Starlette(
+    routes=[
+        Route("/invoke", invoke, methods=["POST"]),
+        Route("/invoke/stream", invoke_stream, methods=["POST"]),
+        Route("/tenants", tenants, methods=["GET"]),
+        Route("/health", health, methods=["GET"]),
+        Route("/metrics", metrics, methods=["GET"]),
+    ],
+    lifespan=lifespan,
+)
+
+if __name__ == "__main__":
+    uvicorn.run(app, host=os.getenv("API_HOST", "127.0.0.1"), port=int(os.getenv("API_PORT", "8080")))
@@ -1,20 +1,11 @@
 from __future__ import annotations
-import asyncio
 import json
 import os
 import logging
-import sys
-from dataclasses import dataclass
-from typing import Any, Dict, List
 
+import httpx
 import streamlit as st
 from dotenv import load_dotenv
-from openai import OpenAI, AsyncOpenAI
-
-from host.oai_router import OAIRouter
-from host.tenant_policy import TENANTS
-from host.types import ToolSpec, ToolCallTrace
-from host.orchestrator import MCPOrchestrator, OrchestratorResult
 
 load_dotenv()
 
@@ -25,26 +16,40 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# The orchestrator runs in the API service (python api.py); this UI only calls it
+API_URL = os.getenv("ORCHESTRATOR_API_URL", "http://127.0.0.1:8080")
+
 # Streamlit UI code
 st.set_page_config(page_title="MCP Orchestrator POC", layout="wide")
 
 st.title("MCP Orchestrator POC (FastMCP + SSE)")
-st.caption("Streamlit UI → LLM routes → MCP tools execute → trace displayed")
+st.caption("Streamlit UI → orchestrator API → LLM routes → MCP tools execute → trace displayed")
+
+@st.cache_resource
+def get_http_client() -> httpx.Client:
+    # Keep-alive connection to the API, shared across reruns
+    return httpx.Client(base_url=API_URL, timeout=130.0)
 
-api_key = os.getenv("OPENAI_API_KEY", "")
-model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+def _show_start_help() -> None:
+    st.error("Make sure the orchestrator API and both MCP servers are running:")
+    st.code("python servers/tickets_server.py", language="bash")
+    st.code("python servers/kb_server.py", language="bash")
+    st.code("python api.py", language="bash")
 
-# Validate API key exists
-if not api_key:
-    st.error("❌ OPENAI_API_KEY not found in .env file")
-    st.info("Please create a .env file with your OpenAI API key")
+try:
+    tenants = get_http_client().get("/tenants").json()["tenants"]
+except httpx.HTTPError as e:
+    logger.error(f"Orchestrator API unreachable at {API_URL}: {e}")
+    st.error(f"❌ Orchestrator API unreachable at {API_URL}")
+    _show_start_help()
     st.stop()
 
 with st.sidebar:
     st.header("Config")
-    tenant_id = st.selectbox("Tenant", list(TENANTS.keys()), index=0)
+    tenant_id = st.selectbox("Tenant", tenants, index=0)
     st.markdown("---")
     st.markdown("**Server Status**")
+    st.markdown(f"API: {API_URL}")
     st.markdown("Tickets: http://localhost:8000")
     st.markdown("KB: http://localhost:8001")
     st.markdown("---")
@@ -53,7 +58,7 @@ with st.sidebar:
     st.markdown('- "What\'s the first response for CVX-12 overheating?"')
     st.markdown("- Try tenant `acme` then ask to create a ticket (should be denied).")
     st.markdown("---")
-    st.caption("Check terminal/console for detailed logs")
+    st.caption("Check the API terminal for detailed logs")
 
 prompt = st.text_area("User request", height=120, value="Find open tickets for CVX-12 in last 7 days")
 
@@ -61,64 +66,67 @@ colA, colB = st.columns([1, 1], gap="large")
 
 run = colA.button("Run Orchestration", type="primary")
 
+def _progress_text(event: dict) -> str:
+    data = event["data"]
+    if event["event"] == "content":
+        return f"📥 {event['tool_id']}: {data}"
+    done = f"{data.get('progress')}/{data['total']}" if data.get("total") else f"{data.get('progress')}"
+    return f"⏳ {event['tool_id']}: {data.get('message') or 'working'} ({done})"
+
 if run:
-    client = AsyncOpenAI(api_key=api_key)
-    router = OAIRouter(client=client, model=model)
-    orch = MCPOrchestrator(router=router)
-    
+    status = colA.empty()
+    payload = None
     with st.spinner("Routing + invoking MCP tool..."):
         try:
-            # Create new event loop for this request
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            logger.info("=" * 60)
-            logger.info("Starting new orchestration request")
-            logger.info("=" * 60)
-            
-            result = loop.run_until_complete(
-                asyncio.wait_for(
-                    orch.invoke(tenant_id=tenant_id, user_input=prompt),
-                    timeout=120.0  # Increased from 60.0 to 120.0
-                )
-            )
-            
-            logger.info("=" * 60)
-            logger.info("Orchestration completed successfully!")
-            logger.info("=" * 60)
-            loop.close()
-            
-        except asyncio.TimeoutError:
-            logger.error("Orchestration timed out after 60 seconds")
-            st.error("⏱️ Operation timed out after 60 seconds.")
-            st.error("Make sure both MCP servers are running:")
-            st.code("python servers/tickets_server.py", language="bash")
-            st.code("python servers/kb_server.py", language="bash")
-            loop.close()
+            # Tool progress and content arrive line by line, before the final result
+            with get_http_client().stream(
+                "POST", "/invoke/stream", json={"tenant_id": tenant_id, "user_input": prompt}
+            ) as resp:
+                if resp.status_code != 200:
+                    resp.read()
+                    try:
+                        body = resp.json()
+                    except ValueError:
+                        # Proxies (502/504) and uvicorn's own 500 answer in plain text
+                        body = {"detail": resp.text}
+                    payload = {"event": "error", "status": resp.status_code, **body}
+                else:
+                    for line in resp.iter_lines():
+                        if not line:
+                            continue
+                        event = json.loads(line)
+                        if event["event"] in ("result", "error"):
+                            payload = event
+                        else:
+                            status.info(_progress_text(event))
+        except httpx.TimeoutException:
+            logger.error("Orchestration request timed out")
+            st.error("⏱️ Operation timed out.")
+            _show_start_help()
             st.stop()
-        except ConnectionError as e:
-            logger.error(f"Connection error: {e}", exc_info=True)
+        except httpx.HTTPError as e:
+            logger.error(f"Orchestrator API error: {e}", exc_info=True)
             st.error(f"❌ Connection failed: {e}")
-            st.error("Make sure both MCP servers are running:")
-            st.code("python servers/tickets_server.py", language="bash")
-            st.code("python servers/kb_server.py", language="bash")
-            loop.close()
-            st.stop()
-        except Exception as e:
-            logger.error(f"Orchestration failed: {e}", exc_info=True)
-            st.error(f"❌ Invocation failed: {e}")
-            st.info("💡 Check the console/terminal for detailed error logs")
-            loop.close()
+            _show_start_help()
             st.stop()
+    status.empty()
+
+    if payload is None or payload.pop("event") == "error":
+        code = payload.get("status") if payload else None
+        error = (payload.get("error") or payload.get("detail")) if payload else "stream ended without a result"
+        logger.error(f"Orchestration failed ({code}): {error}")
+        if code == 503:
+            st.error(f"❌ Connection failed: {error}")
+            _show_start_help()
+        elif code == 504:
+            st.error(f"⏱️ {error}")
+        else:
+            st.error(f"❌ Invocation failed: {error}")
+            st.info("💡 Check the API terminal for detailed error logs")
+        st.stop()
 
     colA.subheader("Result")
-    colA.write(result.result)
+    colA.write(payload.pop("result"))
 
     colB.subheader("Trace")
-    colB.json(
-        {
-            "tenant_id": tenant_id,
-            "selected_tool": result.selected_tool,
-            "tool_calls": [t.__dict__ for t in result.trace],
-        }
-    )
\ No newline at end of file
+    colB.json(payload)
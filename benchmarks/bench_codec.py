@@ -0,0 +1,128 @@
+"""MCP client hot path: SSE framing + JSON decoding of responses, JSON encoding of requests.
+
+Compares the old path (httpx line iteration, per-line str, stdlib json) with
+the incremental SSEParser on bytes, using the stdlib and orjson codecs.
+
+Usage: python -m benchmarks.bench_codec [--tools 5000] [--tickets 20000] [--small 20000] [--repeat 5]
+"""
+from __future__ import annotations
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+from httpx._decoders import LineDecoder, TextDecoder
+
+from benchmarks.common import report, synthetic_catalog, synthetic_tickets
+from host.codec import OrjsonCodec, StdlibCodec, orjson
+from host.sse import SSEParser
+
+CHUNK = 65536
+
+def sse_stream(messages: List[Dict[str, Any]]) -> List[bytes]:
+    """Messages framed the way the FastMCP SSE transport sends them, cut into socket-sized chunks."""
+    raw = b"".join(
+        b"event: message\r\ndata: " + json.dumps(m, separators=(",", ":")).encode() + b"\r\n\r\n"
+        for m in messages
+    )
+    return [raw[i:i + CHUNK] for i in range(0, len(raw), CHUNK)]
+
+def tools_list_response(n_tools: int) -> Dict[str, Any]:
+    base = synthetic_catalog(10_000)
+    tools = [
+        {
+            "name": f"{t.tool_id.split('.', 1)[1]}_{i // len(base)}",
+            "description": t.description,
+            "inputSchema": t.input_schema,
+            "annotations": {"readOnlyHint": True},
+        }
+        for i, t in ((i, base[i % len(base)]) for i in range(n_tools))
+    ]
+    return {"jsonrpc": "2.0", "id": "list", "result": {"tools": tools}}
+
+def tools_call_response(n_tickets: int) -> Dict[str, Any]:
+    tickets = {"count": n_tickets, "tickets": list(synthetic_tickets(n_tickets))}
+    return {"jsonrpc": "2.0", "id": "call", "result": {
+        "content": [{"type": "text", "text": json.dumps(tickets)}],
+        "structuredContent": tickets,
+        "isError": False,
+    }}
+
+def small_responses(n: int) -> List[Dict[str, Any]]:
+    return [
+        {"jsonrpc": "2.0", "id": f"req-{i}", "result": {
+            "content": [{"type": "text", "text": '{"count":1,"docs":[{"id":"KB-1"}]}'}],
+            "structuredContent": {"count": 1, "docs": [{"id": "KB-1"}]},
+            "isError": False,
+        }}
+        for i in range(n)
+    ]
+
+def decode_lines(chunks: List[bytes]) -> int:
+    """The previous _listen_sse: aiter_lines, then json.loads per data line."""
+    text, lines, n = TextDecoder(), LineDecoder(), 0
+    for chunk in chunks:
+        for line in lines.decode(text.decode(chunk)):
+            if line.startswith("data: "):
+                json.loads(line[6:].strip())
+                n += 1
+    return n
+
+def decode_frames(codec) -> Callable[[List[bytes]], int]:
+    def run(chunks: List[bytes]) -> int:
+        parser, n = SSEParser(), 0
+        for chunk in chunks:
+            for _, data in parser.feed(chunk):
+                codec.loads(data)
+                n += 1
+        return n
+    return run
+
+def timed(fn: Callable[[], Any], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tools", type=int, default=5000, help="tools in the tools/list response")
+    parser.add_argument("--tickets", type=int, default=20_000, help="tickets in the tools/call result")
+    parser.add_argument("--small", type=int, default=20_000, help="number of small tools/call responses")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    decoders = [("lines + json", decode_lines), ("frames + json", decode_frames(StdlibCodec()))]
+    encoders = [("json (httpx json=)", lambda m: json.dumps(m, ensure_ascii=False, separators=(",", ":")).encode())]
+    if orjson is not None:
+        decoders.append(("frames + orjson", decode_frames(OrjsonCodec())))
+        encoders.append(("orjson", OrjsonCodec().dumps))
+    else:
+        print("orjson not installed; comparing stdlib paths only")
+
+    payloads = {
+        f"tools/list ({args.tools} tools)": [tools_list_response(args.tools)],
+        f"tools/call ({args.tickets} tickets)": [tools_call_response(args.tickets)],
+        f"{args.small} small responses": small_responses(args.small),
+    }
+    for name, messages in payloads.items():
+        chunks = sse_stream(messages)
+        size = sum(len(c) for c in chunks) / 2**20
+        print(f"\n{name}: {size:.1f} MiB of SSE")
+        for label, decode in decoders:
+            assert decode(chunks) == len(messages)
+            report(f"  decode {label}", timed(lambda: decode(chunks), args.repeat))
+
+    requests = [
+        {"jsonrpc": "2.0", "id": f"req-{i}", "method": "tools/call",
+         "params": {"name": "tickets_search", "arguments": {"query": f"CVX-{i % 50} overheating", "days": 30}}}
+        for i in range(args.small)
+    ]
+    print(f"\nencode {args.small} tools/call requests")
+    for label, encode in encoders:
+        report(f"  {label}", timed(lambda: [encode(r) for r in requests], args.repeat))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Offline accuracy of the fast-path pre-router against labelled prompts.
+
+Every prompt in benchmarks/data/routing_prompts.jsonl is either answered by
+FastPathRouter or deferred to the LLM. An answer naming a different tool than
+the label, or args other than ``fast_path_args`` when the row has them, is
+wrong: the LLM never sees that request. Exits non-zero on any wrong answer.
+No servers or LLM needed.
+
+Usage: python -m benchmarks.bench_fast_path
+"""
+from __future__ import annotations
+import json
+import sys
+import time
+
+from benchmarks.bench_shortlist import DATA, DEMO_TOOLS
+from host.fast_router import FastPathRouter
+
+def main() -> None:
+    with open(DATA, "r", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    router = FastPathRouter()
+    answered = wrong = 0
+    start = time.perf_counter()
+    for row in rows:
+        decision = router.route(row["prompt"], DEMO_TOOLS)
+        if decision is None:
+            outcome = "deferred"
+        else:
+            answered += 1
+            expected_args = row.get("fast_path_args")
+            ok = decision.tool_id == row["tool_id"] and (expected_args is None or decision.args == expected_args)
+            outcome = "ok" if ok else f"WRONG -> {decision.tool_id} {decision.args}"
+            wrong += not ok
+        print(f"{outcome:<10} {row['prompt']}")
+    per_prompt_us = (time.perf_counter() - start) / len(rows) * 1e6
+    print(f"\n{len(rows)} prompts: {answered} on the fast path, {wrong} wrong, {per_prompt_us:.1f} us/prompt")
+    if wrong:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
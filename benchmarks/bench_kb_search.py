@@ -0,0 +1,102 @@
+"""KB search: BM25 inverted index vs. the old per-query scan, plus the
+memory-mapped on-disk store (build time, open time, RSS, query latency).
+
+Usage: python -m benchmarks.bench_kb_search [--docs 100000] [--queries 200] [--skip-store]
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import report, rss_mib, synthetic_docs
+from servers.kb_index import KBIndex, search_segments
+from servers.kb_store import KBStore, build_store
+
+def naive_search(docs, query: str, k: int):
+    """The original kb_query scoring, kept for comparison."""
+    q = query.lower().split()
+    scored = []
+    for d in docs:
+        text = (d["title"] + " " + d["body"]).lower()
+        score = sum(1 for token in q if token in text)
+        scored.append((score, d))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return [d for s, d in scored[:k] if s > 0]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--naive-queries", type=int, default=10)
+    parser.add_argument("--skip-store", action="store_true", help="skip the on-disk store section")
+    args = parser.parse_args()
+
+    docs = list(synthetic_docs(args.docs))
+    rng = random.Random(3)
+    # Users search with a doc's distinctive words, not its most common ones
+    queries = [
+        " ".join(rng.sample(sorted(set(docs[rng.randrange(len(docs))]["body"].split())), 3))
+        for _ in range(args.queries)
+    ]
+
+    rss_before = rss_mib()
+    start = time.perf_counter()
+    index = KBIndex()
+    index.add_many(docs)
+    build_s = time.perf_counter() - start
+    print(f"indexed {len(index)} docs in {build_s:.2f}s (RSS +{rss_mib() - rss_before:.1f} MiB)")
+
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        index.search(q, 10)
+        samples.append(time.perf_counter() - start)
+    report("bm25 inverted index", samples)
+
+    samples = []
+    for q in queries[:args.naive_queries]:
+        start = time.perf_counter()
+        naive_search(docs, q, 10)
+        samples.append(time.perf_counter() - start)
+    report("naive scan (old kb_query)", samples)
+
+    start = time.perf_counter()
+    for doc in synthetic_docs(1000, seed=99):
+        index.add({**doc, "id": f"NEW-{doc['id']}"})
+    print(f"incremental add: {(time.perf_counter() - start) / 1000 * 1e6:.1f} us/doc")
+
+    if not args.skip_store:
+        _bench_store(docs, queries)
+
+def _bench_store(docs, queries) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = os.path.join(tmp, "corpus.jsonl")
+        with open(corpus, "w", encoding="utf-8") as f:
+            for doc in docs:
+                f.write(json.dumps(doc) + "\n")
+        out = os.path.join(tmp, "store")
+
+        start = time.perf_counter()
+        build_store([corpus], out)
+        size = sum(os.path.getsize(os.path.join(out, name)) for name in os.listdir(out))
+        print(f"built store in {time.perf_counter() - start:.2f}s ({size / 2**20:.1f} MiB on disk)")
+
+        rss_before = rss_mib()
+        start = time.perf_counter()
+        store = KBStore(out)
+        print(f"opened store in {(time.perf_counter() - start) * 1000:.2f} ms (RSS +{rss_mib() - rss_before:.1f} MiB)")
+
+        samples = []
+        for q in queries:
+            start = time.perf_counter()
+            search_segments([store], q, 10)
+            samples.append(time.perf_counter() - start)
+        report("mmap store", samples)
+        print(f"RSS after queries: +{rss_mib() - rss_before:.1f} MiB (mapped pages, shared via page cache)")
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Per-invoke latency with cold (per-request) vs warm (pooled) MCP sessions.
+
+Usage: python -m benchmarks.bench_sessions [--iterations N]
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import logging
+import time
+
+from benchmarks.common import StubRouter, local_servers, report
+from host.orchestrator import MCPOrchestrator
+
+async def _cold(iterations: int) -> list:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        orch = MCPOrchestrator(router=StubRouter())
+        try:
+            await orch.invoke("acme", "CVX-12 overheating")
+        finally:
+            await orch.aclose()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+async def _warm(iterations: int) -> list:
+    orch = MCPOrchestrator(router=StubRouter())
+    try:
+        await orch.invoke("acme", "warm-up")
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await orch.invoke("acme", "CVX-12 overheating")
+            samples.append(time.perf_counter() - start)
+        return samples
+    finally:
+        await orch.aclose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    with local_servers():
+        report("cold sessions", asyncio.run(_cold(args.iterations)))
+        report("warm pooled sessions", asyncio.run(_warm(args.iterations)))
+
+if __name__ == "__main__":
+    main()
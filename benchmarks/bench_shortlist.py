@@ -0,0 +1,67 @@
+"""Offline recall of the BM25 tool shortlist against labelled prompts.
+
+Recall@K is the share of prompts whose labelled tool is among the K tools the
+shortlister would send to the router. Runs on the demo catalog (labelled set
+in benchmarks/data/routing_prompts.jsonl) mixed into synthetic catalogs of
+increasing size. No servers or LLM needed.
+
+Usage: python -m benchmarks.bench_shortlist [--sizes 50 100 216] [--k 3 5 10 20]
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import time
+from typing import List
+
+from benchmarks.common import synthetic_catalog, synthetic_prompts
+from host.tool_index import ToolIndex
+from host.types import ToolSpec
+
+DATA = os.path.join(os.path.dirname(__file__), "data", "routing_prompts.jsonl")
+
+DEMO_TOOLS = [
+    ToolSpec("tickets.tickets_search", "Search tickets by naive keyword matching and a 'days' time window.",
+             {"type": "object", "properties": {"query": {"type": "string", "description": "Search query"},
+                                               "days": {"type": "integer", "description": "Days to search back"}}}),
+    ToolSpec("tickets.tickets_create", "Create a ticket (in-memory).",
+             {"type": "object", "properties": {"asset": {"type": "string", "description": "Asset ID"},
+                                               "summary": {"type": "string", "description": "Ticket summary"},
+                                               "priority": {"type": "string", "description": "Priority level"}}}),
+    ToolSpec("kb.kb_query", "Return top-k docs by naive keyword scoring.",
+             {"type": "object", "properties": {"query": {"type": "string", "description": "Search query"},
+                                               "k": {"type": "integer", "description": "Number of results to return"}}}),
+]
+
+def _load_labelled() -> List[tuple]:
+    with open(DATA, "r", encoding="utf-8") as f:
+        return [(row["prompt"], row["tool_id"]) for row in map(json.loads, f) if row]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 216])
+    parser.add_argument("--k", type=int, nargs="+", default=[3, 5, 10, 20])
+    args = parser.parse_args()
+
+    labelled = _load_labelled()
+    print(f"{'tools':>6} {'prompts':>8} " + " ".join(f"{'R@' + str(k):>7}" for k in args.k) + f" {'build ms':>9} {'query us':>9}")
+    for size in args.sizes:
+        synthetic = synthetic_catalog(size)
+        catalog = DEMO_TOOLS + synthetic
+        prompts = labelled + synthetic_prompts(synthetic)
+
+        start = time.perf_counter()
+        index = ToolIndex(catalog)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        recalls = []
+        start = time.perf_counter()
+        for k in args.k:
+            hits = sum(1 for prompt, tool_id in prompts if tool_id in {t.tool_id for t in index.search(prompt, k)})
+            recalls.append(hits / len(prompts))
+        query_us = (time.perf_counter() - start) / (len(prompts) * len(args.k)) * 1e6
+
+        print(f"{len(catalog):>6} {len(prompts):>8} " + " ".join(f"{r:>7.3f}" for r in recalls) + f" {build_ms:>9.2f} {query_us:>9.1f}")
+
+if __name__ == "__main__":
+    main()
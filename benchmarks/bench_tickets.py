@@ -0,0 +1,78 @@
+"""Ticket search: indexed TicketStore vs. the old per-query scan.
+
+Usage: python -m benchmarks.bench_tickets [--tickets 1000000] [--queries 200]
+"""
+from __future__ import annotations
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from benchmarks.common import TICKET_WORDS, report, rss_mib, synthetic_tickets
+from servers.ticket_store import TicketStore
+
+def naive_search(tickets, query: str, days: int):
+    """The original tickets_search filter, kept for comparison."""
+    cutoff = datetime.utcnow().date() - timedelta(days=days)
+    q = query.lower()
+    hits = []
+    for t in tickets:
+        created = datetime.strptime(t["created_at"], "%Y-%m-%d").date()
+        if created < cutoff:
+            continue
+        blob = f'{t["id"]} {t["asset"]} {t["status"]} {t["summary"]}'.lower()
+        if q in blob:
+            hits.append(t)
+    return hits
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--naive-queries", type=int, default=3)
+    args = parser.parse_args()
+
+    tickets = list(synthetic_tickets(args.tickets))
+    rng = random.Random(9)
+    queries = []
+    for _ in range(args.queries):
+        t = tickets[rng.randrange(len(tickets))]
+        kind = rng.randrange(4)
+        if kind == 0:
+            queries.append((t["asset"], rng.choice((30, 365))))
+        elif kind == 1:
+            queries.append((t["id"], 3650))
+        elif kind == 2:
+            queries.append((f'{t["asset"]} open', 365))
+        else:
+            queries.append((rng.choice(TICKET_WORDS), 7))
+
+    rss_before = rss_mib()
+    start = time.perf_counter()
+    store = TicketStore(tickets)
+    print(f"indexed {len(store)} tickets in {time.perf_counter() - start:.2f}s "
+          f"(index RSS +{rss_mib() - rss_before:.1f} MiB)")
+
+    today = datetime.utcnow().date()
+    samples = []
+    for query, days in queries:
+        start = time.perf_counter()
+        store.search(query, today - timedelta(days=days))
+        samples.append(time.perf_counter() - start)
+    report("indexed store", samples)
+
+    samples = []
+    for query, days in queries[:args.naive_queries]:
+        start = time.perf_counter()
+        naive_search(tickets, query, days)
+        samples.append(time.perf_counter() - start)
+    report("naive scan (old tickets_search)", samples)
+
+    start = time.perf_counter()
+    for i in range(1000):
+        store.add({"id": f"T-NEW-{i}", "asset": "CVX-12", "status": "open",
+                   "created_at": date.today().isoformat(), "summary": "Overheating alarm"})
+    print(f"incremental add: {(time.perf_counter() - start) / 1000 * 1e6:.1f} us/ticket")
+
+if __name__ == "__main__":
+    main()
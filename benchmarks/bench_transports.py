@@ -0,0 +1,83 @@
+"""Per-call overhead of the MCP transports: SSE, streamable HTTP and in-process.
+
+The same synthetic server is run as two subprocesses (``--transport sse`` and
+``--transport http``) and built in this process for the in-process transport.
+For each, one warm session times ``tools/call`` back to back (p50/p99), then
+with ``--concurrency`` calls in flight (calls/s). The tool does no work, so
+the numbers are transport and protocol overhead.
+
+Usage: python -m benchmarks.bench_transports [--iterations 500] [--concurrency 64] [--tools 50]
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+
+from benchmarks.common import report, start_server, stop_servers
+from benchmarks.synthetic_server import build_server
+from host.codec import default_codec
+from host.mcp_client import FastMCPClient
+from host.transports import InProcessTransport
+
+SSE_PORT = 8110
+HTTP_PORT = 8111
+
+async def _measure(label: str, client: FastMCPClient, iterations: int, concurrency: int) -> None:
+    async with httpx.AsyncClient(timeout=None) as http:
+        await client.connect(http)
+        try:
+            tools = await client.list_tools(http)
+            name = tools[0]["name"]
+            args = {"query": "CVX-12 overheating", "days": 7}
+            for _ in range(20):
+                await client.call_tool(http, name, args)
+
+            samples = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                await client.call_tool(http, name, args)
+                samples.append(time.perf_counter() - start)
+            report(f"{label} sequential", samples)
+
+            calls = iterations * 4
+            gate = asyncio.Semaphore(concurrency)
+
+            async def one() -> None:
+                async with gate:
+                    await client.call_tool(http, name, args)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(one() for _ in range(calls)))
+            elapsed = time.perf_counter() - start
+            print(f"{label + ' concurrent':<28} n={calls:<5} {calls / elapsed:8.0f} calls/s at {concurrency} in flight")
+        finally:
+            await client.close()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--tools", type=int, default=50)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    server = ["benchmarks/synthetic_server.py", "--tools", str(args.tools)]
+    procs = [
+        start_server(server + ["--port", str(SSE_PORT), "--transport", "sse"], SSE_PORT),
+        start_server(server + ["--port", str(HTTP_PORT), "--transport", "http"], HTTP_PORT),
+    ]
+    try:
+        asyncio.run(_measure("sse", FastMCPClient(f"http://127.0.0.1:{SSE_PORT}"), args.iterations, args.concurrency))
+        asyncio.run(_measure(
+            "http", FastMCPClient(f"http://127.0.0.1:{HTTP_PORT}", transport="http"), args.iterations, args.concurrency,
+        ))
+    finally:
+        stop_servers(procs)
+    inproc = InProcessTransport(build_server(args.tools, []), default_codec())
+    asyncio.run(_measure("inproc", FastMCPClient(inproc.endpoint, transport=inproc), args.iterations, args.concurrency))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Cost of local argument validation against catalog size.
+
+For catalogs of increasing size, measures compiling every tool's validator
+(paid once per catalog version), then validating planned calls through the
+per-version cache: valid args, args that need coercion and defaults, and
+invalid args (the error path). Per-call cost should not grow with the catalog.
+With ``jsonschema`` installed, its validator is timed on the same args for
+comparison. No servers or LLM needed.
+
+Usage: python -m benchmarks.bench_validation [--sizes 10 100 1000 10000] [--calls 20000]
+"""
+from __future__ import annotations
+import argparse
+import random
+import time
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.common import synthetic_catalog
+from host.arg_validation import ArgsValidator, ArgumentError
+from host.types import ToolSpec
+
+try:
+    import jsonschema
+except ImportError:  # optional: only used as a reference point
+    jsonschema = None
+
+# A richer schema, like the ones pydantic emits for nested tool inputs
+ORDER_SCHEMA = {
+    "$defs": {
+        "Line": {
+            "properties": {
+                "sku": {"type": "string", "pattern": "^[A-Z]{3}-\\d+$"},
+                "qty": {"default": 1, "minimum": 1, "type": "integer"},
+            },
+            "required": ["sku"],
+            "type": "object",
+        }
+    },
+    "properties": {
+        "customer": {"type": "string", "minLength": 1},
+        "lines": {"items": {"$ref": "#/$defs/Line"}, "minItems": 1, "type": "array"},
+        "priority": {"default": "medium", "enum": ["low", "medium", "high"], "type": "string"},
+        "note": {"anyOf": [{"type": "string"}, {"type": "null"}], "default": None},
+    },
+    "required": ["customer", "lines"],
+    "type": "object",
+    "additionalProperties": False,
+}
+
+def catalog(n_tools: int) -> List[ToolSpec]:
+    """The synthetic catalog, repeated under new ids, with every tenth tool taking nested orders."""
+    base = synthetic_catalog(10_000)
+    tools = []
+    for i in range(n_tools):
+        tool = base[i % len(base)]
+        schema = ORDER_SCHEMA if i % 10 == 9 else tool.input_schema
+        tools.append(ToolSpec(f"{tool.tool_id}_{i // len(base)}", tool.description, schema))
+    return tools
+
+def planned_args(tool: ToolSpec, kind: str) -> Dict[str, Any]:
+    if tool.input_schema is ORDER_SCHEMA:
+        if kind == "valid":
+            return {"customer": "acme", "lines": [{"sku": "CVX-12", "qty": 2}], "priority": "high", "note": None}
+        if kind == "coerce":
+            return {"customer": "acme", "lines": {"sku": "CVX-12", "qty": "2"}}
+        return {"customer": "", "lines": [{"sku": "cvx12", "qty": 0}], "priority": "urgent"}
+    if kind == "valid":
+        return {"query": "CVX-12 overheating", "days": 7}
+    if kind == "coerce":
+        return {"query": "CVX-12 overheating", "days": "7"}
+    return {"query": None, "days": "a week"}
+
+def time_calls(calls: List[Tuple[ToolSpec, Dict[str, Any]]], validators: Dict[str, ArgsValidator]) -> float:
+    """Mean microseconds to look up a tool's validator and validate one call."""
+    start = time.perf_counter()
+    for tool, args in calls:
+        validator = validators.get(tool.tool_id)
+        if validator is None:
+            validator = validators[tool.tool_id] = ArgsValidator(tool.tool_id, tool.input_schema)
+        try:
+            validator.validate(args)
+        except ArgumentError:
+            pass
+    return (time.perf_counter() - start) / len(calls) * 1e6
+
+def time_jsonschema(calls: List[Tuple[ToolSpec, Dict[str, Any]]]) -> float:
+    validators: Dict[str, Any] = {}
+    start = time.perf_counter()
+    for tool, args in calls:
+        validator = validators.get(tool.tool_id)
+        if validator is None:
+            validator = validators[tool.tool_id] = jsonschema.Draft202012Validator(tool.input_schema)
+        validator.is_valid(args)
+    return (time.perf_counter() - start) / len(calls) * 1e6
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--calls", type=int, default=20000, help="validated calls per size and kind")
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    header = f"{'tools':>6} {'compile ms':>11} {'valid us':>9} {'coerce us':>10} {'invalid us':>11}"
+    print(header + (f" {'jsonschema us':>14}" if jsonschema is not None else ""))
+    for size in args.sizes:
+        tools = catalog(size)
+
+        start = time.perf_counter()
+        validators = {t.tool_id: ArgsValidator(t.tool_id, t.input_schema) for t in tools}
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        # The planned tools are drawn from the whole catalog, so lookups spread over it
+        picked = [rng.choice(tools) for _ in range(args.calls)]
+        timings = [time_calls([(t, planned_args(t, kind)) for t in picked], validators) for kind in ("valid", "coerce", "invalid")]
+        line = f"{size:>6} {compile_ms:>11.2f} " + " ".join(f"{us:>{w}.2f}" for us, w in zip(timings, (9, 10, 11)))
+        if jsonschema is not None:
+            line += f" {time_jsonschema([(t, planned_args(t, 'valid')) for t in picked]):>14.2f}"
+        print(line)
+
+if __name__ == "__main__":
+    main()
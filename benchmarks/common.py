@@ -0,0 +1,202 @@
+from __future__ import annotations
+import itertools
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from host.oai_router import RouteDecision, RoutePlan
+from host.types import ToolSpec
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVER_SCRIPTS: Dict[str, tuple] = {
+    "tickets": ("servers/tickets_server.py", 8000),
+    "kb": ("servers/kb_server.py", 8001),
+}
+
+def _port_open(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.settimeout(0.2)
+        return s.connect_ex(("127.0.0.1", port)) == 0
+
+def start_server(args: Sequence[str], port: int, env: Optional[Dict[str, str]] = None, startup_timeout: float = 20.0) -> subprocess.Popen:
+    """Run ``python <args>`` from the repo root and wait until ``port`` accepts connections."""
+    proc = subprocess.Popen(
+        [sys.executable, *args],
+        cwd=REPO_ROOT,
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + startup_timeout
+    while not _port_open(port):
+        if proc.poll() is not None or time.monotonic() > deadline:
+            proc.terminate()
+            raise RuntimeError(f"{' '.join(args)} did not start on port {port}")
+        time.sleep(0.1)
+    return proc
+
+def stop_servers(procs: Sequence[subprocess.Popen]) -> None:
+    for proc in procs:
+        proc.terminate()
+    for proc in procs:
+        proc.wait(timeout=10)
+
+@contextmanager
+def local_servers(
+    names: Sequence[str] = ("tickets", "kb"),
+    startup_timeout: float = 20.0,
+    env: Optional[Dict[str, str]] = None,
+) -> Iterator[List[subprocess.Popen]]:
+    """Start the FastMCP demo servers as subprocesses unless they are already listening.
+
+    Yields the processes started here (servers that were already running are reused).
+    """
+    procs: List[subprocess.Popen] = []
+    try:
+        for name in names:
+            script, port = SERVER_SCRIPTS[name]
+            if _port_open(port):
+                continue
+            procs.append(start_server([os.path.join(REPO_ROOT, script)], port, env, startup_timeout))
+        yield procs
+    finally:
+        stop_servers(procs)
+
+class StubRouter:
+    """Deterministic stand-in for OAIRouter: always picks the first allowed kb/tickets read tool."""
+
+    async def choose_tool(self, user_input: str, tools: List[ToolSpec], catalog_fingerprint: Optional[str] = None) -> RouteDecision:
+        tool = next(t for t in tools if t.tool_id in ("kb.kb_query", "tickets.tickets_search"))
+        return RouteDecision(tool_id=tool.tool_id, args={"query": user_input})
+
+    async def plan(self, user_input: str, tools: List[ToolSpec], catalog_fingerprint: Optional[str] = None, max_calls: int = 1) -> RoutePlan:
+        return RoutePlan(calls=[await self.choose_tool(user_input, tools, catalog_fingerprint)])
+
+    async def plan_many(
+        self, user_inputs: List[str], tools: List[ToolSpec], catalog_fingerprint: Optional[str] = None, max_calls: int = 1,
+    ) -> List[RoutePlan]:
+        return [await self.plan(text, tools, catalog_fingerprint, max_calls) for text in user_inputs]
+
+    async def repair(self, user_input: str, tool: ToolSpec, args: Dict[str, Any], errors: List[str]) -> RouteDecision:
+        return RouteDecision(tool_id=tool.tool_id, args={"query": user_input})
+
+    def remember(self, user_input: str, plan: RoutePlan, catalog_fingerprint: str, max_calls: int = 1) -> None:
+        pass
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, max(0, round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+def report(label: str, samples_s: Sequence[float]) -> None:
+    ms = [s * 1000 for s in samples_s]
+    print(f"{label:<28} n={len(ms):<5} p50={percentile(ms, 50):8.2f} ms  p99={percentile(ms, 99):8.2f} ms")
+
+# Synthetic catalogs: DOMAINS x ENTITIES x ACTIONS tool ids, e.g. "billing.invoice_search"
+DOMAINS = {
+    "tickets": ["ticket", "incident", "escalation"],
+    "kb": ["article", "procedure", "manual"],
+    "crm": ["account", "contact", "opportunity"],
+    "billing": ["invoice", "payment", "refund"],
+    "inventory": ["part", "warehouse", "shipment"],
+    "hr": ["employee", "timesheet", "leave"],
+    "assets": ["asset", "sensor", "firmware"],
+    "alerts": ["alarm", "threshold", "notification"],
+    "telemetry": ["metric", "reading", "trend"],
+    "maintenance": ["workorder", "inspection", "schedule"],
+    "procurement": ["vendor", "purchase", "quote"],
+    "compliance": ["audit", "policy", "certificate"],
+}
+
+ACTIONS = {
+    "search": ("Search {entity} records by keyword and time window.", ["find {entity}s matching", "look up {entity}s about", "search {entity}s for"]),
+    "create": ("Create a new {entity} record.", ["create a new {entity} for", "add a {entity} for", "register a {entity} for"]),
+    "update": ("Update fields on an existing {entity}.", ["update the {entity} for", "change the {entity} details for", "modify {entity} fields for"]),
+    "delete": ("Delete a {entity} permanently.", ["delete the {entity} for", "remove the {entity} for", "permanently delete {entity} for"]),
+    "export": ("Export {entity} data as CSV.", ["export {entity} data for", "download a CSV of {entity}s for", "dump {entity} records for"]),
+    "summarize": ("Summarize recent {entity} activity.", ["summarize recent {entity} activity for", "give me a {entity} summary for", "recap {entity} activity for"]),
+}
+
+def synthetic_catalog(n_tools: int) -> List[ToolSpec]:
+    """Deterministic catalog of up to len(DOMAINS) * 3 * len(ACTIONS) tools."""
+    tools: List[ToolSpec] = []
+    for domain, entities in DOMAINS.items():
+        for entity in entities:
+            for action, (description, _) in ACTIONS.items():
+                properties = {
+                    "query": {"type": "string", "description": f"Free-text filter for {entity}s"},
+                    f"{entity}_id": {"type": "string", "description": f"{entity.title()} identifier"},
+                    "days": {"type": "integer", "default": 30, "description": "Days to look back"},
+                }
+                tools.append(ToolSpec(
+                    tool_id=f"{domain}.{entity}_{action}",
+                    description=description.format(entity=entity) + f" Part of the {domain} system.",
+                    input_schema={"type": "object", "properties": properties, "required": ["query"]},
+                ))
+    return tools[:n_tools]
+
+def synthetic_prompts(tools: Sequence[ToolSpec], per_tool: int = 2, seed: int = 7) -> List[tuple]:
+    """Labelled (prompt, tool_id) pairs phrased with synonyms of each tool's action."""
+    import random
+
+    rng = random.Random(seed)
+    assets = ["CVX-12", "QRT-9", "PMP-4", "HVX-31"]
+    pairs = []
+    for tool in tools:
+        _, rest = tool.tool_id.split(".", 1)
+        entity, action = rest.rsplit("_", 1)
+        for phrase in rng.sample(ACTIONS[action][1], k=min(per_tool, len(ACTIONS[action][1]))):
+            pairs.append((f"Please {phrase.format(entity=entity)} {rng.choice(assets)}", tool.tool_id))
+    return pairs
+
+def synthetic_docs(n_docs: int, seed: int = 11, body_words: int = 40):
+    """Deterministic KB-style documents over a Zipf-ish vocabulary."""
+    import random
+
+    rng = random.Random(seed)
+    vocab = [f"{stem}{i}" for i in range(2000) for stem in ("pump", "valve", "sensor", "fan", "coil")][:10000]
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(vocab))))
+    for i in range(n_docs):
+        title = " ".join(rng.choices(vocab, cum_weights=cum_weights, k=5))
+        body = " ".join(rng.choices(vocab, cum_weights=cum_weights, k=body_words))
+        yield {"id": f"KB-{i + 1}", "title": title, "body": body}
+
+TICKET_WORDS = (
+    "overheating alarm sensor calibration vibration anomaly pressure drop leak detected "
+    "bearing wear coolant level low fan failure valve stuck firmware update noise "
+    "intermittent fault power surge filter clogged belt slipping motor trip"
+).split()
+
+def synthetic_tickets(n_tickets: int, seed: int = 5, n_assets: int = 5000, days: int = 730):
+    """Deterministic tickets spread over the last ``days`` days, oldest first."""
+    import random
+    from datetime import date, timedelta
+
+    rng = random.Random(seed)
+    assets = [f"{rng.choice(('CVX', 'QRT', 'PMP', 'HVX'))}-{i}" for i in range(n_assets)]
+    start = date.today() - timedelta(days=days)
+    for i in range(n_tickets):
+        created = start + timedelta(days=i * days // max(1, n_tickets))
+        yield {
+            "id": f"T-{1001 + i}",
+            "asset": rng.choice(assets),
+            "status": rng.choice(("open", "closed", "closed", "in_progress")),
+            "created_at": created.isoformat(),
+            "summary": " ".join(rng.sample(TICKET_WORDS, 3)),
+        }
+
+def rss_mib(pid: Optional[int] = None) -> float:
+    """Current resident set size of this (or another) process on Linux; peak RSS elsewhere."""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
@@ -0,0 +1,398 @@
+"""End-to-end load test of MCPOrchestrator.invoke against local FastMCP servers.
+
+The real OAIRouter runs against StubOpenAI, a deterministic stand-in for
+AsyncOpenAI with configurable latency, so results measure the orchestrator
+hot path (routing prompt, sessions, tool calls) rather than a live model.
+
+Usage:
+    python -m benchmarks.loadtest --scenario baseline --concurrency 1,8,32
+    python -m benchmarks.loadtest --scenario catalog --catalog-sizes 10,100,200
+    python -m benchmarks.loadtest --scenario corpus --corpus-sizes 1000,100000
+    python -m benchmarks.loadtest --scenario servers --server-counts 1,2,4
+    python -m benchmarks.loadtest --scenario replicas --replica-counts 1,2,4
+    python -m benchmarks.loadtest --scenario batch --concurrency 8 --batch-size 16
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from benchmarks.common import (
+    DOMAINS, REPO_ROOT, local_servers, percentile, rss_mib, start_server, stop_servers,
+    synthetic_catalog, synthetic_docs, synthetic_prompts,
+)
+from host.fast_router import FastPathRouter
+from host.oai_router import OAIRouter
+from host.orchestrator import MCPOrchestrator
+from host.result_cache import ResultCache
+from host.route_cache import RouteCache
+from host.server_registry import DEFAULT_SERVERS, ServerEntry
+from host.session_pool import MCPSessionPool
+from host.tenant_policy import TENANTS, TenantLimits, TenantPolicy
+from host.tool_catalog import ToolCatalog
+from host.tool_index import ToolIndex
+from host.types import ToolSpec
+from servers.kb_store import build_store
+
+BENCH_TENANT = "loadtest"
+SYNTHETIC_PORT = 8100
+
+class StubOpenAI:
+    """Deterministic ``AsyncOpenAI`` stand-in for ``OAIRouter``.
+
+    Picks the best BM25 match for the request from the catalog in the system
+    prompt and fills required string arguments with the request text, after
+    sleeping ``latency_ms`` plus up to ``jitter_ms`` (seeded). Packed batch
+    requests get one plan per request for the same latency.
+    """
+
+    def __init__(self, latency_ms: float = 300.0, jitter_ms: float = 50.0, seed: int = 1):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._indexes: Dict[str, ToolIndex] = {}   # system prompt -> index over its catalog
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _index(self, system: str) -> ToolIndex:
+        index = self._indexes.get(system)
+        if index is None:
+            # The catalog is one JSON line; plan or repair rules may follow it
+            brief = system.split("Available tools:\n", 1)[1].split("\n", 1)[0]
+            tools = [ToolSpec(t["tool_id"], t["description"], t["input_schema"]) for t in json.loads(brief)]
+            index = self._indexes[system] = ToolIndex(tools)
+        return index
+
+    def _decide(self, system: str, request: str) -> Dict[str, Any]:
+        tool = self._index(system).search(request, 1)[0]
+        schema = tool.input_schema
+        args = {
+            name: request
+            for name in schema.get("required", [])
+            if schema.get("properties", {}).get(name, {}).get("type") == "string"
+        }
+        return {"tool_id": tool.tool_id, "args": args}
+
+    async def _create(self, model: str, messages: List[Dict[str, str]], response_format: Dict[str, Any], **_: Any):
+        self.calls += 1
+        await asyncio.sleep((self.latency_ms + self._rng.random() * self.jitter_ms) / 1000)
+        system, user = messages[0]["content"], messages[-1]["content"]
+        kind = response_format["json_schema"]["name"]
+        if kind == "route_batch":
+            # Packed requests: one plan per {"index", "request"} entry
+            requests = json.loads(user.removeprefix("User requests:\n"))
+            decision = {"plans": [{"index": r["index"], "calls": [self._decide(system, r["request"])]} for r in requests]}
+        else:
+            decision = self._decide(system, user.removeprefix("User request: "))
+            if kind == "route_plan":
+                decision = {"calls": [decision]}
+        message = SimpleNamespace(content=json.dumps(decision))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+@dataclass
+class RunResult:
+    label: str
+    concurrency: int
+    requests: int
+    errors: int
+    elapsed_s: float
+    latencies_s: List[float]
+    client_rss_mib: float
+    server_rss_mib: float
+
+    def line(self) -> str:
+        ms = [s * 1000 for s in self.latencies_s]
+        return (
+            f"{self.label:<26} c={self.concurrency:<4} n={self.requests:<5} err={self.errors:<3} "
+            f"{self.requests / self.elapsed_s:8.1f} req/s  p50={percentile(ms, 50):8.2f}  "
+            f"p95={percentile(ms, 95):8.2f}  p99={percentile(ms, 99):8.2f} ms  "
+            f"rss client={self.client_rss_mib:6.1f} servers={self.server_rss_mib:6.1f} MiB"
+        )
+
+async def drive(
+    label: str,
+    servers: Mapping[str, ServerEntry],
+    prompts: Sequence[str],
+    concurrency: int,
+    requests: int,
+    llm: StubOpenAI,
+    server_pids: Sequence[int] = (),
+    route_cache: bool = False,
+    result_cache: bool = False,
+    fast_path: bool = False,
+) -> RunResult:
+    """Closed-loop load: ``concurrency`` workers issue ``requests`` invokes in total."""
+    orch = await _orchestrator(servers, llm, route_cache, result_cache, fast_path)
+    await orch.invoke(BENCH_TENANT, prompts[0])  # warm sessions and prompt caches
+
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                await orch.invoke(BENCH_TENANT, prompts[i % len(prompts)])
+            except Exception as e:
+                errors += 1
+                logging.getLogger(__name__).debug(f"invoke failed: {e}")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    finally:
+        await orch.aclose()
+        TENANTS.pop(BENCH_TENANT, None)
+    return RunResult(
+        label=label,
+        concurrency=concurrency,
+        requests=requests,
+        errors=errors,
+        elapsed_s=elapsed,
+        latencies_s=latencies,
+        client_rss_mib=rss_mib(),
+        server_rss_mib=sum(rss_mib(pid) for pid in server_pids),
+    )
+
+async def drive_batch(
+    label: str,
+    servers: Mapping[str, ServerEntry],
+    prompts: Sequence[str],
+    concurrency: int,
+    requests: int,
+    llm: StubOpenAI,
+    server_pids: Sequence[int] = (),
+    route_cache: bool = False,
+    result_cache: bool = False,
+    fast_path: bool = False,
+    batch_size: int = 16,
+) -> RunResult:
+    """Offline batch: ``requests`` prompts through one ``invoke_many`` with ``concurrency`` items running at once.
+
+    Latencies are each item's time from the start of the run to its arrival.
+    """
+    orch = await _orchestrator(servers, llm, route_cache, result_cache, fast_path)
+    await orch.invoke(BENCH_TENANT, prompts[0])  # warm sessions and prompt caches
+
+    latencies: List[float] = []
+    errors = 0
+    inputs = (prompts[i % len(prompts)] for i in range(requests))
+    start = time.perf_counter()
+    try:
+        async for item in orch.invoke_many(BENCH_TENANT, inputs, batch_size=batch_size, max_concurrency=concurrency):
+            errors += not item.ok
+            latencies.append(time.perf_counter() - start)
+        elapsed = time.perf_counter() - start
+    finally:
+        await orch.aclose()
+        TENANTS.pop(BENCH_TENANT, None)
+    return RunResult(
+        label=label,
+        concurrency=concurrency,
+        requests=requests,
+        errors=errors,
+        elapsed_s=elapsed,
+        latencies_s=latencies,
+        client_rss_mib=rss_mib(),
+        server_rss_mib=sum(rss_mib(pid) for pid in server_pids),
+    )
+
+async def _orchestrator(
+    servers: Mapping[str, ServerEntry],
+    llm: StubOpenAI,
+    route_cache: bool,
+    result_cache: bool,
+    fast_path: bool,
+) -> MCPOrchestrator:
+    pool = MCPSessionPool(servers)
+    catalog = ToolCatalog(pool)
+    orch = MCPOrchestrator(
+        router=OAIRouter(client=llm, model="stub", cache=RouteCache() if route_cache else None),
+        pool=pool,
+        catalog=catalog,
+        result_cache=ResultCache(max_entries=10_000 if result_cache else 0),
+        pre_routers=[FastPathRouter()] if fast_path else (),
+    )
+    # Allow every discovered tool for the benchmark tenant
+    tools = await catalog.tools()
+    TENANTS[BENCH_TENANT] = TenantPolicy(
+        allowed_tools={t.tool_id for t in tools},
+        limits=TenantLimits(max_calls_per_request=1),
+    )
+    return orch
+
+def _demo_prompts() -> List[str]:
+    with open(os.path.join(REPO_ROOT, "benchmarks", "data", "routing_prompts.jsonl"), "r", encoding="utf-8") as f:
+        return [json.loads(line)["prompt"] for line in f if line.strip()]
+
+def _options(args) -> Tuple[bool, bool, bool]:
+    return args.route_cache, args.result_cache, args.fast_path
+
+def _run(coro) -> RunResult:
+    result = asyncio.run(coro)
+    print(result.line(), flush=True)
+    return result
+
+def scenario_baseline(args, llm: StubOpenAI) -> None:
+    data_dir = tempfile.mkdtemp(prefix="loadtest-tickets-")
+    try:
+        with local_servers(env={"TICKETS_DATA_DIR": data_dir}) as procs:
+            for c in args.concurrency:
+                _run(drive("demo servers", DEFAULT_SERVERS, _demo_prompts(), c, args.requests, llm,
+                           [p.pid for p in procs], *_options(args)))
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+def scenario_batch(args, llm: StubOpenAI) -> None:
+    """A loop of invokes vs. invoke_many over the same prompts, at the same concurrency."""
+    data_dir = tempfile.mkdtemp(prefix="loadtest-tickets-")
+    try:
+        with local_servers(env={"TICKETS_DATA_DIR": data_dir}) as procs:
+            pids = [p.pid for p in procs]
+            for c in args.concurrency:
+                before = llm.calls
+                _run(drive("invoke loop", DEFAULT_SERVERS, _demo_prompts(), c, args.requests, llm, pids, *_options(args)))
+                print(f"  llm calls: {llm.calls - before}")
+                before = llm.calls
+                _run(drive_batch(f"invoke_many batch={args.batch_size}", DEFAULT_SERVERS, _demo_prompts(), c,
+                                 args.requests, llm, pids, *_options(args), batch_size=args.batch_size))
+                print(f"  llm calls: {llm.calls - before}")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+def scenario_catalog(args, llm: StubOpenAI) -> None:
+    for size in args.catalog_sizes:
+        proc = start_server(["benchmarks/synthetic_server.py", "--port", str(SYNTHETIC_PORT), "--tools", str(size)], SYNTHETIC_PORT)
+        try:
+            tools = [ToolSpec(f"synth.{t.tool_id.split('.', 1)[1]}", t.description, t.input_schema) for t in synthetic_catalog(size)]
+            prompts = [p for p, _ in synthetic_prompts(tools)]
+            random.Random(5).shuffle(prompts)
+            for c in args.concurrency:
+                _run(drive(f"catalog {size} tools", {"synth": f"http://127.0.0.1:{SYNTHETIC_PORT}"}, prompts, c,
+                           args.requests, llm, [proc.pid], *_options(args)))
+        finally:
+            stop_servers([proc])
+
+def _build_corpus(size: int, tmp: str) -> List[str]:
+    """Build a kb store of ``size`` synthetic docs under ``tmp``/store; returns queries against it."""
+    corpus = os.path.join(tmp, "corpus.jsonl")
+    queries: List[str] = []
+    with open(corpus, "w", encoding="utf-8") as f:
+        for i, doc in enumerate(synthetic_docs(size)):
+            f.write(json.dumps(doc) + "\n")
+            if i < 200:
+                words = doc["body"].split()
+                queries.append(f"What is the procedure for {' '.join(words[5:8])}?")
+    build_store([corpus], os.path.join(tmp, "store"))
+    return queries
+
+def scenario_corpus(args, llm: StubOpenAI) -> None:
+    for size in args.corpus_sizes:
+        tmp = tempfile.mkdtemp(prefix="loadtest-kb-")
+        try:
+            queries = _build_corpus(size, tmp)
+            with local_servers(["kb"], env={"KB_STORE_DIR": os.path.join(tmp, "store")}) as procs:
+                for c in args.concurrency:
+                    _run(drive(f"corpus {size} docs", {"kb": DEFAULT_SERVERS["kb"]}, queries, c, args.requests, llm,
+                               [p.pid for p in procs], *_options(args)))
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+def scenario_replicas(args, llm: StubOpenAI) -> None:
+    """One logical kb server backed by N kb_server processes on the same store."""
+    tmp = tempfile.mkdtemp(prefix="loadtest-kb-")
+    try:
+        queries = _build_corpus(args.replica_corpus, tmp)
+        for count in args.replica_counts:
+            procs = []
+            try:
+                endpoints = []
+                for i in range(count):
+                    port = SYNTHETIC_PORT + i
+                    env = {"KB_PORT": str(port), "KB_STORE_DIR": os.path.join(tmp, "store")}
+                    procs.append(start_server(["servers/kb_server.py"], port, env))
+                    endpoints.append(f"http://127.0.0.1:{port}")
+                for c in args.concurrency:
+                    _run(drive(f"kb x{count} replicas", {"kb": endpoints}, queries, c, args.requests, llm,
+                               [p.pid for p in procs], *_options(args)))
+            finally:
+                stop_servers(procs)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+def scenario_servers(args, llm: StubOpenAI) -> None:
+    domains = list(DOMAINS)
+    for count in args.server_counts:
+        procs = []
+        servers: Dict[str, str] = {}
+        try:
+            for i in range(count):
+                port = SYNTHETIC_PORT + i
+                # Each server owns a disjoint slice of the domains
+                owned = domains[i::count]
+                procs.append(start_server(
+                    ["benchmarks/synthetic_server.py", "--port", str(port), "--domains", ",".join(owned)], port,
+                ))
+                servers[f"synth{i}"] = f"http://127.0.0.1:{port}"
+            tools = [ToolSpec(f"synth.{t.tool_id.split('.', 1)[1]}", t.description, t.input_schema) for t in synthetic_catalog(10_000)]
+            prompts = [p for p, _ in synthetic_prompts(tools, per_tool=1)]
+            random.Random(5).shuffle(prompts)
+            for c in args.concurrency:
+                _run(drive(f"{count} servers", servers, prompts, c, args.requests, llm,
+                           [p.pid for p in procs], *_options(args)))
+        finally:
+            stop_servers(procs)
+
+SCENARIOS = {
+    "baseline": scenario_baseline,
+    "catalog": scenario_catalog,
+    "corpus": scenario_corpus,
+    "servers": scenario_servers,
+    "replicas": scenario_replicas,
+    "batch": scenario_batch,
+}
+
+def _ints(text: str) -> List[int]:
+    return [int(x) for x in text.split(",") if x]
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=[*SCENARIOS, "all"], default="baseline")
+    parser.add_argument("--concurrency", type=_ints, default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=300, help="invokes per run")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--route-cache", action="store_true", help="enable the route cache (repeats skip the LLM)")
+    parser.add_argument("--result-cache", action="store_true", help="enable the tool result cache")
+    parser.add_argument("--fast-path", action="store_true", help="try FastPathRouter before the LLM")
+    parser.add_argument("--catalog-sizes", type=_ints, default=[10, 100, 200])
+    parser.add_argument("--corpus-sizes", type=_ints, default=[1_000, 100_000])
+    parser.add_argument("--server-counts", type=_ints, default=[1, 2, 4])
+    parser.add_argument("--replica-counts", type=_ints, default=[1, 2, 4])
+    parser.add_argument("--batch-size", type=int, default=16, help="requests per router call in the batch scenario")
+    parser.add_argument("--replica-corpus", type=int, default=100_000, help="kb docs served by every replica")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    llm = StubOpenAI(args.llm_latency_ms, args.llm_jitter_ms)
+    print(f"stub LLM latency {args.llm_latency_ms:.0f}+{args.llm_jitter_ms:.0f} ms, "
+          f"route cache {'on' if args.route_cache else 'off'}, result cache {'on' if args.result_cache else 'off'}, "
+          f"fast path {'on' if args.fast_path else 'off'}")
+    for name in (SCENARIOS if args.scenario == "all" else [args.scenario]):
+        SCENARIOS[name](args, llm)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""FastMCP server exposing synthetic tools, for catalog-size and server-count load tests.
+
+Usage: python benchmarks/synthetic_server.py --port 8100 [--tools 50] [--domains crm,billing] [--transport http]
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+from typing import Any, Callable, Dict
+
+from fastmcp import FastMCP
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.common import DOMAINS, synthetic_catalog  # noqa: E402
+
+def _handler(name: str) -> Callable[..., Dict[str, Any]]:
+    def handler(query: str, days: int = 30) -> Dict[str, Any]:
+        return {"tool": name, "query": query, "days": days, "count": 0, "items": []}
+    return handler
+
+def build_server(n_tools: int, domains: list) -> FastMCP:
+    mcp = FastMCP("synthetic")
+    tools = [t for t in synthetic_catalog(10_000) if not domains or t.tool_id.split(".", 1)[0] in domains]
+    for tool in tools[:n_tools]:
+        name = tool.tool_id.split(".", 1)[1]
+        mcp.tool(name=name, description=tool.description, annotations={"readOnlyHint": True})(_handler(name))
+    return mcp
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--tools", type=int, default=10_000, help="cap on the number of tools")
+    parser.add_argument("--domains", default="", help=f"comma-separated subset of {', '.join(DOMAINS)}")
+    parser.add_argument("--transport", choices=["sse", "http"], default="sse", help="http serves streamable HTTP at /mcp")
+    args = parser.parse_args()
+    domains = [d for d in args.domains.split(",") if d]
+    build_server(args.tools, domains).run(transport=args.transport, port=args.port)
+
+if __name__ == "__main__":
+    main()
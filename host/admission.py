@@ -0,0 +1,193 @@
+from __future__ import annotations
+import asyncio
+import collections
+import contextlib
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from host.telemetry import ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTIONS, ADMISSION_RUNNING, ADMISSION_WAIT_SECONDS
+from host.tenant_policy import TenantLimits
+
+logger = logging.getLogger(__name__)
+
+# Invokes running at once across all tenants unless a controller sets its own cap
+DEFAULT_MAX_CONCURRENT = 64
+
+class AdmissionRejected(RuntimeError):
+    """The tenant is over its rate or queue limits; retry after ``retry_after`` seconds."""
+
+    def __init__(self, message: str, retry_after: float, reason: str):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.reason = reason      # rate_limited, queue_full or queue_timeout
+
+@dataclass
+class _Waiter:
+    future: asyncio.Future
+    start: float              # virtual start tag
+    finish: float             # virtual finish tag
+    enqueued: float
+
+@dataclass
+class _TenantState:
+    limits: TenantLimits
+    tokens: float
+    updated: float
+    running: int = 0
+    finish: float = 0.0       # finish tag of the tenant's last queued request
+    queue: Deque[_Waiter] = field(default_factory=collections.deque)
+
+class AdmissionController:
+    """Admission control in front of ``MCPOrchestrator.invoke``.
+
+    Per tenant (from ``TenantLimits``): a token bucket of ``rate_per_sec`` with
+    ``burst`` capacity, at most ``max_concurrent`` running invokes, and a queue
+    of at most ``max_queued`` waiters, each waiting up to ``queue_timeout``.
+    Across tenants, at most ``max_concurrent`` invokes run at once and free
+    slots go to queued tenants by weighted fair queuing: each waiter gets a
+    virtual finish tag (its start tag plus ``1 / weight``) and the smallest
+    finish tag is dispatched first, so a flooding tenant only delays its own
+    queue. Over-limit requests fail fast with ``AdmissionRejected``.
+    ``max_concurrent=None`` removes the global cap, and with it fair queuing.
+    """
+
+    def __init__(self, max_concurrent: Optional[int] = DEFAULT_MAX_CONCURRENT):
+        self.max_concurrent = max_concurrent
+        self.running = 0
+        self._virtual = 0.0                    # start tag of the last dispatched request
+        self._service_s = 0.5                  # moving average of admitted invoke duration
+        self._tenants: Dict[str, _TenantState] = {}
+
+    def _state(self, tenant_id: str, limits: TenantLimits) -> _TenantState:
+        state = self._tenants.get(tenant_id)
+        if state is None:
+            state = self._tenants[tenant_id] = _TenantState(limits, tokens=float(limits.burst), updated=time.monotonic())
+        state.limits = limits  # policies may be reloaded
+        return state
+
+    def _reject(self, tenant_id: str, reason: str, retry_after: float, message: str) -> AdmissionRejected:
+        ADMISSION_REJECTIONS.inc(tenant=tenant_id, reason=reason)
+        logger.warning(f"⚠ Rejected request for tenant '{tenant_id}': {message}")
+        return AdmissionRejected(message, retry_after=round(retry_after, 3), reason=reason)
+
+    def _has_slot(self, state: _TenantState, limits: TenantLimits) -> bool:
+        return (
+            (self.max_concurrent is None or self.running < self.max_concurrent)
+            and (limits.max_concurrent is None or state.running < limits.max_concurrent)
+        )
+
+    def _grant(self, tenant_id: str, state: _TenantState, waited: float) -> None:
+        self.running += 1
+        state.running += 1
+        ADMISSION_RUNNING.set(state.running, tenant=tenant_id)
+        ADMISSION_WAIT_SECONDS.observe(waited, tenant=tenant_id)
+
+    def _release(self, tenant_id: str, state: _TenantState) -> None:
+        self.running -= 1
+        state.running -= 1
+        ADMISSION_RUNNING.set(state.running, tenant=tenant_id)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to the queued request with the smallest finish tag."""
+        while self.max_concurrent is None or self.running < self.max_concurrent:
+            best_id, best = "", None
+            for tenant_id, state in self._tenants.items():
+                while state.queue and state.queue[0].future.done():
+                    state.queue.popleft()  # gave up waiting
+                if not state.queue or (state.limits.max_concurrent is not None and state.running >= state.limits.max_concurrent):
+                    continue
+                if best is None or state.queue[0].finish < best.queue[0].finish:
+                    best_id, best = tenant_id, state
+            if best is None:
+                return
+            tenant_id, state = best_id, best
+            waiter = state.queue.popleft()
+            ADMISSION_QUEUE_DEPTH.set(len(state.queue), tenant=tenant_id)
+            self._virtual = waiter.start
+            self._grant(tenant_id, state, time.monotonic() - waiter.enqueued)
+            waiter.future.set_result(None)
+
+    def _check_rate(self, tenant_id: str, state: _TenantState, limits: TenantLimits, now: float) -> None:
+        if limits.rate_per_sec is None:
+            return
+        state.tokens = min(float(limits.burst), state.tokens + (now - state.updated) * limits.rate_per_sec)
+        state.updated = now
+        if state.tokens < 1.0:
+            retry_after = (1.0 - state.tokens) / limits.rate_per_sec
+            raise self._reject(tenant_id, "rate_limited", retry_after, f"rate limit of {limits.rate_per_sec:g}/s exceeded")
+
+    @staticmethod
+    def _take_token(state: _TenantState, limits: TenantLimits) -> None:
+        if limits.rate_per_sec is not None:
+            state.tokens -= 1.0
+
+    @staticmethod
+    def _refund_token(state: _TenantState, limits: TenantLimits) -> None:
+        if limits.rate_per_sec is not None:
+            state.tokens = min(float(limits.burst), state.tokens + 1.0)
+
+    def _queue_retry_after(self, state: _TenantState, limits: TenantLimits) -> float:
+        slots = min(limits.max_concurrent or math.inf, self.max_concurrent or math.inf)
+        slots = 1 if slots == math.inf else slots
+        return max(0.1, self._service_s * (len(state.queue) + 1) / slots)
+
+    @contextlib.asynccontextmanager
+    async def admit(self, tenant_id: str, limits: TenantLimits) -> AsyncIterator[None]:
+        """Hold a slot for one invoke; raises ``AdmissionRejected`` instead of queuing past the limits."""
+        now = time.monotonic()
+        state = self._state(tenant_id, limits)
+        self._check_rate(tenant_id, state, limits, now)
+
+        if not state.queue and self._has_slot(state, limits):
+            self._take_token(state, limits)
+            self._grant(tenant_id, state, 0.0)
+        else:
+            if len(state.queue) >= limits.max_queued:
+                raise self._reject(
+                    tenant_id, "queue_full", self._queue_retry_after(state, limits),
+                    f"{len(state.queue)} requests already queued",
+                )
+            self._take_token(state, limits)
+            await self._wait(tenant_id, state, limits, now)
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._service_s += 0.1 * ((time.monotonic() - started) - self._service_s)
+            self._release(tenant_id, state)
+
+    async def _wait(self, tenant_id: str, state: _TenantState, limits: TenantLimits, now: float) -> None:
+        start = max(self._virtual, state.finish)
+        state.finish = start + 1.0 / limits.weight
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), start, state.finish, now)
+        state.queue.append(waiter)
+        ADMISSION_QUEUE_DEPTH.set(len(state.queue), tenant=tenant_id)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=limits.queue_timeout)
+        except BaseException as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as we gave up: pass the slot on
+                self._release(tenant_id, state)
+            else:
+                waiter.future.cancel()
+                if waiter in state.queue:
+                    state.queue.remove(waiter)
+                ADMISSION_QUEUE_DEPTH.set(len(state.queue), tenant=tenant_id)
+                self._refund_token(state, limits)  # never admitted, so not charged
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._reject(
+                    tenant_id, "queue_timeout", self._queue_retry_after(state, limits),
+                    f"waited {limits.queue_timeout:g}s in the admission queue",
+                ) from None
+            raise
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {
+            tenant_id: {"running": state.running, "queued": len(state.queue), "tokens": round(state.tokens, 3)}
+            for tenant_id, state in self._tenants.items()
+        }
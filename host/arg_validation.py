@@ -0,0 +1,332 @@
+from __future__ import annotations
+import copy
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+# A compiled schema node: (value, path, errors) -> value, coerced where allowed.
+# Problems are appended to ``errors``; the returned value is then meaningless.
+Check = Callable[[Any, str, List[str]], Any]
+
+_JSON_TYPES = ("object", "array", "string", "integer", "number", "boolean", "null")
+_INT_RE = re.compile(r"[+-]?\d+")
+
+class ArgumentError(ValueError):
+    """Tool arguments do not match the tool's ``input_schema``."""
+
+    def __init__(self, tool_id: str, errors: List[str]):
+        super().__init__(f"Invalid arguments for {tool_id}: {'; '.join(errors)}")
+        self.tool_id = tool_id
+        self.errors = errors
+
+class ArgsValidator:
+    """A tool's ``input_schema`` compiled into nested closures.
+
+    Covers the JSON Schema that MCP servers publish for tool inputs: ``type``
+    (one or several), ``properties``/``required``/``additionalProperties``,
+    ``items``, ``enum``/``const``, string and array lengths, numeric bounds,
+    ``pattern``, ``anyOf``/``oneOf``/``allOf`` and local ``$ref``\\s. Other
+    keywords are not checked. ``oneOf`` is treated as ``anyOf``.
+
+    ``validate`` returns a new args dict. Missing properties get their schema
+    ``default``, and values an LLM commonly gets slightly wrong are coerced:
+    numeric strings to numbers, ``"true"``/``"false"`` to booleans, integral
+    floats to integers, numbers to strings and a lone value to a one-item
+    array.
+    """
+
+    def __init__(self, tool_id: str, schema: Dict[str, Any]):
+        self.tool_id = tool_id
+        self.schema = schema
+        self._refs: Dict[str, Check] = {}
+        self._check = self._compile(schema or {"type": "object"})
+
+    def validate(self, args: Any) -> Dict[str, Any]:
+        """Coerced copy of ``args`` with defaults filled in; raises ``ArgumentError``."""
+        errors: List[str] = []
+        value = self._check(args, "", errors)
+        if errors:
+            raise ArgumentError(self.tool_id, errors)
+        if not isinstance(value, dict):
+            raise ArgumentError(self.tool_id, [f"arguments must be an object, got {_kind(args)}"])
+        return value
+
+    def _compile(self, schema: Any) -> Check:
+        if not isinstance(schema, dict):
+            # true/false schemas
+            return _accept if schema is not False else _reject
+        checks: List[Check] = []
+
+        ref = schema.get("$ref")
+        if isinstance(ref, str):
+            checks.append(self._compile_ref(ref))
+        for key, combine in (("allOf", _all_of), ("anyOf", _any_of), ("oneOf", _any_of)):
+            branches = schema.get(key)
+            if isinstance(branches, list) and branches:
+                checks.append(combine([self._compile(branch) for branch in branches]))
+
+        types = schema.get("type")
+        if isinstance(types, str):
+            types = [types]
+        if types:
+            checks.append(self._compile_types([t for t in types if t in _JSON_TYPES], schema))
+        if "enum" in schema:
+            checks.append(_enum(list(schema["enum"])))
+        if "const" in schema:
+            checks.append(_enum([schema["const"]]))
+
+        if not checks:
+            return _accept
+        if len(checks) == 1:
+            return checks[0]
+
+        def check(value: Any, path: str, errors: List[str]) -> Any:
+            for step in checks:
+                value = step(value, path, errors)
+            return value
+        return check
+
+    def _compile_ref(self, ref: str) -> Check:
+        compiled = self._refs.get(ref)
+        if compiled is not None:
+            return compiled
+        cell: List[Check] = []
+
+        # Registered before compiling the target so recursive schemas terminate
+        def check(value: Any, path: str, errors: List[str]) -> Any:
+            return cell[0](value, path, errors)
+        self._refs[ref] = check
+        cell.append(self._compile(self._resolve(ref)))
+        return check
+
+    def _resolve(self, ref: str) -> Any:
+        if not ref.startswith("#"):
+            return True  # remote refs are not fetched; accept
+        node: Any = self.schema
+        for part in ref.lstrip("#").strip("/").split("/"):
+            if not part:
+                continue
+            part = part.replace("~1", "/").replace("~0", "~")
+            if not isinstance(node, dict) or part not in node:
+                return True
+            node = node[part]
+        return node
+
+    def _compile_types(self, types: List[str], schema: Dict[str, Any]) -> Check:
+        by_type = {t: self._compile_type(t, schema) for t in types}
+        if len(by_type) == 1:
+            return next(iter(by_type.values()))
+        expected = " or ".join(types)
+
+        def check(value: Any, path: str, errors: List[str]) -> Any:
+            # Exact type first, so a union never coerces a value it already accepts
+            exact = _json_type(value)
+            if exact in by_type or (exact == "integer" and "number" in by_type):
+                return by_type[exact if exact in by_type else "number"](value, path, errors)
+            for step in by_type.values():
+                attempt: List[str] = []
+                result = step(value, path, attempt)
+                if not attempt:
+                    return result
+            errors.append(f"{_where(path)}: expected {expected}, got {_kind(value)}")
+            return value
+        return check
+
+    def _compile_type(self, kind: str, schema: Dict[str, Any]) -> Check:
+        if kind == "object":
+            return self._compile_object(schema)
+        if kind == "array":
+            return self._compile_array(schema)
+        if kind == "string":
+            return _string(schema)
+        if kind in ("integer", "number"):
+            return _number(kind, schema)
+        if kind == "boolean":
+            return _boolean
+        return _null
+
+    def _compile_object(self, schema: Dict[str, Any]) -> Check:
+        properties = {name: self._compile(prop) for name, prop in (schema.get("properties") or {}).items()}
+        defaults = {
+            name: prop["default"]
+            for name, prop in (schema.get("properties") or {}).items()
+            if isinstance(prop, dict) and "default" in prop
+        }
+        required = [name for name in schema.get("required", []) if name not in defaults]
+        extra = schema.get("additionalProperties", True)
+        extra_check = None if extra is False else self._compile(extra) if isinstance(extra, dict) else _accept
+
+        def check(value: Any, path: str, errors: List[str]) -> Any:
+            if not isinstance(value, dict):
+                errors.append(f"{_where(path)}: expected object, got {_kind(value)}")
+                return value
+            out: Dict[str, Any] = {}
+            for name, item in value.items():
+                step = properties.get(name, extra_check)
+                if step is None:
+                    errors.append(f"{_where(path)}: unexpected property '{name}'")
+                    continue
+                out[name] = step(item, f"{path}.{name}" if path else name, errors)
+            for name in required:
+                if name not in value:
+                    errors.append(f"{_where(path)}: missing required property '{name}'")
+            for name, default in defaults.items():
+                if name not in out:
+                    out[name] = copy.deepcopy(default) if isinstance(default, (dict, list)) else default
+            return out
+        return check
+
+    def _compile_array(self, schema: Dict[str, Any]) -> Check:
+        items = self._compile(schema["items"]) if isinstance(schema.get("items"), (dict, bool)) else _accept
+        min_items = schema.get("minItems")
+        max_items = schema.get("maxItems")
+
+        def check(value: Any, path: str, errors: List[str]) -> Any:
+            if not isinstance(value, list):
+                if value is None:
+                    errors.append(f"{_where(path)}: expected array, got {_kind(value)}")
+                    return value
+                value = [value]
+            if min_items is not None and len(value) < min_items:
+                errors.append(f"{_where(path)}: expected at least {min_items} items, got {len(value)}")
+            if max_items is not None and len(value) > max_items:
+                errors.append(f"{_where(path)}: expected at most {max_items} items, got {len(value)}")
+            return [items(item, f"{path}[{i}]", errors) for i, item in enumerate(value)]
+        return check
+
+def _string(schema: Dict[str, Any]) -> Check:
+    min_length = schema.get("minLength")
+    max_length = schema.get("maxLength")
+    pattern = re.compile(schema["pattern"]) if isinstance(schema.get("pattern"), str) else None
+
+    def check(value: Any, path: str, errors: List[str]) -> Any:
+        if not isinstance(value, str):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                errors.append(f"{_where(path)}: expected string, got {_kind(value)}")
+                return value
+            value = str(value)
+        if min_length is not None and len(value) < min_length:
+            errors.append(f"{_where(path)}: shorter than {min_length} characters")
+        if max_length is not None and len(value) > max_length:
+            errors.append(f"{_where(path)}: longer than {max_length} characters")
+        if pattern is not None and not pattern.search(value):
+            errors.append(f"{_where(path)}: does not match pattern {pattern.pattern!r}")
+        return value
+    return check
+
+def _number(kind: str, schema: Dict[str, Any]) -> Check:
+    minimum = schema.get("minimum")
+    maximum = schema.get("maximum")
+    exclusive_min = schema.get("exclusiveMinimum")
+    exclusive_max = schema.get("exclusiveMaximum")
+    integer = kind == "integer"
+
+    def check(value: Any, path: str, errors: List[str]) -> Any:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            parsed = _parse_number(value, integer)
+            if parsed is None:
+                errors.append(f"{_where(path)}: expected {kind}, got {_kind(value)}")
+                return value
+            value = parsed
+        elif integer and not isinstance(value, int):
+            if not value.is_integer():
+                errors.append(f"{_where(path)}: expected integer, got {value!r}")
+                return value
+            value = int(value)
+        if minimum is not None and value < minimum:
+            errors.append(f"{_where(path)}: must be >= {minimum}")
+        if maximum is not None and value > maximum:
+            errors.append(f"{_where(path)}: must be <= {maximum}")
+        if isinstance(exclusive_min, (int, float)) and not isinstance(exclusive_min, bool) and value <= exclusive_min:
+            errors.append(f"{_where(path)}: must be > {exclusive_min}")
+        if isinstance(exclusive_max, (int, float)) and not isinstance(exclusive_max, bool) and value >= exclusive_max:
+            errors.append(f"{_where(path)}: must be < {exclusive_max}")
+        return value
+    return check
+
+def _parse_number(value: Any, integer: bool) -> Optional[float]:
+    if not isinstance(value, str):
+        return None
+    text = value.strip()
+    if _INT_RE.fullmatch(text):
+        return int(text)
+    if integer:
+        return None
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+    return number if number == number and abs(number) != float("inf") else None
+
+def _boolean(value: Any, path: str, errors: List[str]) -> Any:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+        return value.strip().lower() == "true"
+    errors.append(f"{_where(path)}: expected boolean, got {_kind(value)}")
+    return value
+
+def _null(value: Any, path: str, errors: List[str]) -> Any:
+    if value is not None:
+        errors.append(f"{_where(path)}: expected null, got {_kind(value)}")
+    return value
+
+def _enum(options: List[Any]) -> Check:
+    shown = ", ".join(repr(o) for o in options[:10])
+
+    def check(value: Any, path: str, errors: List[str]) -> Any:
+        # == alone would let True match 1
+        if not any(value == o and type(value) is type(o) for o in options):
+            errors.append(f"{_where(path)}: must be one of {shown}")
+        return value
+    return check
+
+def _all_of(branches: List[Check]) -> Check:
+    def check(value: Any, path: str, errors: List[str]) -> Any:
+        for step in branches:
+            value = step(value, path, errors)
+        return value
+    return check
+
+def _any_of(branches: List[Check]) -> Check:
+    def check(value: Any, path: str, errors: List[str]) -> Any:
+        first: Optional[List[str]] = None
+        for step in branches:
+            attempt: List[str] = []
+            result = step(value, path, attempt)
+            if not attempt:
+                return result
+            first = first or attempt
+        errors.extend(first or [f"{_where(path)}: matches no allowed schema"])
+        return value
+    return check
+
+def _accept(value: Any, path: str, errors: List[str]) -> Any:
+    return value
+
+def _reject(value: Any, path: str, errors: List[str]) -> Any:
+    errors.append(f"{_where(path)}: not allowed")
+    return value
+
+def _json_type(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    if isinstance(value, dict):
+        return "object"
+    return type(value).__name__
+
+def _kind(value: Any) -> str:
+    shown = repr(value)
+    return f"{_json_type(value)} {shown if len(shown) <= 40 else shown[:37] + '...'}"
+
+def _where(path: str) -> str:
+    return path or "arguments"
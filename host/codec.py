@@ -0,0 +1,73 @@
+from __future__ import annotations
+import abc
+import json
+import logging
+import os
+from typing import Any, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib codec is used instead
+    orjson = None
+
+Buffer = Union[bytes, bytearray, memoryview, str]
+
+class JSONCodec(abc.ABC):
+    """Encodes JSON-RPC messages to bytes and decodes SSE payloads."""
+
+    name = ""
+
+    @abc.abstractmethod
+    def dumps(self, obj: Any) -> bytes:
+        ...
+
+    @abc.abstractmethod
+    def loads(self, data: Buffer) -> Any:
+        """Decode ``data``; raises ValueError (``json.JSONDecodeError``) if malformed."""
+
+class StdlibCodec(JSONCodec):
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: Buffer) -> Any:
+        # SSE is always UTF-8; skip json's per-call encoding detection on bytes
+        if not isinstance(data, str):
+            data = str(data, "utf-8")
+        return json.loads(data)
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise RuntimeError("orjson is not installed")
+        self._fallback = StdlibCodec()
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # orjson rejects ints beyond 64 bits and non-str keys; json copes
+            return self._fallback.dumps(obj)
+
+    def loads(self, data: Buffer) -> Any:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        return orjson.loads(data)
+
+_default: Optional[JSONCodec] = None
+
+def default_codec() -> JSONCodec:
+    """orjson when installed, else the stdlib; ``MCP_JSON_CODEC=json`` forces the stdlib."""
+    global _default
+    if _default is None:
+        choice = os.getenv("MCP_JSON_CODEC", "").lower()
+        if choice == "json" or (orjson is None and choice != "orjson"):
+            _default = StdlibCodec()
+        else:
+            _default = OrjsonCodec()
+        logger.debug("Using %s codec for MCP messages", _default.name)
+    return _default
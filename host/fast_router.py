@@ -0,0 +1,193 @@
+from __future__ import annotations
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Pattern, Protocol, Tuple
+
+from host.oai_router import RouteDecision
+from host.types import ToolSpec
+
+class PreRouter(Protocol):
+    """A routing stage tried before the LLM; returns None to defer."""
+
+    def route(self, user_input: str, tools: List[ToolSpec]) -> Optional[RouteDecision]:
+        ...
+
+ASSET_ID = r"\b([A-Z][A-Z0-9]{1,9}-\d+)\b"
+
+@dataclass(frozen=True)
+class ToolRule:
+    tool_id: str
+    intent: str                                                # must match for the tool to be a candidate
+    arg_patterns: Dict[str, str] = field(default_factory=dict)  # property -> regex with one group
+    exclude: Optional[str] = None                              # defer to the LLM when this matches
+    filter_terms: Dict[str, str] = field(default_factory=dict)  # property -> regex; every match is appended to it
+
+DEFAULT_RULES: List[ToolRule] = [
+    ToolRule(
+        tool_id="tickets.tickets_create",
+        intent=r"\b(create|open|file|raise|log|submit)\s+(a\s+|an\s+|new\s+)*ticket\b",
+        arg_patterns={"summary": r"\bticket\s+(?:for|about|on)\s+(.+?)$"},
+    ),
+    ToolRule(
+        tool_id="tickets.tickets_search",
+        intent=r"\b(find|search|show|list|get|any)\b.*\btickets\b|\btickets\s+(for|on|about)\b",
+        arg_patterns={"query": ASSET_ID},
+        # Status words are query terms too; dropping them would widen the search
+        filter_terms={"query": r"\b(open|closed|in[_ ]progress)\b"},
+    ),
+    ToolRule(
+        tool_id="kb.kb_query",
+        # A leading wh-word alone is no kb intent: "What tickets are open for QRT-9?"
+        intent=r"\b(first response|procedure|troubleshoot\w*|diagnos\w*|docs?|documentation|guide|manual)\b"
+               r"|^how\s+(do|to|can|should)\b",
+        exclude=r"\btickets?\b|\bT-\d+\b",
+    ),
+]
+
+def _schema_pattern(name: str, prop: Dict[str, Any]) -> Optional[str]:
+    """Derive an extraction regex from a property's name and JSON type."""
+    kind = prop.get("type")
+    lname = name.lower()
+    if kind == "integer":
+        if "day" in lname:
+            return r"\b(?:last|past|previous)\s+(\d+)\s+days?\b"
+        if lname in ("k", "n", "limit", "top", "top_k"):
+            return r"\btop\s+(\d+)\b"
+    if kind == "string":
+        if "enum" in prop:
+            return r"\b(" + "|".join(re.escape(str(v)) for v in prop["enum"]) + r")\b"
+        if "asset" in lname or lname.endswith("_id"):
+            return ASSET_ID
+    return None
+
+@dataclass
+class _CompiledRule:
+    tool_id: str
+    intent: Pattern
+    extractors: Dict[str, Tuple[Pattern, str]]  # property -> (regex, json type)
+    required: List[str]
+    filters: Dict[str, Pattern]  # property -> regex whose matches are appended to the extracted value
+    free_text: Optional[str]  # required string property filled with the whole request
+
+class FastPathRouter:
+    """Rule-based pre-router for requests that obviously map to one tool.
+
+    A request takes the fast path only when exactly one rule's intent matches,
+    that tool is in the tenant's allowed set, and every required argument can
+    be extracted and type-checked against the tool's ``input_schema``. A
+    request naming more than one asset id is left to the router.
+    A rule's ``exclude`` pattern vetoes its match, and ``filter_terms`` carry
+    filter words (e.g. ticket status) into an extracted argument instead of
+    dropping them. Anything ambiguous returns None so the LLM router decides.
+    """
+
+    def __init__(self, rules: Optional[List[ToolRule]] = None):
+        self.rules = {r.tool_id: r for r in (rules if rules is not None else DEFAULT_RULES)}
+        self._intents = {tool_id: re.compile(r.intent, re.IGNORECASE) for tool_id, r in self.rules.items()}
+        self._excludes = {
+            tool_id: re.compile(r.exclude, re.IGNORECASE) for tool_id, r in self.rules.items() if r.exclude
+        }
+        # (tool_id, id(input_schema)) -> compiled rule; schemas are immutable per catalog version
+        self._compiled: Dict[Tuple[str, int], Tuple[Dict[str, Any], _CompiledRule]] = {}
+
+    def _compile(self, tool: ToolSpec) -> _CompiledRule:
+        key = (tool.tool_id, id(tool.input_schema))
+        hit = self._compiled.get(key)
+        if hit is not None and hit[0] is tool.input_schema:
+            return hit[1]
+
+        rule = self.rules[tool.tool_id]
+        properties = tool.input_schema.get("properties", {})
+        required = list(tool.input_schema.get("required", []))
+        extractors: Dict[str, Tuple[Pattern, str]] = {}
+        free_text = None
+        for name, prop in properties.items():
+            pattern = rule.arg_patterns.get(name) or _schema_pattern(name, prop)
+            if pattern is not None:
+                flags = 0 if pattern == ASSET_ID else re.IGNORECASE
+                extractors[name] = (re.compile(pattern, flags), prop.get("type", "string"))
+            elif prop.get("type") == "string" and name in required and free_text is None:
+                free_text = name
+
+        compiled = _CompiledRule(
+            tool_id=tool.tool_id,
+            intent=self._intents[tool.tool_id],
+            extractors=extractors,
+            required=required,
+            filters={
+                name: re.compile(pattern, re.IGNORECASE)
+                for name, pattern in rule.filter_terms.items() if name in properties
+            },
+            free_text=free_text,
+        )
+        self._compiled[key] = (tool.input_schema, compiled)
+        return compiled
+
+    def route(self, user_input: str, tools: List[ToolSpec]) -> Optional[RouteDecision]:
+        text = user_input.strip()
+        matched = [tool_id for tool_id, intent in self._intents.items() if intent.search(text)]
+        if len(matched) != 1:
+            return None
+        exclude = self._excludes.get(matched[0])
+        if exclude is not None and exclude.search(text):
+            return None
+
+        tool = next((t for t in tools if t.tool_id == matched[0]), None)
+        if tool is None:
+            # The obvious tool is not allowed for this tenant; let the router explain
+            return None
+
+        rule = self._compile(tool)
+        args: Dict[str, Any] = {}
+        for name, (pattern, kind) in rule.extractors.items():
+            if pattern.pattern == ASSET_ID:
+                # One argument cannot hold "CVX-12 and CVX-14"; the router plans multi-asset requests
+                assets = set(pattern.findall(text))
+                if len(assets) > 1:
+                    return None
+            m = pattern.search(text)
+            if m is None:
+                continue
+            value = m.group(1).strip()
+            args[name] = int(value) if kind == "integer" else value
+        for name, pattern in rule.filters.items():
+            if name not in args:
+                continue  # filled from the whole request, or missing: nothing to carry over
+            terms = [args[name]]
+            for term in pattern.findall(text):
+                term = term.lower().replace(" ", "_")
+                if term not in terms:
+                    terms.append(term)
+            args[name] = " ".join(terms)
+        if rule.free_text and rule.free_text not in args:
+            args[rule.free_text] = text
+
+        if any(name not in args for name in rule.required):
+            return None
+        return RouteDecision(tool_id=tool.tool_id, args=args)
+
+class RoutingStats:
+    """Fast-path hit rate and a moving average of fallback router latency."""
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self.fast_path_hits = 0
+        self.router_calls = 0
+        self.router_ms_avg: Optional[float] = None
+
+    def record(self, source: str, duration_ms: float) -> float:
+        """Count one routing decision; returns the estimated ms saved by the fast path."""
+        if source == "fast_path":
+            self.fast_path_hits += 1
+            return max(0.0, (self.router_ms_avg or 0.0) - duration_ms)
+        self.router_calls += 1
+        if self.router_ms_avg is None:
+            self.router_ms_avg = duration_ms
+        else:
+            self.router_ms_avg += self.alpha * (duration_ms - self.router_ms_avg)
+        return 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.fast_path_hits + self.router_calls
+        return self.fast_path_hits / total if total else 0.0
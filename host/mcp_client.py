@@ -0,0 +1,266 @@
+from __future__ import annotations
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
+import logging
+import httpx
+import asyncio
+import uuid
+
+from host.codec import JSONCodec, default_codec
+from host.telemetry import span
+from host.transports import SessionExpiredError, Transport, make_transport
+from host.types import ToolEvent
+
+logger = logging.getLogger(__name__)
+
+NotificationHandler = Callable[[Dict[str, Any]], None]
+
+class MCPError(Exception):
+    """The server answered a request with a JSON-RPC error."""
+
+class FastMCPClient:
+    """Client for FastMCP servers.
+
+    Messages travel over ``transport``: ``"sse"`` (HTTP+SSE, the default),
+    ``"http"`` (streamable HTTP) or ``"inproc"`` (a FastMCP object in this
+    process; ``base_url`` is then ``module:attribute``), see
+    ``host/transports.py``. Responses are matched to their request by JSON-RPC
+    ``id``, so any number of requests can be in flight on one session
+    (bounded by ``max_in_flight``). Messages are encoded and decoded with
+    ``codec`` (orjson when installed).
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        max_in_flight: int = 256,
+        codec: Optional[JSONCodec] = None,
+        transport: Union[str, Transport] = "sse",
+    ):
+        self.base_url = base_url
+        self.codec = codec or default_codec()
+        self.transport = transport if isinstance(transport, Transport) else make_transport(transport, base_url, self.codec)
+        self._ready = False
+        self.max_in_flight = max_in_flight
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._connect_lock = asyncio.Lock()
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._notification_handlers: List[NotificationHandler] = []
+        # progressToken -> sink for notifications/progress of a streaming call
+        self._progress: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+
+    @property
+    def is_connected(self) -> bool:
+        """True once the handshake finished and while the transport's session is still open."""
+        return self._ready and self.transport.is_open
+
+    @property
+    def session_id(self) -> Optional[str]:
+        return self.transport.session_id
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently awaiting a response."""
+        return len(self._pending)
+
+    def add_notification_handler(self, handler: NotificationHandler) -> None:
+        """Register a callback for server-initiated messages (no ``id`` match)."""
+        self._notification_handlers.append(handler)
+
+    async def _post(self, client: httpx.AsyncClient, request: Dict[str, Any], timeout: float) -> None:
+        """Hand a JSON-RPC message to the transport."""
+        await self.transport.send(client, request, timeout)
+
+    def _dispatch(self, message: Dict[str, Any]) -> None:
+        """Route one JSON-RPC message from the server."""
+        msg_id = message.get("id")
+        if msg_id is not None and "method" not in message:
+            future = self._pending.pop(str(msg_id), None)
+            if future is None:
+                # Caller already timed out or was cancelled
+                logger.debug("  Dropping response for unknown request %s", msg_id)
+            elif not future.done():
+                future.set_result(message)
+            return
+
+        if message.get("method") == "notifications/progress":
+            params = message.get("params") or {}
+            sink = self._progress.get(str(params.get("progressToken")))
+            if sink is not None:
+                sink(params)
+                return
+
+        for handler in self._notification_handlers:
+            try:
+                handler(message)
+            except Exception as e:
+                logger.warning("  Notification handler failed: %s", e)
+
+    def _fail_pending(self, error: BaseException) -> None:
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    def _on_transport_error(self, error: BaseException, request_id: Optional[str]) -> None:
+        """The transport lost one request's response, or the whole session when ``request_id`` is None."""
+        if request_id is None:
+            self._fail_pending(error)
+            return
+        future = self._pending.pop(request_id, None)
+        if future is not None and not future.done():
+            future.set_exception(error)
+
+    async def connect(self, client: httpx.AsyncClient):
+        """Open a session over the transport."""
+        if self.is_connected:
+            return
+        async with self._connect_lock:
+            if self.is_connected:
+                return
+            if self._ready or self.transport.is_open:
+                # Previous session dropped; start over with a fresh one
+                await self.close()
+            try:
+                await self._open(client)
+            except SessionExpiredError:
+                raise
+            except ConnectionError as e:
+                # Nothing was sent, so callers may retry elsewhere
+                raise SessionExpiredError(f"Cannot open a session to {self.base_url}: {e}") from e
+
+    async def _open(self, client: httpx.AsyncClient):
+        try:
+            with span("connect", detail=self.base_url, server=self.base_url):
+                await self.transport.open(client, self._dispatch, self._on_transport_error)
+
+            with span("initialize", detail=self.base_url, server=self.base_url):
+                # Send initialize request
+                await self._request(
+                    client,
+                    "initialize",
+                    {
+                        "protocolVersion": self.transport.protocol_version,
+                        "capabilities": {},
+                        "clientInfo": {
+                            "name": "thin-mcp-orchestrator",
+                            "version": "1.0.0"
+                        }
+                    },
+                    timeout=10.0,
+                )
+                logger.info("  ✓ Session initialized")
+
+                # Complete the handshake so the server treats the session as ready
+                await self._post(client, {"jsonrpc": "2.0", "method": "notifications/initialized"}, timeout=10.0)
+            self._ready = True
+        except BaseException:
+            await self.close()
+            raise
+
+    async def _request(self, client: httpx.AsyncClient, method: str, params: Optional[Dict[str, Any]], timeout: float) -> Dict[str, Any]:
+        """Send one JSON-RPC request and wait for the response carrying its id."""
+        async with self._in_flight:
+            request_id = str(uuid.uuid4())
+            request: Dict[str, Any] = {"jsonrpc": "2.0", "id": request_id, "method": method}
+            if params is not None:
+                request["params"] = params
+
+            future = asyncio.get_running_loop().create_future()
+            self._pending[request_id] = future
+            try:
+                await self._post(client, request, timeout=timeout)
+                response = await asyncio.wait_for(future, timeout=timeout)
+            except asyncio.TimeoutError:
+                self._cancel_remote(client, request_id, "timeout")
+                raise ConnectionError(f"Timeout waiting for {method} response")
+            except asyncio.CancelledError:
+                self._cancel_remote(client, request_id, "cancelled by caller")
+                raise
+            finally:
+                self._pending.pop(request_id, None)
+
+        if "error" in response:
+            raise MCPError(f"MCP error: {response['error']}")
+        return response.get("result", {})
+
+    def _cancel_remote(self, client: httpx.AsyncClient, request_id: str, reason: str) -> None:
+        """Tell the server to stop working on a request we no longer wait for."""
+        if not self.is_connected:
+            return
+        notification = {
+            "jsonrpc": "2.0",
+            "method": "notifications/cancelled",
+            "params": {"requestId": request_id, "reason": reason},
+        }
+
+        async def _send() -> None:
+            try:
+                await self._post(client, notification, timeout=5.0)
+            except Exception as e:
+                logger.debug("  Could not send cancellation for %s: %s", request_id, e)
+
+        asyncio.create_task(_send())
+
+    async def list_tools(self, client: httpx.AsyncClient) -> List[Dict[str, Any]]:
+        """List available tools from the server."""
+        await self.connect(client)
+        result = await self._request(client, "tools/list", {}, timeout=10.0)
+        return result.get("tools", [])
+
+    async def call_tool(self, client: httpx.AsyncClient, tool_name: str, arguments: Dict[str, Any], timeout: float = 30.0) -> Any:
+        """Call a tool on the server."""
+        await self.connect(client)
+        return await self._request(
+            client,
+            "tools/call",
+            {
+                "name": tool_name,
+                "arguments": arguments
+            },
+            timeout=timeout,
+        )
+
+    async def stream_tool(
+        self, client: httpx.AsyncClient, tool_name: str, arguments: Dict[str, Any], timeout: float = 30.0
+    ) -> AsyncIterator[ToolEvent]:
+        """Call a tool, yielding progress as it arrives, then each content block, then the result.
+
+        The request carries a ``progressToken`` so servers that report progress
+        (FastMCP ``Context.report_progress``) reach the caller before the tool
+        finishes. Closing the iterator early cancels the call on the server.
+        """
+        await self.connect(client)
+        token = str(uuid.uuid4())
+        events: asyncio.Queue = asyncio.Queue()
+        self._progress[token] = events.put_nowait
+        call = asyncio.create_task(self._request(
+            client,
+            "tools/call",
+            {"name": tool_name, "arguments": arguments, "_meta": {"progressToken": token}},
+            timeout=timeout,
+        ))
+        # Progress is dispatched before the response, so the sentinel always comes last
+        call.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            while (params := await events.get()) is not None:
+                yield ToolEvent("progress", params)
+            result = call.result()
+        finally:
+            self._progress.pop(token, None)
+            if not call.done():
+                call.cancel()
+        for block in result.get("content", []):
+            yield ToolEvent("content", block)
+        yield ToolEvent("result", result)
+
+    async def ping(self, client: httpx.AsyncClient, timeout: float = 5.0) -> None:
+        """Round-trip an MCP ping to check the session is still alive."""
+        if not self.is_connected:
+            raise SessionExpiredError(f"No open session to {self.base_url}", self.session_id)
+        await self._request(client, "ping", None, timeout=timeout)
+
+    async def close(self):
+        """Close the transport and forget the session."""
+        await self.transport.close()
+        self._fail_pending(ConnectionError(f"Session to {self.base_url} closed"))
+        self._ready = False
@@ -1,20 +1,130 @@
 from __future__ import annotations
+import asyncio
 import json
-from typing import Any, Dict, List, Tuple
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
 from openai import AsyncOpenAI
 from pydantic import BaseModel, Field
 
+from host.route_cache import RouteCache
+from host.tool_catalog import catalog_fingerprint as _catalog_fingerprint
 from host.types import ToolSpec
 
 class RouteDecision(BaseModel):
     tool_id: str = Field(..., description="Must be one of the provided tool_ids.")
     args: Dict[str, Any] = Field(default_factory=dict, description="Arguments matching the tool's JSON schema.")
 
+class RoutePlan(BaseModel):
+    calls: List[RouteDecision] = Field(..., description="Independent tool calls; usually exactly one.")
+
+class IndexedPlan(BaseModel):
+    index: int = Field(..., description="The request's index in the batch.")
+    calls: List[RouteDecision] = Field(..., description="Independent tool calls for that request; usually exactly one.")
+
+class BatchPlan(BaseModel):
+    plans: List[IndexedPlan] = Field(..., description="One plan per request in the batch.")
+
+ROUTER_RULES = (
+    "You are a routing controller. Choose exactly one tool to call.\n"
+    "Rules:\n"
+    "- tool_id MUST match one of the provided tool_ids.\n"
+    "- args MUST satisfy the chosen tool's input_schema.\n"
+    "- If the request is informational, prefer kb.kb_query.\n"
+    "- If the request is operational on tickets, prefer tickets.* tools.\n"
+)
+
+# Appended after the catalog, so plan requests share the cached prompt prefix
+PLAN_RULES = (
+    "\nPlanning mode: instead of one tool, return `calls`, a list of 1 to {max_calls} tool calls.\n"
+    "- Use several calls only when the request asks for several independent things.\n"
+    "- Calls run concurrently: no call may depend on another call's result.\n"
+    "- Never repeat the same call.\n"
+)
+
+# Targeted re-ask when a call's args fail local validation; only that tool is sent
+REPAIR_RULES = (
+    "\nRepair mode: the args below were rejected by the tool's input_schema.\n"
+    "- Return the same tool_id with corrected args.\n"
+    "- Fix what the errors name; keep everything else as the user asked.\n"
+)
+
+# Appended after the catalog when several requests are planned in one completion
+BATCH_RULES = (
+    "\nBatch mode: the user turn is a JSON list of independent requests, each with an index.\n"
+    "- Return `plans`, one entry per request: its `index` and its `calls` (1 to {max_calls} tool calls).\n"
+    "- Plan every request on its own; never merge requests or share calls between them.\n"
+    "- Calls run concurrently: no call may depend on another call's result.\n"
+)
+
+# Schema keys dropped at each trim level when the catalog exceeds the token budget
+_TRIM_SCHEMA_KEYS = (
+    (),
+    ("description", "title", "examples"),
+    ("description", "title", "examples", "default"),
+)
+
+def _estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English/JSON; good enough for budgeting
+    return len(text) // 4 + 1
+
+def _strip_keys(schema: Any, keys: Tuple[str, ...]) -> Any:
+    """Copy of a JSON schema without annotation ``keys`` (property names are kept)."""
+    if isinstance(schema, list):
+        return [_strip_keys(item, keys) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    stripped = {}
+    for key, value in schema.items():
+        if key in keys:
+            continue
+        if key == "properties" and isinstance(value, dict):
+            stripped[key] = {name: _strip_keys(prop, keys) for name, prop in value.items()}
+        else:
+            stripped[key] = _strip_keys(value, keys)
+    return stripped
+
 class OAIRouter:
-    def __init__(self, client: AsyncOpenAI, model: str):
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        model: str,
+        cache: Optional[RouteCache] = None,
+        max_catalog_tokens: Optional[int] = None,
+    ):
         self.client = client
         self.model = model
+        self.cache = cache
+        # Token-budget mode: trim descriptions and schemas until the catalog fits
+        self.max_catalog_tokens = max_catalog_tokens
+        # Compiled once; identical for every request
+        self._response_format = {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "route_decision",
+                "schema": self._make_strict_schema(RouteDecision.model_json_schema()),
+                "strict": True
+            }
+        }
+        self._plan_response_format = {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "route_plan",
+                "schema": self._make_strict_schema(RoutePlan.model_json_schema()),
+                "strict": True
+            }
+        }
+        self._batch_response_format = {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "route_batch",
+                "schema": self._make_strict_schema(BatchPlan.model_json_schema()),
+                "strict": True
+            }
+        }
+        # catalog fingerprint -> system prompt holding the serialized tool brief
+        self._system_prompts: "OrderedDict[str, str]" = OrderedDict()
+        self._max_system_prompts = 256
 
     def _make_strict_schema(self, schema: Dict[str, Any]) -> Dict[str, Any]:
         """Add additionalProperties: false to all objects in schema for strict mode."""
@@ -30,48 +140,208 @@ class OAIRouter:
                             self._make_strict_schema(item)
         return schema
 
-    async def choose_tool(self, user_input: str, tools: List[ToolSpec]) -> RouteDecision:
-        # Compact tool list for the model
-        tool_brief = [
-            {
+    def _tool_brief(self, tools: List[ToolSpec], level: int) -> str:
+        """Compact JSON catalog; higher levels shorten descriptions and schemas."""
+        keys = _TRIM_SCHEMA_KEYS[min(level, len(_TRIM_SCHEMA_KEYS) - 1)]
+        brief = []
+        for t in tools:
+            description = t.description
+            if level >= 1:
+                # Keep the first line (the docstring summary for FastMCP tools)
+                description = description.strip().split("\n", 1)[0]
+            brief.append({
                 "tool_id": t.tool_id,
-                "description": t.description,
-                "input_schema": t.input_schema,
-            }
-            for t in tools
-        ]
-
-        schema = RouteDecision.model_json_schema()
-        # Make schema strict for OpenAI structured outputs
-        schema = self._make_strict_schema(schema)
-
-        prompt = (
-            "You are a routing controller. Choose exactly one tool to call.\n"
-            "Rules:\n"
-            "- tool_id MUST match one of the provided tool_ids.\n"
-            "- args MUST satisfy the chosen tool's input_schema.\n"
-            "- If the request is informational, prefer kb.kb_query.\n"
-            "- If the request is operational on tickets, prefer tickets.* tools.\n"
+                "description": description,
+                "input_schema": _strip_keys(t.input_schema, keys) if keys else t.input_schema,
+            })
+        return json.dumps(brief, separators=(",", ":"))
+
+    def _system_prompt(self, tools: List[ToolSpec], fingerprint: str) -> str:
+        """Rules plus tool catalog: a stable prefix per tenant view, so provider prompt caching applies."""
+        prompt = self._system_prompts.get(fingerprint)
+        if prompt is not None:
+            self._system_prompts.move_to_end(fingerprint)
+            return prompt
+
+        level = 0
+        brief = self._tool_brief(tools, level)
+        if self.max_catalog_tokens is not None:
+            while _estimate_tokens(brief) > self.max_catalog_tokens and level < len(_TRIM_SCHEMA_KEYS) - 1:
+                level += 1
+                brief = self._tool_brief(tools, level)
+        prompt = f"{ROUTER_RULES}\nAvailable tools:\n{brief}"
+
+        self._system_prompts[fingerprint] = prompt
+        while len(self._system_prompts) > self._max_system_prompts:
+            self._system_prompts.popitem(last=False)
+        return prompt
+
+    async def choose_tool(self, user_input: str, tools: List[ToolSpec], catalog_fingerprint: Optional[str] = None) -> RouteDecision:
+        """Pick one tool for the request, serving repeats from the route cache.
+
+        ``catalog_fingerprint`` identifies the tenant's tool view; it is computed
+        from ``tools`` when the caller does not already have it.
+        """
+        fingerprint = catalog_fingerprint or _catalog_fingerprint(tools)
+        if self.cache is None:
+            return await self._complete(user_input, tools, fingerprint)
+
+        key = self._cache_key(user_input, fingerprint, 1)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return RouteDecision.model_validate(cached)
+
+        decision = await self._complete(user_input, tools, fingerprint)
+        self.cache.put(key, decision.model_dump())
+        return decision
+
+    async def plan(
+        self,
+        user_input: str,
+        tools: List[ToolSpec],
+        catalog_fingerprint: Optional[str] = None,
+        max_calls: int = 1,
+    ) -> RoutePlan:
+        """Up to ``max_calls`` independent tool calls for the request.
+
+        With a budget of one this is ``choose_tool``; larger budgets use the
+        plan prompt and are cached separately per budget.
+        """
+        if max_calls <= 1:
+            return RoutePlan(calls=[await self.choose_tool(user_input, tools, catalog_fingerprint)])
+
+        fingerprint = catalog_fingerprint or _catalog_fingerprint(tools)
+        if self.cache is None:
+            return await self._complete_plan(user_input, tools, fingerprint, max_calls)
+
+        key = self._cache_key(user_input, fingerprint, max_calls)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return RoutePlan.model_validate(cached)
+
+        plan = await self._complete_plan(user_input, tools, fingerprint, max_calls)
+        self.cache.put(key, plan.model_dump())
+        return plan
+
+    async def plan_many(
+        self,
+        user_inputs: List[str],
+        tools: List[ToolSpec],
+        catalog_fingerprint: Optional[str] = None,
+        max_calls: int = 1,
+    ) -> List[RoutePlan]:
+        """Plans for several independent requests, in order, from one completion.
+
+        Repeats are served from the route cache. The rest are packed into one
+        request that sends the catalog once, under the same system prompt
+        prefix as ``plan``. A request the model leaves out of its answer is
+        planned on its own.
+        """
+        fingerprint = catalog_fingerprint or _catalog_fingerprint(tools)
+        plans: List[Optional[RoutePlan]] = [None] * len(user_inputs)
+        missing: List[int] = []
+        for i, user_input in enumerate(user_inputs):
+            cached = self.cache.get(self._cache_key(user_input, fingerprint, max_calls)) if self.cache is not None else None
+            if cached is None:
+                missing.append(i)
+            elif max_calls <= 1:
+                plans[i] = RoutePlan(calls=[RouteDecision.model_validate(cached)])
+            else:
+                plans[i] = RoutePlan.model_validate(cached)
+
+        if len(missing) > 1:
+            packed = await self._complete_batch([user_inputs[i] for i in missing], tools, fingerprint, max_calls)
+            for j, i in enumerate(missing):
+                plans[i] = packed.get(j)
+        left_out = [i for i in missing if plans[i] is None]
+        singles = await asyncio.gather(*(
+            self._complete_plan(user_inputs[i], tools, fingerprint, max_calls)
+            if max_calls > 1 else self._complete(user_inputs[i], tools, fingerprint)
+            for i in left_out
+        ))
+        for i, answer in zip(left_out, singles):
+            plans[i] = answer if isinstance(answer, RoutePlan) else RoutePlan(calls=[answer])
+        for i in missing:
+            self.remember(user_inputs[i], plans[i], fingerprint, max_calls)
+        return plans
+
+    @staticmethod
+    def _cache_key(user_input: str, fingerprint: str, max_calls: int) -> str:
+        return RouteCache.make_key(user_input, fingerprint if max_calls <= 1 else f"{fingerprint}:plan{max_calls}")
+
+    def remember(self, user_input: str, plan: RoutePlan, catalog_fingerprint: str, max_calls: int = 1) -> None:
+        """Replace the cached answer to ``plan(user_input, ...)``, e.g. once its args were repaired."""
+        if self.cache is None:
+            return
+        value = plan.calls[0].model_dump() if max_calls <= 1 else plan.model_dump()
+        self.cache.put(self._cache_key(user_input, catalog_fingerprint, max_calls), value)
+
+    async def repair(self, user_input: str, tool: ToolSpec, args: Dict[str, Any], errors: List[str]) -> RouteDecision:
+        """Ask again for the args of one call that failed local validation.
+
+        Only the offending tool's schema, the rejected args and the errors are
+        sent, so the prompt is short. The tool is kept whatever the model answers.
+        """
+        system = f"{ROUTER_RULES}\nAvailable tools:\n{self._tool_brief([tool], 0)}{REPAIR_RULES}"
+        rejected = json.dumps(args, separators=(",", ":"), default=str)
+        resp = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": f"User request: {user_input}\nRejected args: {rejected}\nErrors:\n- " + "\n- ".join(errors)},
+            ],
+            response_format=self._response_format,
         )
+        decision = RouteDecision.model_validate_json(resp.choices[0].message.content)
+        return RouteDecision(tool_id=tool.tool_id, args=decision.args)
 
-        # Use chat completions API with response_format for structured outputs
+    async def _complete_batch(
+        self, user_inputs: List[str], tools: List[ToolSpec], fingerprint: str, max_calls: int,
+    ) -> Dict[int, RoutePlan]:
+        """Plans by position in ``user_inputs``; requests the model skipped are missing."""
+        system = self._system_prompt(tools, fingerprint) + BATCH_RULES.format(max_calls=max_calls)
+        requests = json.dumps([{"index": i, "request": text} for i, text in enumerate(user_inputs)], ensure_ascii=False)
         resp = await self.client.chat.completions.create(
             model=self.model,
             messages=[
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": f"User request: {user_input}\n\nAvailable tools:\n{json.dumps(tool_brief, indent=2)}"},
+                {"role": "system", "content": system},
+                {"role": "user", "content": f"User requests:\n{requests}"},
             ],
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": "route_decision",
-                    "schema": schema,
-                    "strict": True
-                }
-            }
+            response_format=self._batch_response_format,
+        )
+        plans: Dict[int, RoutePlan] = {}
+        for entry in BatchPlan.model_validate_json(resp.choices[0].message.content).plans:
+            if 0 <= entry.index < len(user_inputs) and entry.index not in plans and entry.calls:
+                plans[entry.index] = RoutePlan(calls=entry.calls[:max_calls])
+        return plans
+
+    async def _complete_plan(self, user_input: str, tools: List[ToolSpec], fingerprint: str, max_calls: int) -> RoutePlan:
+        system = self._system_prompt(tools, fingerprint) + PLAN_RULES.format(max_calls=max_calls)
+        resp = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": f"User request: {user_input}"},
+            ],
+            response_format=self._plan_response_format,
+        )
+        plan = RoutePlan.model_validate_json(resp.choices[0].message.content)
+        # Over-long plans would fail the tenant's budget check; keep the first calls, as _complete_batch does
+        return RoutePlan(calls=plan.calls[:max_calls]) if len(plan.calls) > max_calls else plan
+
+    async def _complete(self, user_input: str, tools: List[ToolSpec], fingerprint: str) -> RouteDecision:
+        # Use chat completions API with response_format for structured outputs.
+        # The catalog sits in the system message so only the user turn varies.
+        resp = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": self._system_prompt(tools, fingerprint)},
+                {"role": "user", "content": f"User request: {user_input}"},
+            ],
+            response_format=self._response_format,
         )
 
         # Extract the JSON content from the response
         content = resp.choices[0].message.content
         decision = RouteDecision.model_validate_json(content)
-        return decision
\ No newline at end of file
+        return decision
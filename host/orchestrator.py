@@ -1,280 +1,706 @@
 from __future__ import annotations
-import json
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
-import logging
-import httpx
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
 import asyncio
-import uuid
+import contextlib
+import logging
+import time
 
-from host.tenant_policy import TENANTS
-from host.types import ToolSpec, ToolCallTrace
-from host.oai_router import OAIRouter
+from host.admission import AdmissionController, AdmissionRejected
+from host.arg_validation import ArgumentError
+from host.fast_router import PreRouter, RoutingStats
+from host.preview import preview
+from host.result_cache import ResultCache
+from host.route_cache import normalize_prompt
+from host.session_pool import MCPSessionPool
+from host.single_flight import SingleFlight
+from host.tool_catalog import ToolCatalog
+from host.tool_index import ToolShortlister
+from host.telemetry import (
+    ARGUMENT_REJECTIONS, BATCH_ITEMS, INVOCATIONS, INVOKE_SECONDS, TOOL_CALL_SECONDS, TOOL_CALLS, TOOL_CALLS_IN_FLIGHT,
+    StageRecorder, recording, span,
+)
+from host.tenant_policy import TENANTS, TenantPolicy
+from host.types import RoutingTrace, StageTiming, ToolEvent, ToolSpec, ToolCallTrace
+from host.oai_router import OAIRouter, RouteDecision, RoutePlan
 
 logger = logging.getLogger(__name__)
 
+# Receives (tool_id, event) for every streamed tool event; must not block
+ToolEventHandler = Callable[[str, ToolEvent], None]
+
+PREVIEW_CHARS = 300
+
 @dataclass
 class OrchestratorResult:
-    selected_tool: str
-    trace: List[ToolCallTrace]
-    result: Any
-
-class FastMCPClient:
-    """Client for FastMCP servers using SSE."""
-    
-    def __init__(self, base_url: str):
-        self.base_url = base_url
-        self.messages_endpoint = None
-        self.session_id = None
-        self.response_queue = asyncio.Queue()
-        self.sse_task = None
-        
-    async def _listen_sse(self, client: httpx.AsyncClient):
-        """Listen to SSE stream for responses."""
-        try:
-            async with client.stream("GET", f"{self.base_url}/sse", timeout=None) as response:
-                response.raise_for_status()
-                
-                async for line in response.aiter_lines():
-                    if line.startswith("event: endpoint"):
-                        continue
-                    elif line.startswith("data: "):
-                        data = line[6:].strip()
-                        
-                        # First message is the endpoint
-                        if data.startswith("/messages/"):
-                            self.messages_endpoint = f"{self.base_url}{data}"
-                            # Extract session ID from endpoint
-                            self.session_id = data.split("session_id=")[1]
-                            logger.info(f"  Got session: {self.session_id}")
-                            await self.response_queue.put({"type": "endpoint", "data": data})
-                        else:
-                            # JSON-RPC response
-                            try:
-                                json_data = json.loads(data)
-                                await self.response_queue.put(json_data)
-                            except json.JSONDecodeError:
-                                logger.warning(f"  Could not parse SSE data: {data}")
-        except Exception as e:
-            logger.error(f"  SSE listener error: {e}")
-            await self.response_queue.put({"error": str(e)})
-    
-    async def connect(self, client: httpx.AsyncClient):
-        """Start SSE connection."""
-        if self.sse_task:
-            return
-            
-        logger.info(f"  Starting SSE connection to {self.base_url}...")
-        
-        # Start SSE listener in background
-        self.sse_task = asyncio.create_task(self._listen_sse(client))
-        
-        # Wait for endpoint message
-        try:
-            msg = await asyncio.wait_for(self.response_queue.get(), timeout=5.0)
-            if msg.get("type") != "endpoint":
-                raise ConnectionError(f"Expected endpoint message, got: {msg}")
-        except asyncio.TimeoutError:
-            raise ConnectionError(f"Timeout waiting for endpoint from {self.base_url}")
-        
-        # Send initialize request
-        init_request = {
-            "jsonrpc": "2.0",
-            "id": str(uuid.uuid4()),
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {},
-                "clientInfo": {
-                    "name": "thin-mcp-orchestrator",
-                    "version": "1.0.0"
-                }
-            }
-        }
-        
-        # Post to messages endpoint
-        post_response = await client.post(
-            self.messages_endpoint,
-            json=init_request,
-            timeout=10.0
+    selected_tool: str                 # first planned call
+    trace: List[ToolCallTrace]         # one entry per call, in plan order
+    result: Any                        # the call's result, or a list in plan order for multi-call plans
+    unavailable_servers: List[str] = field(default_factory=list)  # skipped by degraded discovery
+    routing: Optional[RoutingTrace] = None
+    selected_tools: List[str] = field(default_factory=list)
+    stages: List[StageTiming] = field(default_factory=list)  # per-stage spans, in completion order
+
+@dataclass
+class BatchItem:
+    index: int                          # position in the invoke_many input
+    user_input: str
+    result: Optional[OrchestratorResult] = None
+    error: Optional[str] = None         # set instead of result when the item failed
+    duplicate_of: Optional[int] = None  # index of the identical input whose result this shares
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+@dataclass
+class _BatchGroup:
+    """An invoke_many input and the identical inputs that arrived while it was in flight."""
+    key: str                  # normalized input
+    index: int
+    user_input: str
+    duplicates: List[Tuple[int, str]] = field(default_factory=list)
+
+@dataclass
+class _BatchRoute:
+    plan: Optional[RoutePlan]
+    routing: Optional[RoutingTrace]
+    fingerprint: Optional[str] = None   # set for router plans, which still need validating
+    error: Optional[Exception] = None
+
+class MCPOrchestrator:
+    def __init__(
+        self,
+        router: OAIRouter,
+        pool: Optional[MCPSessionPool] = None,
+        catalog: Optional[ToolCatalog] = None,
+        pre_routers: Sequence[PreRouter] = (),
+        result_cache: Optional[ResultCache] = None,
+        admission: Optional[AdmissionController] = None,
+    ):
+        self.router = router
+        # Tried in order before the LLM router, e.g. FastPathRouter
+        self.pre_routers = list(pre_routers)
+        self.routing_stats = RoutingStats()
+        self.shortlister = ToolShortlister()
+        # Warm SSE sessions live in the pool and outlive individual invokes;
+        # servers and their replicas come from MCP_SERVERS_CONFIG (see host/server_registry.py)
+        self.pool = pool or MCPSessionPool()
+        self.servers = self.pool.sessions
+        self.catalog = catalog or ToolCatalog(self.pool)
+        # Read-only tool results, per tenant; pass a shared instance to reuse across orchestrators
+        self.result_cache = result_cache if result_cache is not None else ResultCache()
+        # Per-tenant rate limits, quotas and fair queuing from TenantLimits
+        self.admission = admission or AdmissionController()
+        # Identical routing and read-only tool calls in flight at once share one call
+        self.route_flights = SingleFlight()
+        self.tool_flights = SingleFlight()
+
+    async def _discover_tools(self) -> List[ToolSpec]:
+        """Discover tools from all FastMCP servers (served from the catalog cache)."""
+        return await self.catalog.tools()
+
+    async def _route(
+        self,
+        tenant_id: str,
+        policy: TenantPolicy,
+        user_input: str,
+        allowed: List[ToolSpec],
+        tools_by_id: Dict[str, ToolSpec],
+    ):
+        """Try the pre-routers, then fall back to the LLM router for a plan."""
+        start = time.perf_counter()
+        coalesced = False
+        plan = self._fast_path(user_input, allowed, tools_by_id)
+        if plan is not None:
+            source = "fast_path"
+            logger.info("✓ Fast path matched; skipping LLM router")
+        else:
+            source = "router"
+            candidates, fingerprint = self._candidates(tenant_id, policy, [user_input], allowed)
+            max_calls = policy.limits.max_calls_per_request
+            logger.info("Calling LLM router to plan tool calls...")
+            plan, coalesced = await self.route_flights.do(
+                (tenant_id, fingerprint, normalize_prompt(user_input), max_calls),
+                lambda: self._plan(user_input, candidates, tools_by_id, fingerprint, max_calls),
+            )
+            if coalesced:
+                logger.info("✓ Joined an identical routing call already in flight")
+
+        routing = self._routing_trace(source, (time.perf_counter() - start) * 1000, coalesced=coalesced)
+        return plan, routing
+
+    def _fast_path(self, user_input: str, allowed: List[ToolSpec], tools_by_id: Dict[str, ToolSpec]) -> Optional[RoutePlan]:
+        """The first pre-router decision whose args validate, as a one-call plan."""
+        for pre_router in self.pre_routers:
+            decision = pre_router.route(user_input, allowed)
+            if decision is None:
+                continue
+            try:
+                return RoutePlan(calls=[self._validate(decision, tools_by_id)])
+            except ArgumentError as e:
+                ARGUMENT_REJECTIONS.inc(tool=decision.tool_id, source="fast_path")
+                logger.warning(f"⚠ Fast path skipped: {e}")
+        return None
+
+    def _candidates(
+        self,
+        tenant_id: str,
+        policy: TenantPolicy,
+        user_inputs: Sequence[str],
+        allowed: List[ToolSpec],
+    ) -> Tuple[List[ToolSpec], str]:
+        """Tools shown to the router (the union of each request's shortlist) and the fingerprint naming them."""
+        fingerprint = self.catalog.fingerprint(tenant_id, policy)
+        picked: Dict[str, ToolSpec] = {}
+        for user_input in user_inputs:
+            for tool in self.shortlister.shortlist(fingerprint, allowed, user_input, policy.limits.shortlist_k):
+                picked.setdefault(tool.tool_id, tool)
+        candidates = list(picked.values())
+        if len(candidates) < len(allowed):
+            logger.info(f"  Shortlisted {len(candidates)}/{len(allowed)} tools for the router")
+            # The router caches prompts per fingerprint, so it must name the exact tool set
+            fingerprint = f"{fingerprint}:{','.join(t.tool_id for t in candidates)}"
+        return candidates, fingerprint
+
+    def _routing_trace(self, source: str, duration_ms: float, coalesced: bool = False, batch_size: int = 1) -> RoutingTrace:
+        saved_ms = self.routing_stats.record(source, duration_ms)
+        return RoutingTrace(
+            source=source,
+            duration_ms=round(duration_ms, 3),
+            saved_ms=round(saved_ms, 3),
+            fast_path_hit_rate=round(self.routing_stats.hit_rate, 4),
+            coalesced=coalesced,
+            batch_size=batch_size,
         )
-        post_response.raise_for_status()
-        
-        # Wait for initialize response on SSE
+
+    async def _plan(
+        self,
+        user_input: str,
+        candidates: List[ToolSpec],
+        tools_by_id: Dict[str, ToolSpec],
+        fingerprint: str,
+        max_calls: int,
+    ) -> RoutePlan:
+        plan = await self.router.plan(user_input, candidates, catalog_fingerprint=fingerprint, max_calls=max_calls)
+        return await self._checked(user_input, plan, tools_by_id, fingerprint, max_calls)
+
+    async def _checked(
+        self,
+        user_input: str,
+        plan: RoutePlan,
+        tools_by_id: Dict[str, ToolSpec],
+        fingerprint: str,
+        max_calls: int,
+    ) -> RoutePlan:
+        """The LLM router's plan with args validated locally; invalid calls are re-asked once."""
+        calls: List[RouteDecision] = []
+        invalid: List[Tuple[int, ArgumentError]] = []
+        for i, decision in enumerate(plan.calls):
+            try:
+                calls.append(self._validate(decision, tools_by_id))
+            except ArgumentError as e:
+                ARGUMENT_REJECTIONS.inc(tool=decision.tool_id, source="router")
+                calls.append(decision)
+                invalid.append((i, e))
+        if not invalid:
+            return RoutePlan(calls=calls)
+
+        repaired = await asyncio.gather(*(
+            self._repair(user_input, tools_by_id[plan.calls[i].tool_id], plan.calls[i], e) for i, e in invalid
+        ))
+        for (i, _), decision in zip(invalid, repaired):
+            calls[i] = decision
+        plan = RoutePlan(calls=calls)
+        # Cached plans are validated on every hit; do not pay for the repair again
+        self.router.remember(user_input, plan, fingerprint, max_calls)
+        return plan
+
+    def _validate(self, decision: RouteDecision, tools_by_id: Dict[str, ToolSpec]) -> RouteDecision:
+        """The decision with coerced args and defaults filled in; raises ``ArgumentError``."""
+        tool = tools_by_id.get(decision.tool_id)
+        if tool is None:
+            return decision  # not in the tenant's catalog; the policy check rejects it
+        args = self.catalog.validator(tool).validate(decision.args)
+        return decision if args == decision.args else RouteDecision(tool_id=decision.tool_id, args=args)
+
+    async def _repair(self, user_input: str, tool: ToolSpec, decision: RouteDecision, error: ArgumentError) -> RouteDecision:
+        logger.warning(f"⚠ {error}; asking the router to fix the call")
+        with span("repair", detail=tool.tool_id):
+            repaired = await self.router.repair(user_input, tool, decision.args, error.errors)
         try:
-            response = await asyncio.wait_for(self.response_queue.get(), timeout=10.0)
-            if "error" in response:
-                raise Exception(f"Initialize error: {response['error']}")
-            logger.info(f"  ✓ Session initialized")
-        except asyncio.TimeoutError:
-            raise ConnectionError(f"Timeout waiting for initialize response from {self.base_url}")
-        
-    async def list_tools(self, client: httpx.AsyncClient) -> List[Dict[str, Any]]:
-        """List available tools from the server."""
-        await self.connect(client)
-        
-        request_id = str(uuid.uuid4())
-        request = {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "method": "tools/list",
-            "params": {}
-        }
-        
-        # Send request
-        post_response = await client.post(
-            self.messages_endpoint,
-            json=request,
-            timeout=10.0
+            return self._validate(repaired, {tool.tool_id: tool})
+        except ArgumentError:
+            ARGUMENT_REJECTIONS.inc(tool=tool.tool_id, source="repair")
+            raise
+
+    async def _call(
+        self,
+        tenant_id: str,
+        tool: ToolSpec,
+        decision: RouteDecision,
+        plan_start: float,
+        on_event: Optional[ToolEventHandler] = None,
+    ) -> Tuple[ToolCallTrace, Any]:
+        """Run one planned call; failures are recorded in the trace, not raised."""
+        server_name, tool_name = decision.tool_id.split(".", 1)
+        with span("tool_call", detail=decision.tool_id, tool=decision.tool_id, tenant=tenant_id):
+            trace, result = await self._call_tool(tenant_id, tool, decision, server_name, tool_name, plan_start, on_event)
+        if trace.cache_hit or trace.coalesced:
+            outcome = "cache_hit" if trace.cache_hit else "coalesced"
+        else:
+            outcome = "ok" if trace.ok else "error"
+        TOOL_CALLS.inc(tool=decision.tool_id, server=server_name, tenant=tenant_id, outcome=outcome)
+        TOOL_CALL_SECONDS.observe(trace.duration_ms / 1000, tool=decision.tool_id, server=server_name, tenant=tenant_id)
+        return trace, result
+
+    async def _call_tool(
+        self,
+        tenant_id: str,
+        tool: ToolSpec,
+        decision: RouteDecision,
+        server_name: str,
+        tool_name: str,
+        plan_start: float,
+        on_event: Optional[ToolEventHandler] = None,
+    ) -> Tuple[ToolCallTrace, Any]:
+        start = time.perf_counter()
+        cache = self.result_cache
+        ttl = cache.ttl_for(tool)
+        key = cache.make_key(tenant_id, decision.tool_id, decision.args) if ttl else None
+        result = cache.get(key) if key else None
+        cache_hit = result is not None
+        coalesced = False
+        error = None
+        if cache_hit:
+            logger.info("✓ %s served from result cache", decision.tool_id)
+            if on_event is not None:
+                _replay(on_event, decision.tool_id, result)
+        else:
+            generation = cache.generation(server_name)
+            try:
+                if tool.read_only:
+                    result, coalesced = await self._coalesced_call(tenant_id, decision, server_name, tool_name, on_event)
+                else:
+                    result = await self._run_tool(tenant_id, decision, server_name, tool_name, on_event)
+                logger.info("✓ %s succeeded", decision.tool_id)
+            except Exception as e:
+                logger.error(f"✗ Tool call failed: {decision.tool_id}: {e}", exc_info=True)
+                result, error = e, str(e)
+            if not tool.read_only:
+                # Writes (even failed ones may have applied) invalidate the server's reads
+                dropped = cache.invalidate_server(server_name)
+                if dropped:
+                    logger.info(f"  Invalidated {dropped} cached {server_name} results")
+            elif key and error is None and not coalesced and not (isinstance(result, dict) and result.get("isError")):
+                # A joined call was stored by the caller that started it
+                cache.put(key, server_name, result, ttl, generation)
+        trace = ToolCallTrace(
+            tool_id=decision.tool_id,
+            args=decision.args,
+            ok=error is None,
+            error=error,
+            result_preview=preview(result, PREVIEW_CHARS) if error is None else "",
+            started_ms=round((start - plan_start) * 1000, 3),
+            duration_ms=round((time.perf_counter() - start) * 1000, 3),
+            cache_hit=cache_hit,
+            coalesced=coalesced,
         )
-        post_response.raise_for_status()
-        
-        # Wait for response on SSE
+        return trace, result
+
+    async def _run_tool(
+        self,
+        tenant_id: str,
+        decision: RouteDecision,
+        server_name: str,
+        tool_name: str,
+        on_event: Optional[ToolEventHandler] = None,
+    ) -> Any:
+        TOOL_CALLS_IN_FLIGHT.inc(server=server_name)
         try:
-            response = await asyncio.wait_for(self.response_queue.get(), timeout=10.0)
-            if "error" in response:
-                raise Exception(f"MCP error: {response['error']}")
-            return response.get("result", {}).get("tools", [])
-        except asyncio.TimeoutError:
-            raise ConnectionError(f"Timeout waiting for tools/list response")
-    
-    async def call_tool(self, client: httpx.AsyncClient, tool_name: str, arguments: Dict[str, Any]) -> Any:
-        """Call a tool on the server."""
-        await self.connect(client)
-        
-        request_id = str(uuid.uuid4())
-        request = {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "method": "tools/call",
-            "params": {
-                "name": tool_name,
-                "arguments": arguments
-            }
-        }
-        
-        # Send request
-        post_response = await client.post(
-            self.messages_endpoint,
-            json=request,
-            timeout=30.0
-        )
-        post_response.raise_for_status()
-        
-        # Wait for response on SSE
+            logger.info("Invoking %s on %s server...", tool_name, server_name)
+            if on_event is None:
+                return await self.pool.call_tool(server_name, tool_name, decision.args, key=tenant_id)
+            result = None
+            async for event in self.pool.stream_tool(server_name, tool_name, decision.args, key=tenant_id):
+                on_event(decision.tool_id, event)
+                result = event.data
+            return result
+        finally:
+            TOOL_CALLS_IN_FLIGHT.dec(server=server_name)
+
+    async def _coalesced_call(
+        self,
+        tenant_id: str,
+        decision: RouteDecision,
+        server_name: str,
+        tool_name: str,
+        on_event: Optional[ToolEventHandler] = None,
+    ) -> Tuple[Any, bool]:
+        """Read-only call shared with identical calls in flight; True if it joined one.
+
+        Only the caller that starts the call streams its progress. Callers that
+        join get the content replayed once the call completes, as for a cache hit.
+        """
+        handler: List[Optional[ToolEventHandler]] = [on_event]
+
+        def forward(tool_id: str, event: ToolEvent) -> None:
+            if handler[0] is not None:
+                handler[0](tool_id, event)
+
         try:
-            response = await asyncio.wait_for(self.response_queue.get(), timeout=30.0)
-            if "error" in response:
-                raise Exception(f"MCP error: {response['error']}")
-            return response.get("result", {})
-        except asyncio.TimeoutError:
-            raise ConnectionError(f"Timeout waiting for tools/call response")
-    
-    async def close(self):
-        """Close the SSE connection."""
-        if self.sse_task:
-            self.sse_task.cancel()
-            try:
-                await self.sse_task
-            except asyncio.CancelledError:
-                pass
+            result, coalesced = await self.tool_flights.do(
+                ResultCache.make_key(tenant_id, decision.tool_id, decision.args),
+                lambda: self._run_tool(tenant_id, decision, server_name, tool_name, forward if on_event else None),
+            )
+        finally:
+            handler[0] = None  # the call may outlive this caller; stop streaming to it
+        if coalesced:
+            logger.info("✓ %s joined an identical call already in flight", decision.tool_id)
+            if on_event is not None:
+                _replay(on_event, decision.tool_id, result)
+        return result, coalesced
 
-class MCPOrchestrator:
-    def __init__(self, router: OAIRouter):
-        self.router = router
-        self.servers = {
-            "tickets": FastMCPClient("http://127.0.0.1:8000"),
-            "kb": FastMCPClient("http://127.0.0.1:8001")
-        }
-
-    async def _discover_tools(self, client: httpx.AsyncClient) -> List[ToolSpec]:
-        """Discover tools from all FastMCP servers."""
-        tools: List[ToolSpec] = []
-        
-        for server_name, mcp_client in self.servers.items():
-            logger.info(f"Discovering tools from {server_name}...")
+    async def invoke(self, tenant_id: str, user_input: str, on_event: Optional[ToolEventHandler] = None) -> OrchestratorResult:
+        """Route and run ``user_input`` for the tenant.
+
+        With ``on_event``, tool calls are streamed: progress notifications and
+        content blocks are handed over as they arrive, before the invoke returns.
+        """
+        start = time.perf_counter()
+        tenant_label = tenant_id if tenant_id in TENANTS else "unknown"
+        outcome = "error"
+        policy = TENANTS.get(tenant_id)
+        with recording() as recorder:
             try:
-                server_tools = await mcp_client.list_tools(client)
-                logger.info(f"  ✓ Found {len(server_tools)} tools from {server_name}")
-                
-                for tool in server_tools:
-                    tool_id = f"{server_name}.{tool['name']}"
-                    tools.append(
-                        ToolSpec(
-                            tool_id=tool_id,
-                            description=tool.get('description', ''),
-                            input_schema=tool.get('inputSchema', {"type": "object", "properties": {}}),
-                        )
-                    )
-            except Exception as e:
-                logger.error(f"  ✗ Failed to discover tools from {server_name}: {e}")
-                raise ConnectionError(f"Cannot connect to {server_name} server at {mcp_client.base_url}. Is it running?")
-        
-        return tools
+                async with contextlib.AsyncExitStack() as admitted:
+                    if policy is not None:
+                        with span("admission"):
+                            await admitted.enter_async_context(self.admission.admit(tenant_id, policy.limits))
+                    result = await self._invoke(tenant_id, user_input, on_event)
+                outcome = "ok"
+            except AdmissionRejected:
+                outcome = "rejected"
+                raise
+            except PermissionError:
+                outcome = "denied"
+                raise
+            except ConnectionError:
+                outcome = "unavailable"
+                raise
+            finally:
+                INVOCATIONS.inc(tenant=tenant_label, outcome=outcome)
+                INVOKE_SECONDS.observe(time.perf_counter() - start, tenant=tenant_label)
+        result.stages = recorder.stages
+        return result
 
-    async def invoke(self, tenant_id: str, user_input: str) -> OrchestratorResult:
+    async def _invoke(self, tenant_id: str, user_input: str, on_event: Optional[ToolEventHandler] = None) -> OrchestratorResult:
         logger.info(f"Starting orchestration for tenant: {tenant_id}")
         policy = TENANTS.get(tenant_id)
         if not policy:
             raise ValueError(f"Unknown tenant: {tenant_id}")
 
-        logger.info("Connecting to FastMCP servers...")
+        allowed, unavailable = await self._allowed_tools(tenant_id, policy)
+        tools_by_id = {t.tool_id: t for t in allowed}
+        with span("routing"):
+            plan, routing = await self._route(tenant_id, policy, user_input, allowed, tools_by_id)
+        return await self._run_plan(tenant_id, policy, plan, tools_by_id, unavailable, routing, on_event)
+
+    async def _allowed_tools(self, tenant_id: str, policy: TenantPolicy) -> Tuple[List[ToolSpec], List[str]]:
+        """The tenant's reachable allowed tools and the servers discovery skipped."""
+        # Enforce tenant allowlist at the catalog level (precomputed per tenant)
+        with span("discovery"):
+            allowed = await self.catalog.tools_for(tenant_id, policy)
+        unavailable = self.catalog.unavailable()
+        if unavailable:
+            logger.warning(f"⚠ Routing without unavailable servers: {unavailable}")
+        if not allowed:
+            if unavailable:
+                raise ConnectionError(f"No allowed tools reachable; unavailable servers: {', '.join(unavailable)}")
+            raise PermissionError("No tools allowed for this tenant.")
         
-        try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                # Discover tools
-                logger.info("Discovering available tools...")
-                tool_specs = await self._discover_tools(client)
-                logger.info(f"✓ Found {len(tool_specs)} tools total: {[t.tool_id for t in tool_specs]}")
-
-                # Enforce tenant allowlist at the catalog level
-                allowed = [t for t in tool_specs if t.tool_id in policy.allowed_tools]
-                if not allowed:
-                    raise PermissionError("No tools allowed for this tenant.")
-                
-                logger.info(f"✓ Policy allows {len(allowed)} tools for tenant '{tenant_id}'")
-
-                logger.info("Calling LLM router to select tool...")
-                decision = await self.router.choose_tool(user_input, allowed)
-                logger.info(f"✓ Router selected: {decision.tool_id}")
-                logger.info(f"  Args: {decision.args}")
-                
+        logger.info(f"✓ Policy allows {len(allowed)} tools for tenant '{tenant_id}'")
+        return allowed, unavailable
+
+    async def _run_plan(
+        self,
+        tenant_id: str,
+        policy: TenantPolicy,
+        plan: RoutePlan,
+        tools_by_id: Dict[str, ToolSpec],
+        unavailable: List[str],
+        routing: RoutingTrace,
+        on_event: Optional[ToolEventHandler] = None,
+    ) -> OrchestratorResult:
+        """Check the plan against the tenant's policy, then run its calls."""
+        with span("policy"):
+            calls: List[RouteDecision] = []
+            for decision in plan.calls:
+                if decision not in calls:
+                    calls.append(decision)
+            if not calls:
+                raise ValueError("Router returned an empty plan.")
+            for decision in calls:
+                logger.info("✓ Router selected: %s", decision.tool_id)
+                logger.info("  Args: %s", decision.args)
                 if decision.tool_id not in policy.allowed_tools:
                     raise PermissionError(f"Tool denied by policy: {decision.tool_id}")
+            budget = policy.limits.max_calls_per_request
+            if len(calls) > budget:
+                raise PermissionError(f"Plan needs {len(calls)} tool calls; tenant limit is {budget}")
 
-                # Map tool_id -> server + tool name
-                server_name, tool_name = decision.tool_id.split(".", 1)
-                mcp_client = self.servers[server_name]
+        # Independent calls run concurrently, across servers
+        plan_start = time.perf_counter()
+        outcomes = await asyncio.gather(*(
+            self._call(tenant_id, tools_by_id.get(d.tool_id) or ToolSpec(d.tool_id, "", {}), d, plan_start, on_event)
+            for d in calls
+        ))
+        trace = [t for t, _ in outcomes]
+        results = [r for _, r in outcomes]
+        if not any(t.ok for t in trace):
+            raise results[0]
 
-                trace: List[ToolCallTrace] = []
-                try:
-                    logger.info(f"Invoking {tool_name} on {server_name} server...")
-                    result = await mcp_client.call_tool(client, tool_name, decision.args)
-                    logger.info(f"✓ Tool execution successful")
-
-                    trace.append(
-                        ToolCallTrace(
-                            tool_id=decision.tool_id,
-                            args=decision.args,
-                            ok=True,
-                            error=None,
-                            result_preview=str(result)[:300],
-                        )
-                    )
-                    return OrchestratorResult(selected_tool=decision.tool_id, trace=trace, result=result)
-                except Exception as e:
-                    logger.error(f"✗ Tool call failed: {e}", exc_info=True)
-                    trace.append(
-                        ToolCallTrace(
-                            tool_id=decision.tool_id,
-                            args=decision.args,
-                            ok=False,
-                            error=str(e),
-                            result_preview="",
-                        )
-                    )
-                    raise
+        return OrchestratorResult(
+            selected_tool=calls[0].tool_id,
+            trace=trace,
+            result=results[0] if len(results) == 1 else [r if t.ok else None for t, r in outcomes],
+            unavailable_servers=unavailable,
+            routing=routing,
+            selected_tools=[d.tool_id for d in calls],
+        )
+
+    async def invoke_many(
+        self,
+        tenant_id: str,
+        user_inputs: Union[Iterable[str], AsyncIterable[str]],
+        batch_size: int = 16,
+        max_concurrency: int = 8,
+        window: int = 256,
+    ) -> AsyncIterator[BatchItem]:
+        """Route and run a stream of requests for the tenant; yields items in completion order.
+
+        Inputs are read lazily and at most ``window`` items are held at once
+        (in flight or waiting to be consumed), so memory stays flat however
+        long the stream. An input identical after normalization to one still
+        in flight shares its result. The others are routed ``batch_size`` at a
+        time: pre-routers first, then one ``plan_many`` call for the rest. At
+        most ``max_concurrency`` items run tool calls at once, each admitted
+        like an invoke; admission rejections are waited out, not reported.
+        Failures are reported per item, never raised.
+        """
+        policy = TENANTS.get(tenant_id)
+        if not policy:
+            raise ValueError(f"Unknown tenant: {tenant_id}")
+        slots = asyncio.Semaphore(window)
+        scheduler = asyncio.Semaphore(max_concurrency)
+        pending: asyncio.Queue = asyncio.Queue()   # _BatchGroup, then None once the input is exhausted
+        done: asyncio.Queue = asyncio.Queue()      # BatchItem, the input count, or an exception that ends the run
+        in_flight: Dict[str, _BatchGroup] = {}
+        batches: Set[asyncio.Task] = set()
+
+        def finish(group: _BatchGroup, result: Optional[OrchestratorResult], error: Optional[Exception]) -> None:
+            # Forgotten and emitted in one step, so no later duplicate can miss the result
+            del in_flight[group.key]
+            message = None if error is None else str(error) or type(error).__name__
+            BATCH_ITEMS.inc(tenant=tenant_id, outcome=_batch_outcome(error))
+            done.put_nowait(BatchItem(group.index, group.user_input, result, message))
+            for index, user_input in group.duplicates:
+                BATCH_ITEMS.inc(tenant=tenant_id, outcome="duplicate")
+                done.put_nowait(BatchItem(index, user_input, result, message, duplicate_of=group.index))
+
+        async def feed() -> None:
+            count = 0
+            try:
+                async for user_input in _aiter(user_inputs):
+                    await slots.acquire()
+                    key = normalize_prompt(user_input)
+                    group = in_flight.get(key)
+                    if group is not None:
+                        group.duplicates.append((count, user_input))
+                    else:
+                        group = in_flight[key] = _BatchGroup(key, count, user_input)
+                        pending.put_nowait(group)
+                    count += 1
+            except Exception as e:
+                done.put_nowait(e)
+                return
+            pending.put_nowait(None)
+            done.put_nowait(count)
+
+        def settled(task: asyncio.Task) -> None:
+            batches.discard(task)
+            if not task.cancelled() and task.exception() is not None:
+                done.put_nowait(task.exception())  # its items would never be emitted
+
+        async def batch() -> None:
+            exhausted = False
+            while not exhausted:
+                groups = [await pending.get()]
+                while len(groups) < batch_size and not pending.empty():
+                    groups.append(pending.get_nowait())
+                if groups[-1] is None:
+                    exhausted = True
+                    groups.pop()
+                if groups:
+                    task = asyncio.ensure_future(self._run_batch(tenant_id, policy, groups, scheduler, finish))
+                    batches.add(task)
+                    task.add_done_callback(settled)
+
+        tasks = [asyncio.ensure_future(feed()), asyncio.ensure_future(batch())]
+        try:
+            count: Optional[int] = None
+            emitted = 0
+            while count is None or emitted < count:
+                item = await done.get()
+                if isinstance(item, Exception):
+                    raise item
+                if isinstance(item, int):
+                    count = item
+                    continue
+                emitted += 1
+                slots.release()
+                yield item
         finally:
-            # Clean up SSE connections
-            for mcp_client in self.servers.values():
-                await mcp_client.close()
\ No newline at end of file
+            # The consumer may stop early; nothing runs on its behalf afterwards
+            for task in (*tasks, *batches):
+                task.cancel()
+            await asyncio.gather(*tasks, *batches, return_exceptions=True)
+
+    async def _run_batch(
+        self,
+        tenant_id: str,
+        policy: TenantPolicy,
+        groups: List[_BatchGroup],
+        scheduler: asyncio.Semaphore,
+        finish: Callable[[_BatchGroup, Optional[OrchestratorResult], Optional[Exception]], None],
+    ) -> None:
+        """Route one invoke_many batch with a single router call, then run its items."""
+        with recording() as routed:
+            try:
+                allowed, unavailable = await self._allowed_tools(tenant_id, policy)
+                tools_by_id = {t.tool_id: t for t in allowed}
+                with span("routing"):
+                    routes = await self._route_many(tenant_id, policy, [g.user_input for g in groups], allowed, tools_by_id)
+            except Exception as e:
+                logger.error(f"✗ Batch of {len(groups)} failed before routing: {e}")
+                for group in groups:
+                    finish(group, None, e)
+                return
+
+        async def run(group: _BatchGroup, route: _BatchRoute) -> None:
+            result, error = await self._run_batch_item(
+                tenant_id, policy, group.user_input, route, routed, tools_by_id, unavailable, scheduler,
+            )
+            finish(group, result, error)
+
+        await asyncio.gather(*(run(group, route) for group, route in zip(groups, routes)))
+
+    async def _route_many(
+        self,
+        tenant_id: str,
+        policy: TenantPolicy,
+        user_inputs: List[str],
+        allowed: List[ToolSpec],
+        tools_by_id: Dict[str, ToolSpec],
+    ) -> List[_BatchRoute]:
+        """Pre-route each request; plan the rest with one router call over the union of their shortlists."""
+        routes: List[Optional[_BatchRoute]] = [None] * len(user_inputs)
+        waiting: List[int] = []
+        for i, user_input in enumerate(user_inputs):
+            start = time.perf_counter()
+            plan = self._fast_path(user_input, allowed, tools_by_id)
+            if plan is None:
+                waiting.append(i)
+            else:
+                routes[i] = _BatchRoute(plan, self._routing_trace("fast_path", (time.perf_counter() - start) * 1000))
+        if len(waiting) < len(user_inputs):
+            logger.info(f"✓ Fast path matched {len(user_inputs) - len(waiting)}/{len(user_inputs)} batch requests")
+        if waiting:
+            texts = [user_inputs[i] for i in waiting]
+            candidates, fingerprint = self._candidates(tenant_id, policy, texts, allowed)
+            start = time.perf_counter()
+            try:
+                plans = await self.router.plan_many(
+                    texts, candidates, catalog_fingerprint=fingerprint, max_calls=policy.limits.max_calls_per_request,
+                )
+            except Exception as e:
+                logger.error(f"✗ Router failed for a batch of {len(texts)}: {e}")
+                plans, error = [None] * len(texts), e
+            else:
+                error = None
+            duration_ms = (time.perf_counter() - start) * 1000
+            for i, plan in zip(waiting, plans):
+                routing = self._routing_trace("router", duration_ms, batch_size=len(waiting))
+                routes[i] = _BatchRoute(plan, routing, fingerprint, error)
+        return routes
+
+    async def _run_batch_item(
+        self,
+        tenant_id: str,
+        policy: TenantPolicy,
+        user_input: str,
+        route: _BatchRoute,
+        routed: StageRecorder,
+        tools_by_id: Dict[str, ToolSpec],
+        unavailable: List[str],
+        scheduler: asyncio.Semaphore,
+    ) -> Tuple[Optional[OrchestratorResult], Optional[Exception]]:
+        """One routed item: validate, wait for a scheduler slot and admission, run. Errors are returned."""
+        # The item's timeline starts with its batch: discovery and the shared routing call
+        with recording(origin=routed.origin) as recorder:
+            recorder.extend(routed)
+            if route.error is not None:
+                return None, route.error
+            try:
+                plan = route.plan
+                if route.fingerprint is not None:
+                    plan = await self._checked(
+                        user_input, plan, tools_by_id, route.fingerprint, policy.limits.max_calls_per_request,
+                    )
+                async with scheduler, contextlib.AsyncExitStack() as admitted:
+                    await self._admit_patiently(admitted, tenant_id, policy)
+                    result = await self._run_plan(tenant_id, policy, plan, tools_by_id, unavailable, route.routing)
+            except Exception as e:
+                logger.warning(f"⚠ Batch item failed: {e}")
+                return None, e
+        result.stages = recorder.stages
+        return result, None
+
+    async def _admit_patiently(self, stack: contextlib.AsyncExitStack, tenant_id: str, policy: TenantPolicy) -> None:
+        """Hold an admission slot on ``stack``, sleeping through rejections: batch work can wait."""
+        while True:
+            with span("admission"):
+                try:
+                    await stack.enter_async_context(self.admission.admit(tenant_id, policy.limits))
+                    return
+                except AdmissionRejected as e:
+                    retry_after = e.retry_after
+            await asyncio.sleep(retry_after)
+
+    async def aclose(self) -> None:
+        """Close pooled SSE sessions. Call once when the orchestrator is retired."""
+        await self.catalog.aclose()
+        await self.pool.aclose()
+
+def _replay(on_event: ToolEventHandler, tool_id: str, result: Any) -> None:
+    """Stream a result that was not streamed to this caller: its content blocks, then the result."""
+    for block in result.get("content", []) if isinstance(result, dict) else []:
+        on_event(tool_id, ToolEvent("content", block))
+    on_event(tool_id, ToolEvent("result", result))
+
+async def _aiter(items: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterator[str]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+def _batch_outcome(error: Optional[Exception]) -> str:
+    if error is None:
+        return "ok"
+    if isinstance(error, PermissionError):
+        return "denied"
+    if isinstance(error, ConnectionError):
+        return "unavailable"
+    return "error"
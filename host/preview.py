@@ -0,0 +1,60 @@
+from __future__ import annotations
+import json
+from typing import Any, List
+
+ELLIPSIS = "…"
+
+class _Budget:
+    """Output buffer that refuses to grow past ``limit`` characters."""
+
+    def __init__(self, limit: int):
+        self.parts: List[str] = []
+        self.remaining = limit
+        self.truncated = False
+
+    def write(self, text: str) -> bool:
+        if self.truncated:
+            return False
+        if len(text) > self.remaining:
+            self.parts.append(text[:self.remaining])
+            self.remaining = 0
+            self.truncated = True
+            return False
+        self.parts.append(text)
+        self.remaining -= len(text)
+        return True
+
+def _write(value: Any, out: _Budget) -> bool:
+    if isinstance(value, str):
+        # Only encode the part of the string that can still fit
+        return out.write(json.dumps(value[:out.remaining + 1], ensure_ascii=False))
+    if value is None or isinstance(value, (bool, int, float)):
+        return out.write(json.dumps(value))
+    if isinstance(value, dict):
+        if not out.write("{"):
+            return False
+        for i, (key, item) in enumerate(value.items()):
+            if (i and not out.write(", ")) or not _write(str(key), out) or not out.write(": ") or not _write(item, out):
+                return False
+        return out.write("}")
+    if isinstance(value, (list, tuple)):
+        if not out.write("["):
+            return False
+        for i, item in enumerate(value):
+            if (i and not out.write(", ")) or not _write(item, out):
+                return False
+        return out.write("]")
+    if isinstance(value, BaseException):
+        return out.write(f"{type(value).__name__}: {value}"[:out.remaining + 1])
+    return out.write(repr(value)[:out.remaining + 1])
+
+def preview(value: Any, limit: int = 300) -> str:
+    """JSON-like rendering of ``value``, cut off after ``limit`` characters.
+
+    Walks the value and stops as soon as the budget is spent, so previewing a
+    large tool result costs O(limit) instead of stringifying all of it.
+    """
+    out = _Budget(limit)
+    _write(value, out)
+    text = "".join(out.parts)
+    return text + ELLIPSIS if out.truncated else text
@@ -0,0 +1,129 @@
+from __future__ import annotations
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from host.types import ToolSpec
+
+def estimate_size(result: Any) -> int:
+    """Approximate bytes held by a tools/call result, without serializing it.
+
+    MCP results carry their payload in content blocks (text, or base64
+    ``data``); ``structuredContent``, when present, repeats the same data.
+    Anything else is measured by its JSON size.
+    """
+    if isinstance(result, dict) and isinstance(result.get("content"), list):
+        size = 64
+        for block in result["content"]:
+            if isinstance(block, dict):
+                size += 32 + len(block.get("text") or block.get("data") or "")
+        return size * 2 if "structuredContent" in result else size
+    return len(json.dumps(result, separators=(",", ":"), default=str))
+
+class ResultCache:
+    """Tenant-scoped LRU + TTL cache of read-only tool results.
+
+    A tool is cacheable when it is read-only (MCP ``readOnlyHint``) and has a
+    TTL, taken from ``ttls`` (config, by tool_id) or the tool's
+    ``_meta.cache_ttl``. Any other tool is treated as a write: calling it drops
+    every cached result from the same server, and reads that were in flight
+    meanwhile are not stored. Memory is bounded by entry count and by the
+    estimated size of the stored results (see ``estimate_size``).
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        max_entries: int = 10_000,
+        max_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.ttls = dict(ttls or {})
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # key -> (server, expires_at monotonic, size, result)
+        self._entries: "OrderedDict[str, Tuple[str, float, int, Any]]" = OrderedDict()
+        self._by_server: Dict[str, Set[str]] = {}
+        self._generations: Dict[str, int] = {}  # bumped by every invalidation
+        self._bytes = 0
+
+    def ttl_for(self, tool: ToolSpec) -> Optional[float]:
+        """Seconds a result may be reused, or None when the tool is not cacheable."""
+        if not tool.read_only:
+            return None  # a config TTL never makes a write cacheable
+        return self.ttls.get(tool.tool_id, tool.cache_ttl)
+
+    @staticmethod
+    def make_key(tenant_id: str, tool_id: str, args: Dict[str, Any]) -> str:
+        canonical = json.dumps(args, sort_keys=True, separators=(",", ":"), default=str)
+        return f"{tenant_id}\x00{tool_id}\x00{canonical}"
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[1] < time.monotonic():
+            self._drop(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[3]
+
+    def generation(self, server_name: str) -> int:
+        return self._generations.get(server_name, 0)
+
+    def put(self, key: str, server_name: str, result: Any, ttl: float, generation: Optional[int] = None) -> None:
+        """Store ``result``; skipped if the server was invalidated since ``generation`` was read."""
+        if generation is not None and generation != self.generation(server_name):
+            return
+        size = estimate_size(result)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (server_name, time.monotonic() + ttl, size, result)
+        self._by_server.setdefault(server_name, set()).add(key)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+
+    def invalidate_server(self, server_name: str) -> int:
+        """Drop every cached result from ``server_name``; returns how many."""
+        self._generations[server_name] = self.generation(server_name) + 1
+        keys = self._by_server.pop(server_name, set())
+        for key in keys:
+            _, _, size, _ = self._entries.pop(key)
+            self._bytes -= size
+        if keys:
+            self.invalidations += 1
+        return len(keys)
+
+    def _drop(self, key: str) -> None:
+        server_name, _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+        keys = self._by_server.get(server_name)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_server[server_name]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_server.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
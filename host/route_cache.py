@@ -0,0 +1,123 @@
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WS = re.compile(r"\s+")
+_TRAILING = re.compile(r"[\s.!?]+$")
+
+def normalize_prompt(user_input: str) -> str:
+    """Canonical form of a request for cache lookups.
+
+    Unicode-normalizes, collapses whitespace and drops trailing punctuation.
+    Case is kept: cached args are replayed verbatim (e.g. ticket summaries).
+    """
+    text = unicodedata.normalize("NFKC", user_input)
+    text = _WS.sub(" ", text).strip()
+    return _TRAILING.sub("", text)
+
+class RouteCache:
+    """LRU + TTL cache of routing decisions.
+
+    Keys combine the normalized prompt with the fingerprint of the tenant's
+    catalog view (allowed tool set and schemas), so a policy or schema change
+    never replays a stale decision. Values are ``RouteDecision`` dumps.
+    Optionally persisted to ``path`` as JSON so restarts start warm.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl: Optional[float] = 3600.0,
+        path: Optional[str] = None,
+        autosave_every: int = 100,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.autosave_every = autosave_every
+        self.hits = 0
+        self.misses = 0
+        # key -> (expires_at wall-clock seconds or None, decision dict)
+        self._entries: "OrderedDict[str, Tuple[Optional[float], Dict[str, Any]]]" = OrderedDict()
+        self._unsaved = 0
+        if path:
+            self.load()
+
+    @staticmethod
+    def make_key(user_input: str, catalog_fingerprint: str) -> str:
+        raw = f"{catalog_fingerprint}\x00{normalize_prompt(user_input)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, decision = entry
+        if expires_at is not None and expires_at < time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return decision
+
+    def put(self, key: str, decision: Dict[str, Any]) -> None:
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        self._entries[key] = (expires_at, decision)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if self.path:
+            self._unsaved += 1
+            if self._unsaved >= self.autosave_every:
+                self.save()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def load(self) -> None:
+        """Load persisted entries, skipping expired ones."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable route cache {self.path}: {e}")
+            return
+        now = time.time()
+        for key, expires_at, decision in data.get("entries", []):
+            if expires_at is None or expires_at > now:
+                self._entries[key] = (expires_at, decision)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def save(self) -> None:
+        """Atomically write the cache to ``path`` (oldest entries first)."""
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        payload = {"entries": [[key, exp, decision] for key, (exp, decision) in self._entries.items()]}
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        self._unsaved = 0
@@ -0,0 +1,96 @@
+from __future__ import annotations
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Union
+
+from host.transports import TRANSPORTS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SERVERS: Dict[str, str] = {
+    "tickets": "http://127.0.0.1:8000",
+    "kb": "http://127.0.0.1:8001",
+}
+
+@dataclass(frozen=True)
+class OutlierConfig:
+    consecutive_failures: int = 3      # connection errors/timeouts in a row before ejecting a replica
+    base_ejection: float = 10.0        # seconds; doubles with each repeated ejection
+    max_ejection: float = 120.0
+    max_ejected_fraction: float = 0.5  # never eject more than this share of a server's replicas
+
+@dataclass(frozen=True)
+class ServerConfig:
+    name: str                          # logical server, the prefix of its tool ids
+    endpoints: List[str]               # replica base URLs serving the same tools
+    sticky: bool = False               # pin each tenant to one replica (stateful servers)
+    transport: str = "sse"             # sse, http (streamable HTTP) or inproc (endpoints are module:attribute)
+
+ServerEntry = Union[str, List[str], Dict[str, Any]]
+
+@dataclass
+class ServerRegistry:
+    """Logical MCP servers and their replica endpoints.
+
+    Loaded from a JSON file such as::
+
+        {
+          "servers": {
+            "kb": ["http://127.0.0.1:8001", "http://127.0.0.1:8011"],
+            "tickets": {"endpoints": ["http://127.0.0.1:8000"], "sticky": true, "transport": "http"},
+            "local_kb": {"endpoints": ["servers.kb_server:mcp"], "transport": "inproc"}
+          },
+          "outlier": {"consecutive_failures": 3, "base_ejection": 10}
+        }
+    """
+
+    servers: Dict[str, ServerConfig]
+    outlier: OutlierConfig = field(default_factory=OutlierConfig)
+
+    @classmethod
+    def from_mapping(cls, servers: Mapping[str, ServerEntry], outlier: Optional[Mapping[str, Any]] = None) -> "ServerRegistry":
+        """Build from ``{name: url | [urls] | {"endpoints": [...], "sticky": bool, "transport": str}}``."""
+        configs: Dict[str, ServerConfig] = {}
+        for name, entry in servers.items():
+            if isinstance(entry, ServerConfig):
+                config = entry
+            elif isinstance(entry, str):
+                config = ServerConfig(name, [entry])
+            elif isinstance(entry, list):
+                config = ServerConfig(name, list(entry))
+            elif isinstance(entry, dict):
+                config = ServerConfig(
+                    name,
+                    list(entry.get("endpoints", [])),
+                    bool(entry.get("sticky", False)),
+                    str(entry.get("transport", "sse")),
+                )
+            else:
+                raise ValueError(f"Server {name}: expected a URL, a list of URLs or an object, got {type(entry).__name__}")
+            if not config.endpoints:
+                raise ValueError(f"Server {name} has no endpoints")
+            if config.transport not in TRANSPORTS:
+                raise ValueError(f"Server {name}: unknown transport {config.transport!r}; expected one of {', '.join(TRANSPORTS)}")
+            configs[name] = config
+        return cls(servers=configs, outlier=OutlierConfig(**(outlier or {})))
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "ServerRegistry":
+        """Read ``path`` (default ``$MCP_SERVERS_CONFIG``); the demo servers if neither is set."""
+        path = path or os.getenv("MCP_SERVERS_CONFIG")
+        if not path:
+            return cls.from_mapping(DEFAULT_SERVERS)
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        registry = cls.from_mapping(data.get("servers", {}), data.get("outlier"))
+        replicas = sum(len(s.endpoints) for s in registry.servers.values())
+        logger.info(f"✓ Loaded {len(registry.servers)} servers ({replicas} replicas) from {path}")
+        return registry
+
+    def __iter__(self) -> Iterator[ServerConfig]:
+        return iter(self.servers.values())
+
+    def __len__(self) -> int:
+        return len(self.servers)
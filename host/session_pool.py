@@ -0,0 +1,290 @@
+from __future__ import annotations
+import asyncio
+import contextlib
+import hashlib
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Mapping, Optional, TypeVar, Union
+
+import httpx
+
+from host.mcp_client import FastMCPClient, SessionExpiredError
+from host.server_registry import ServerEntry, ServerRegistry
+from host.types import ToolEvent
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Failures that say the replica is unhealthy; MCP errors and tool errors are answers
+_REPLICA_FAILURES = (ConnectionError, httpx.HTTPError)
+
+@dataclass
+class PoolConfig:
+    idle_timeout: float = 300.0          # close sessions unused for this long
+    health_check_interval: float = 30.0  # ping sessions idle for this long
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 60.0
+
+@dataclass
+class _Slot:
+    session: FastMCPClient
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)  # serializes reconnects
+    last_used: float = 0.0
+    reconnects: int = 0
+    outstanding: int = 0        # pool operations currently running on this replica
+    failures: int = 0           # consecutive replica failures
+    ejections: int = 0          # consecutive ejections, for the backoff
+    ejected_until: float = 0.0
+
+class MCPSessionPool:
+    """Keeps one warm MCP session per server replica across orchestrator invokes.
+
+    All sessions share a single keep-alive ``httpx.AsyncClient``. Sessions are
+    opened lazily, pinged in the background when idle, evicted after
+    ``idle_timeout`` and transparently re-established when the server drops them.
+
+    Servers come from a ``ServerRegistry`` (``MCP_SERVERS_CONFIG``, or the demo
+    servers). Calls to a server with several replicas go to the replica with
+    the fewest outstanding requests. Replicas that fail repeatedly with
+    connection errors or timeouts are ejected for a backoff period. Sticky
+    servers pin each ``key`` (the tenant) to one replica by rendezvous hashing.
+    Each server's ``transport`` (SSE, streamable HTTP or in-process) comes
+    from its config.
+    """
+
+    def __init__(
+        self,
+        servers: Union[ServerRegistry, Mapping[str, ServerEntry], None] = None,
+        config: Optional[PoolConfig] = None,
+    ):
+        self.config = config or PoolConfig()
+        if isinstance(servers, ServerRegistry):
+            self.registry = servers
+        else:
+            self.registry = ServerRegistry.from_mapping(servers) if servers else ServerRegistry.load()
+        self._replicas: Dict[str, List[_Slot]] = {
+            server.name: [_Slot(session=FastMCPClient(url, transport=server.transport)) for url in server.endpoints]
+            for server in self.registry
+        }
+        self._http: Optional[httpx.AsyncClient] = None
+        self._maintenance_task: Optional[asyncio.Task] = None
+
+    @property
+    def sessions(self) -> Dict[str, List[FastMCPClient]]:
+        """Every replica's session, per logical server."""
+        return {name: [slot.session for slot in slots] for name, slots in self._replicas.items()}
+
+    def server_names(self) -> List[str]:
+        return list(self._replicas)
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=60.0,
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections,
+                    max_keepalive_connections=self.config.max_keepalive_connections,
+                    keepalive_expiry=self.config.keepalive_expiry,
+                ),
+            )
+        if self._maintenance_task is None or self._maintenance_task.done():
+            self._maintenance_task = asyncio.create_task(self._maintain())
+        return self._http
+
+    def _pick(self, server_name: str, key: Optional[str] = None, exclude: Optional[_Slot] = None) -> _Slot:
+        """Choose a replica: sticky by ``key`` if the server needs it, else least outstanding."""
+        slots = self._replicas[server_name]
+        if len(slots) == 1:
+            return slots[0]
+        now = time.monotonic()
+        candidates = (
+            [s for s in slots if s.ejected_until <= now and s is not exclude]
+            or [s for s in slots if s is not exclude]
+            or slots
+        )
+        if key is not None and self.registry.servers[server_name].sticky:
+            # Rendezvous hashing: only the keys of an ejected replica move elsewhere
+            return max(candidates, key=lambda s: _affinity(key, s.session.base_url))
+        fewest = min(s.outstanding for s in candidates)
+        return random.choice([s for s in candidates if s.outstanding == fewest])
+
+    def _record(self, server_name: str, slot: _Slot, ok: bool) -> None:
+        now = time.monotonic()
+        if ok:
+            slot.failures = 0
+            if slot.ejections and slot.ejected_until <= now:
+                slot.ejections = 0
+            return
+        slot.failures += 1
+        outlier = self.registry.outlier
+        if slot.failures < outlier.consecutive_failures or slot.ejected_until > now:
+            return
+        slots = self._replicas[server_name]
+        ejected = sum(1 for s in slots if s.ejected_until > now)
+        if ejected + 1 > outlier.max_ejected_fraction * len(slots):
+            return
+        duration = min(outlier.base_ejection * 2 ** slot.ejections, outlier.max_ejection)
+        slot.ejected_until = now + duration
+        slot.ejections += 1
+        slot.failures = 0
+        logger.warning(f"⚠ Ejecting {server_name} replica {slot.session.base_url} for {duration:.0f}s")
+
+    async def _run_on(self, server_name: str, slot: _Slot, op: Callable[[FastMCPClient, httpx.AsyncClient], Awaitable[T]]) -> T:
+        client = self._client()
+        slot.outstanding += 1
+        slot.last_used = time.monotonic()
+        try:
+            result = await op(slot.session, client)
+        except _REPLICA_FAILURES:
+            self._record(server_name, slot, ok=False)
+            raise
+        finally:
+            slot.outstanding -= 1
+            slot.last_used = time.monotonic()
+        self._record(server_name, slot, ok=True)
+        return result
+
+    async def run(
+        self,
+        server_name: str,
+        op: Callable[[FastMCPClient, httpx.AsyncClient], Awaitable[T]],
+        key: Optional[str] = None,
+    ) -> T:
+        """Run ``op`` against a warm session of one of the server's replicas.
+
+        Requests are multiplexed on the session, so concurrent callers do not
+        wait for each other; the slot lock only serializes reconnects. If the
+        session expired the request was never processed, so it is retried once,
+        on another healthy replica when there is one (same replica if sticky).
+        """
+        slot = self._pick(server_name, key)
+        try:
+            return await self._run_on(server_name, slot, op)
+        except SessionExpiredError as e:
+            await self._expire(server_name, slot, e)
+            retry = self._retry_slot(server_name, slot, key)
+            if retry is slot and e.session_id is None:
+                raise  # could not even connect; trying the same endpoint again will not help
+            return await self._run_on(server_name, retry, op)
+
+    def _retry_slot(self, server_name: str, slot: _Slot, key: Optional[str]) -> _Slot:
+        if self.registry.servers[server_name].sticky and slot.ejected_until <= time.monotonic():
+            return slot
+        return self._pick(server_name, key, exclude=slot)
+
+    async def _expire(self, server_name: str, slot: _Slot, e: SessionExpiredError) -> None:
+        async with slot.lock:
+            if e.session_id is not None and slot.session.session_id == e.session_id:
+                logger.warning(f"  Session to {server_name} ({slot.session.base_url}) expired ({e}); reconnecting")
+                await slot.session.close()
+                slot.reconnects += 1
+
+    async def list_tools(self, server_name: str) -> List[Dict[str, Any]]:
+        return await self.run(server_name, lambda s, c: s.list_tools(c))
+
+    async def call_tool(self, server_name: str, tool_name: str, arguments: Dict[str, Any], key: Optional[str] = None) -> Any:
+        return await self.run(server_name, lambda s, c: s.call_tool(c, tool_name, arguments), key)
+
+    async def _stream_on(self, server_name: str, slot: _Slot, tool_name: str, arguments: Dict[str, Any]) -> AsyncIterator[ToolEvent]:
+        client = self._client()
+        slot.outstanding += 1
+        slot.last_used = time.monotonic()
+        try:
+            # aclosing: a caller that stops early must cancel the call on the session
+            async with contextlib.aclosing(slot.session.stream_tool(client, tool_name, arguments)) as events:
+                async for event in events:
+                    yield event
+        except _REPLICA_FAILURES:
+            self._record(server_name, slot, ok=False)
+            raise
+        else:
+            self._record(server_name, slot, ok=True)
+        finally:
+            slot.outstanding -= 1
+            slot.last_used = time.monotonic()
+
+    async def stream_tool(
+        self, server_name: str, tool_name: str, arguments: Dict[str, Any], key: Optional[str] = None
+    ) -> AsyncIterator[ToolEvent]:
+        """Streaming ``call_tool``; retried on an expired session only before the first event."""
+        slot = self._pick(server_name, key)
+        started = False
+        try:
+            async with contextlib.aclosing(self._stream_on(server_name, slot, tool_name, arguments)) as events:
+                async for event in events:
+                    started = True
+                    yield event
+        except SessionExpiredError as e:
+            if started:
+                raise
+            await self._expire(server_name, slot, e)
+            retry = self._retry_slot(server_name, slot, key)
+            if retry is slot and e.session_id is None:
+                raise
+            async with contextlib.aclosing(self._stream_on(server_name, retry, tool_name, arguments)) as events:
+                async for event in events:
+                    yield event
+
+    def replica_stats(self) -> List[Dict[str, Any]]:
+        """Load and health of every replica, for /health and metrics."""
+        now = time.monotonic()
+        return [
+            {
+                "server": name,
+                "endpoint": slot.session.base_url,
+                "outstanding": slot.outstanding,
+                "in_flight": slot.session.in_flight,
+                "connected": slot.session.is_connected,
+                "ejected": slot.ejected_until > now,
+                "reconnects": slot.reconnects,
+            }
+            for name, slots in self._replicas.items()
+            for slot in slots
+        ]
+
+    async def _maintain(self) -> None:
+        """Evict idle sessions and ping the ones we keep."""
+        interval = min(self.config.health_check_interval, self.config.idle_timeout)
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for name, slots in self._replicas.items():
+                for slot in slots:
+                    session = slot.session
+                    if session.in_flight or not session.is_connected:
+                        continue
+                    idle = now - slot.last_used
+                    if idle >= self.config.idle_timeout:
+                        async with slot.lock:
+                            logger.info(f"  Evicting idle session to {name} ({session.base_url})")
+                            await session.close()
+                    elif idle >= self.config.health_check_interval:
+                        try:
+                            await session.ping(self._http)
+                        except Exception as e:
+                            logger.warning(f"  Health check failed for {name} ({session.base_url}): {e}")
+                            async with slot.lock:
+                                await session.close()
+
+    async def aclose(self) -> None:
+        """Close every session and the shared HTTP client."""
+        if self._maintenance_task:
+            self._maintenance_task.cancel()
+            try:
+                await self._maintenance_task
+            except asyncio.CancelledError:
+                pass
+            self._maintenance_task = None
+        for slots in self._replicas.values():
+            for slot in slots:
+                await slot.session.close()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+def _affinity(key: str, endpoint: str) -> int:
+    return int.from_bytes(hashlib.blake2b(f"{key}|{endpoint}".encode("utf-8"), digest_size=8).digest(), "big")
@@ -0,0 +1,69 @@
+from __future__ import annotations
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+@dataclass
+class _Flight:
+    task: asyncio.Task
+    waiters: int = 0
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one.
+
+    The first caller for a key starts the call as a task; callers that arrive
+    while it runs wait for the same result or exception. A waiter that is
+    cancelled only stops waiting: the call goes on for the others and is
+    cancelled when its last waiter goes away. Nothing is kept once the call
+    completes; repeats later on are the caches' job.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.calls = 0       # calls started
+        self.coalesced = 0   # callers served by a call already in flight
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Result of ``fn()``, shared with identical calls; the flag is True for a joined call."""
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if flight is None:
+            flight = self._flights[key] = _Flight(asyncio.ensure_future(fn()))
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        flight.waiters += 1
+        try:
+            # shield: cancelling this waiter must not cancel the shared call
+            return await asyncio.shield(flight.task), shared
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                # Nobody is left to use the result; later callers start afresh
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    @property
+    def ratio(self) -> float:
+        """Share of callers that joined a call instead of starting one."""
+        total = self.calls + self.coalesced
+        return self.coalesced / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": self.in_flight,
+            "ratio": round(self.ratio, 4),
+        }
@@ -0,0 +1,67 @@
+from __future__ import annotations
+from typing import List, Optional, Tuple
+
+SSEEvent = Tuple[str, bytes]  # (event name, data)
+
+class SSEParser:
+    """Incremental Server-Sent Events parser working on raw bytes.
+
+    ``feed`` takes chunks as they come off the socket and returns the events
+    they complete. The buffer is searched once per chunk for the last frame
+    boundary, complete frames are split off in one pass, and each ``data``
+    payload is handed on as bytes, ready for the JSON codec; nothing is decoded
+    to ``str`` line by line. The line ending (``\\r\\n`` or ``\\n``) is taken
+    from the stream's first line; comment lines such as ``: ping`` are skipped.
+    """
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._scanned = 0  # bytes already searched for a frame boundary
+        self._blank: Optional[bytes] = None
+
+    def feed(self, chunk: bytes) -> List[SSEEvent]:
+        buf = self._buf
+        buf += chunk
+        if self._blank is None:
+            newline = buf.find(b"\n")
+            if newline == -1:
+                return []
+            self._blank = b"\r\n\r\n" if newline and buf[newline - 1] == 0x0D else b"\n\n"
+        blank = self._blank
+
+        # Back up so a boundary split across chunks is still found
+        last = buf.rfind(blank, max(0, self._scanned - len(blank) + 1))
+        if last == -1:
+            self._scanned = len(buf)
+            return []
+        frames = bytes(buf[:last]).split(blank)
+        del buf[:last + len(blank)]
+        self._scanned = len(buf)
+
+        events: List[SSEEvent] = []
+        for frame in frames:
+            event = self._parse_frame(frame)
+            if event is not None:
+                events.append(event)
+        return events
+
+    @staticmethod
+    def _parse_frame(frame: bytes) -> Optional[SSEEvent]:
+        # Fast path for what MCP servers send: "event: <name>" then a single data line
+        if frame.startswith(b"event: "):
+            head, _, rest = frame.partition(b"\n")
+            if rest.startswith(b"data: ") and b"\n" not in rest:
+                return head[7:].rstrip(b"\r").decode("utf-8"), rest[6:]
+
+        name = "message"
+        data: List[bytes] = []
+        for line in frame.split(b"\n"):
+            if line.endswith(b"\r"):
+                line = line[:-1]
+            if line.startswith(b"data:"):
+                data.append(line[6:] if line.startswith(b"data: ") else line[5:])
+            elif line.startswith(b"event:"):
+                name = line[6:].decode("utf-8").strip()
+        if not data:
+            return None
+        return name, data[0] if len(data) == 1 else b"\n".join(data)
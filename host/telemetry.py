@@ -0,0 +1,160 @@
+from __future__ import annotations
+import contextlib
+import contextvars
+import dataclasses
+import logging
+import os
+import time
+from typing import Any, Iterator, List, Optional
+
+from host.metrics import REGISTRY
+from host.types import StageTiming
+
+logger = logging.getLogger(__name__)
+
+try:
+    from opentelemetry import trace as _otel_trace
+except ImportError:  # optional: spans are still timed and exported as metrics
+    _otel_trace = None
+
+STAGE_SECONDS = REGISTRY.histogram("mcp_stage_duration_seconds", "Orchestration stage latency.", ["stage"])
+TOOL_CALL_SECONDS = REGISTRY.histogram(
+    "mcp_tool_call_duration_seconds", "Tool call latency (cache hits included).", ["tool", "server", "tenant"]
+)
+TOOL_CALLS = REGISTRY.counter(
+    "mcp_tool_calls_total", "Tool calls by outcome (ok, error, cache_hit, coalesced).", ["tool", "server", "tenant", "outcome"]
+)
+TOOL_CALLS_IN_FLIGHT = REGISTRY.gauge("mcp_tool_calls_in_flight", "Tool calls currently awaiting a server.", ["server"])
+INVOCATIONS = REGISTRY.counter("mcp_invocations_total", "Orchestrator invokes by outcome.", ["tenant", "outcome"])
+INVOKE_SECONDS = REGISTRY.histogram("mcp_invoke_duration_seconds", "End-to-end invoke latency.", ["tenant"])
+ARGUMENT_REJECTIONS = REGISTRY.counter(
+    "mcp_argument_rejections_total", "Planned calls whose args failed local validation.", ["tool", "source"]
+)
+BATCH_ITEMS = REGISTRY.counter(
+    "mcp_batch_items_total", "invoke_many items by outcome (ok, denied, unavailable, error, duplicate).", ["tenant", "outcome"]
+)
+ADMISSION_QUEUE_DEPTH = REGISTRY.gauge("mcp_admission_queue_depth", "Invokes waiting for admission.", ["tenant"])
+ADMISSION_RUNNING = REGISTRY.gauge("mcp_admission_running", "Admitted invokes currently running.", ["tenant"])
+ADMISSION_WAIT_SECONDS = REGISTRY.histogram("mcp_admission_wait_seconds", "Time spent in the admission queue.", ["tenant"])
+ADMISSION_REJECTIONS = REGISTRY.counter(
+    "mcp_admission_rejections_total", "Invokes rejected by admission control.", ["tenant", "reason"]
+)
+
+class StageRecorder:
+    """Collects the spans of one invoke; offsets are relative to its start."""
+
+    def __init__(self, origin: Optional[float] = None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.stages: List[StageTiming] = []
+        self.closed = False
+
+    def add(self, name: str, start: float, duration: float, detail: Optional[str]) -> None:
+        if self.closed:
+            return  # e.g. a background catalog refresh outliving the invoke
+        self.stages.append(StageTiming(
+            name=name,
+            started_ms=round((start - self.origin) * 1000, 3),
+            duration_ms=round(duration * 1000, 3),
+            detail=detail,
+        ))
+
+    def extend(self, other: StageRecorder) -> None:
+        """Copy another recorder's stages onto this timeline, e.g. the routing shared by a batch."""
+        shift_ms = (other.origin - self.origin) * 1000
+        for stage in other.stages:
+            self.stages.append(dataclasses.replace(stage, started_ms=round(stage.started_ms + shift_ms, 3)))
+
+_recorder: contextvars.ContextVar[Optional[StageRecorder]] = contextvars.ContextVar("stage_recorder", default=None)
+
+@contextlib.contextmanager
+def recording(origin: Optional[float] = None) -> Iterator[StageRecorder]:
+    """Record every ``span`` entered in this context (and tasks it spawns).
+
+    Offsets are relative to ``origin`` (a ``time.perf_counter()`` value), or to now.
+    """
+    recorder = StageRecorder(origin)
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        recorder.closed = True
+        _recorder.reset(token)
+
+@contextlib.contextmanager
+def span(stage: str, detail: Optional[str] = None, **attributes: Any) -> Iterator[None]:
+    """Time one stage into the current recorder, the stage histogram and OpenTelemetry."""
+    start = time.perf_counter()
+    otel = (
+        _otel_trace.get_tracer("mcp-orchestrator").start_as_current_span(
+            f"mcp.{stage}", attributes={k: str(v) for k, v in attributes.items()}
+        )
+        if _otel_trace is not None else contextlib.nullcontext()
+    )
+    with otel:
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            STAGE_SECONDS.observe(duration, stage=stage)
+            recorder = _recorder.get()
+            if recorder is not None:
+                recorder.add(stage, start, duration, detail)
+
+def configure_otel(service_name: str = "mcp-orchestrator") -> bool:
+    """Export spans over OTLP/HTTP when ``OTEL_EXPORTER_OTLP_ENDPOINT`` is set.
+
+    Needs ``opentelemetry-sdk`` and ``opentelemetry-exporter-otlp-proto-http``;
+    returns False (spans stay no-ops) when they or the endpoint are missing.
+    """
+    if not os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        return False
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("⚠ OTEL_EXPORTER_OTLP_ENDPOINT is set but opentelemetry-sdk/exporter are not installed")
+        return False
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    _otel_trace.set_tracer_provider(provider)
+    logger.info(f"✓ Exporting OpenTelemetry spans to {os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT')}")
+    return True
+
+def orchestrator_collector(orch: Any):
+    """Scrape-time samples for an orchestrator's caches, routing and sessions."""
+
+    def collect():
+        cache = orch.router.cache if getattr(orch.router, "cache", None) is not None else None
+        if cache is not None:
+            yield ("mcp_route_cache_hits_total", "counter", "Route cache hits.", {}, cache.hits)
+            yield ("mcp_route_cache_misses_total", "counter", "Route cache misses.", {}, cache.misses)
+        result_cache = orch.result_cache
+        yield ("mcp_result_cache_hits_total", "counter", "Tool result cache hits.", {}, result_cache.hits)
+        yield ("mcp_result_cache_misses_total", "counter", "Tool result cache misses.", {}, result_cache.misses)
+        yield ("mcp_result_cache_bytes", "gauge", "Bytes held by the tool result cache.", {}, result_cache.stats()["bytes"])
+        yield ("mcp_fast_path_hits_total", "counter", "Requests routed by the fast path.", {}, orch.routing_stats.fast_path_hits)
+        yield ("mcp_router_calls_total", "counter", "Requests routed by the LLM router.", {}, orch.routing_stats.router_calls)
+        flights = (({"kind": "routing"}, orch.route_flights), ({"kind": "tool_call"}, orch.tool_flights))
+        for kind, flight in flights:
+            yield ("mcp_coalesced_calls_total", "counter", "Callers that joined an identical call in flight.", kind, flight.coalesced)
+        for kind, flight in flights:
+            yield ("mcp_coalescing_leader_calls_total", "counter", "Calls started rather than joined.", kind, flight.calls)
+        for kind, flight in flights:
+            yield ("mcp_coalescing_ratio", "gauge", "Share of callers served by a call already in flight.", kind, flight.ratio)
+        # One loop per metric: the text format needs each family's samples together
+        replicas = [
+            ({"server": replica["server"], "endpoint": replica["endpoint"]}, replica)
+            for replica in orch.pool.replica_stats()
+        ]
+        for labels, replica in replicas:
+            yield ("mcp_session_requests_in_flight", "gauge", "JSON-RPC requests awaiting a response.", labels, replica["in_flight"])
+        for labels, replica in replicas:
+            yield ("mcp_session_connected", "gauge", "1 if the SSE session is open.", labels, int(replica["connected"]))
+        for labels, replica in replicas:
+            yield ("mcp_replica_outstanding", "gauge", "Pool operations running on the replica.", labels, replica["outstanding"])
+        for labels, replica in replicas:
+            yield ("mcp_replica_ejected", "gauge", "1 while the replica is ejected as an outlier.", labels, int(replica["ejected"]))
+
+    return collect
@@ -1,23 +1,32 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, Set
+from typing import Dict, Optional, Set
 
 @dataclass(frozen=True)
 class TenantLimits:
     max_calls_per_request: int = 2
+    shortlist_k: Optional[int] = None  # tools sent to the LLM router; None sends the whole allowed catalog
+    # Admission control (host/admission.py)
+    rate_per_sec: Optional[float] = None    # token-bucket refill rate; None disables rate limiting
+    burst: int = 10                         # bucket capacity
+    max_concurrent: Optional[int] = None    # running invokes; more wait in the tenant's queue
+    max_queued: int = 100                   # queued invokes; more are rejected with a retry-after
+    queue_timeout: Optional[float] = 30.0   # seconds a request may wait in the queue
+    weight: float = 1.0                     # share of contended capacity under fair queuing
 
 @dataclass(frozen=True)
 class TenantPolicy:
     allowed_tools: Set[str]
     limits: TenantLimits
 
+# Demo tenants: no rate limits (set rate_per_sec to opt in), so local runs and benchmarks are not throttled
 TENANTS: Dict[str, TenantPolicy] = {
     "acme": TenantPolicy(
         allowed_tools={"tickets.tickets_search", "kb.kb_query"},
-        limits=TenantLimits(max_calls_per_request=2),
+        limits=TenantLimits(max_calls_per_request=2, max_concurrent=8),
     ),
     "globex": TenantPolicy(
         allowed_tools={"tickets.tickets_search", "tickets.tickets_create", "kb.kb_query"},
-        limits=TenantLimits(max_calls_per_request=2),
+        limits=TenantLimits(max_calls_per_request=2, max_concurrent=16, weight=2.0),
     ),
 }
\ No newline at end of file
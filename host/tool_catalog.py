@@ -0,0 +1,222 @@
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional
+
+from host.arg_validation import ArgsValidator
+from host.session_pool import MCPSessionPool
+from host.tenant_policy import TENANTS, TenantPolicy
+from host.types import ToolSpec
+
+logger = logging.getLogger(__name__)
+
+LIST_CHANGED = "notifications/tools/list_changed"
+
+@dataclass
+class _TenantView:
+    version: int
+    tools: List[ToolSpec]
+    fingerprint: str
+
+def catalog_fingerprint(tools: List[ToolSpec]) -> str:
+    """Stable hash of tool ids, descriptions and schemas."""
+    payload = json.dumps(
+        [[t.tool_id, t.description, t.input_schema] for t in tools],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+@dataclass
+class _ServerCatalog:
+    tools: List[ToolSpec]
+    fetched_at: float
+    valid: bool = True
+
+class ToolCatalog:
+    """Per-server cache of ``tools/list`` results with per-tenant filtered views.
+
+    Entries older than ``ttl`` seconds are served while a background refresh
+    runs (stale-while-revalidate). A ``notifications/tools/list_changed`` from a
+    server invalidates its entry and starts a refresh immediately; callers only
+    wait on the network when a server has no usable entry at all.
+
+    Missing servers are fetched concurrently, each bounded by
+    ``discovery_timeout``. With ``allow_partial`` the catalog is served from the
+    servers that answered and the rest are reported by ``unavailable()``;
+    servers that just failed are skipped for ``failure_backoff`` seconds.
+    """
+
+    def __init__(
+        self,
+        pool: MCPSessionPool,
+        ttl: Optional[float] = 300.0,
+        tenants: Mapping[str, TenantPolicy] = TENANTS,
+        discovery_timeout: float = 5.0,
+        allow_partial: bool = True,
+        failure_backoff: float = 5.0,
+    ):
+        self.pool = pool
+        self.ttl = ttl
+        self.tenants = tenants
+        self.discovery_timeout = discovery_timeout
+        self.allow_partial = allow_partial
+        self.failure_backoff = failure_backoff
+        self.version = 0
+        self._entries: Dict[str, _ServerCatalog] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._failed_at: Dict[str, float] = {}
+        self._all: List[ToolSpec] = []
+        self._views: Dict[str, _TenantView] = {}
+        self._validators: Dict[str, ArgsValidator] = {}  # tool_id -> validator for this version
+
+        for server_name, replicas in pool.sessions.items():
+            for session in replicas:
+                session.add_notification_handler(self._make_handler(server_name))
+
+    def _make_handler(self, server_name: str):
+        def on_message(message: Dict[str, Any]) -> None:
+            if message.get("method") == LIST_CHANGED:
+                logger.info(f"  Tool list changed on {server_name}; refreshing catalog")
+                self.invalidate(server_name)
+                self._start_refresh(server_name)
+        return on_message
+
+    def invalidate(self, server_name: Optional[str] = None) -> None:
+        """Force the next lookup to wait for fresh ``tools/list`` results."""
+        names = [server_name] if server_name else list(self._entries)
+        for name in names:
+            entry = self._entries.get(name)
+            if entry is not None:
+                entry.valid = False
+
+    async def _fetch(self, server_name: str) -> List[ToolSpec]:
+        logger.info(f"Discovering tools from {server_name}...")
+        try:
+            server_tools = await self.pool.list_tools(server_name)
+        except Exception as e:
+            logger.error(f"  ✗ Failed to discover tools from {server_name}: {e}")
+            endpoints = ", ".join(session.base_url for session in self.pool.sessions[server_name])
+            raise ConnectionError(f"Cannot connect to {server_name} server at {endpoints}. Is it running?") from e
+        logger.info(f"  ✓ Found {len(server_tools)} tools from {server_name}")
+
+        return [
+            ToolSpec(
+                tool_id=f"{server_name}.{tool['name']}",
+                description=tool.get('description', ''),
+                input_schema=tool.get('inputSchema', {"type": "object", "properties": {}}),
+                read_only=bool((tool.get('annotations') or {}).get('readOnlyHint')),
+                cache_ttl=(tool.get('_meta') or {}).get('cache_ttl'),
+            )
+            for tool in server_tools
+        ]
+
+    async def _refresh(self, server_name: str) -> None:
+        try:
+            try:
+                tools = await self._fetch(server_name)
+            except Exception:
+                self._failed_at[server_name] = time.monotonic()
+                raise
+            self._failed_at.pop(server_name, None)
+            previous = self._entries.get(server_name)
+            self._entries[server_name] = _ServerCatalog(tools=tools, fetched_at=time.monotonic())
+            if previous is None or previous.tools != tools:
+                self._rebuild()
+        finally:
+            self._refreshing.pop(server_name, None)
+
+    def _start_refresh(self, server_name: str) -> asyncio.Task:
+        task = self._refreshing.get(server_name)
+        if task is None:
+            task = asyncio.create_task(self._refresh(server_name))
+            # Background refreshes may fail unobserved; the next lookup retries
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._refreshing[server_name] = task
+        return task
+
+    def _rebuild(self) -> None:
+        """Recompute the merged catalog and the precomputed tenant views."""
+        self.version += 1
+        self._validators = {}
+        self._all = [
+            tool
+            for name in self.pool.server_names() if name in self._entries
+            for tool in self._entries[name].tools
+        ]
+        self._views = {
+            tenant_id: self._make_view(policy)
+            for tenant_id, policy in self.tenants.items()
+        }
+
+    def _make_view(self, policy: TenantPolicy) -> _TenantView:
+        tools = [t for t in self._all if t.tool_id in policy.allowed_tools]
+        return _TenantView(version=self.version, tools=tools, fingerprint=catalog_fingerprint(tools))
+
+    def unavailable(self) -> List[str]:
+        """Servers whose tools are missing from the catalog because discovery failed."""
+        return [name for name in self.pool.server_names() if name not in self._entries]
+
+    async def tools(self) -> List[ToolSpec]:
+        """The merged catalog across all servers, refreshing only what is missing or stale."""
+        now = time.monotonic()
+        waits: Dict[asyncio.Task, str] = {}
+        for server_name in self.pool.server_names():
+            entry = self._entries.get(server_name)
+            if entry is None or not entry.valid:
+                failed_at = self._failed_at.get(server_name)
+                if entry is None and self.allow_partial and failed_at is not None and now - failed_at < self.failure_backoff:
+                    continue
+                waits[self._start_refresh(server_name)] = server_name
+            elif self.ttl is not None and now - entry.fetched_at > self.ttl:
+                self._start_refresh(server_name)
+
+        if waits:
+            # Fan out: total latency is the slowest server, capped by the deadline.
+            # Timed-out refreshes keep running and land in the cache when they finish.
+            done, pending = await asyncio.wait(list(waits), timeout=self.discovery_timeout)
+            for task in done:
+                error = task.exception() if not task.cancelled() else asyncio.CancelledError()
+                if error is not None and not self.allow_partial:
+                    raise error
+            for task in pending:
+                logger.warning(f"  ✗ Discovery from {waits[task]} exceeded {self.discovery_timeout}s")
+                if not self.allow_partial:
+                    raise ConnectionError(f"Timeout discovering tools from {waits[task]}")
+
+        missing = self.unavailable()
+        if missing and len(missing) == len(self.pool.server_names()):
+            raise ConnectionError(f"Cannot discover tools from any server: {', '.join(missing)}. Are they running?")
+        return self._all
+
+    def _view(self, tenant_id: str, policy: TenantPolicy) -> _TenantView:
+        view = self._views.get(tenant_id)
+        if view is None or view.version != self.version:
+            view = self._make_view(policy)
+            self._views[tenant_id] = view
+        return view
+
+    async def tools_for(self, tenant_id: str, policy: TenantPolicy) -> List[ToolSpec]:
+        """The catalog filtered to the tenant's allowlist."""
+        await self.tools()
+        return self._view(tenant_id, policy).tools
+
+    def fingerprint(self, tenant_id: str, policy: TenantPolicy) -> str:
+        """Hash of the tenant's current view: its allowed tool set and their schemas."""
+        return self._view(tenant_id, policy).fingerprint
+
+    def validator(self, tool: ToolSpec) -> ArgsValidator:
+        """The tool's compiled argument validator, built once per catalog version."""
+        validator = self._validators.get(tool.tool_id)
+        if validator is None or validator.schema is not tool.input_schema:
+            validator = self._validators[tool.tool_id] = ArgsValidator(tool.tool_id, tool.input_schema)
+        return validator
+
+    async def aclose(self) -> None:
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        self._refreshing.clear()
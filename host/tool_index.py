@@ -0,0 +1,91 @@
+from __future__ import annotations
+import heapq
+import math
+import re
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional
+
+from host.types import ToolSpec
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens; snake_case and dotted ids split apart, plurals folded."""
+    tokens = []
+    for tok in _TOKEN.findall(text.lower()):
+        if len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss"):
+            tok = tok[:-1]
+        tokens.append(tok)
+    return tokens
+
+def _tool_text(tool: ToolSpec) -> str:
+    parts = [tool.tool_id.replace("_", " ").replace(".", " "), tool.description]
+    for name, prop in tool.input_schema.get("properties", {}).items():
+        parts.append(name.replace("_", " "))
+        if isinstance(prop, dict) and isinstance(prop.get("description"), str):
+            parts.append(prop["description"])
+    return " ".join(parts)
+
+class ToolIndex:
+    """BM25 index over tool ids, descriptions and schema property names."""
+
+    def __init__(self, tools: List[ToolSpec], k1: float = 1.2, b: float = 0.75):
+        self.tools = tools
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, List[tuple]] = {}  # term -> [(tool index, term frequency)]
+        self._lengths: List[int] = []
+        for i, tool in enumerate(tools):
+            terms = tokenize(_tool_text(tool))
+            self._lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                self._postings.setdefault(term, []).append((i, tf))
+        n = len(tools)
+        self._avg_len = (sum(self._lengths) / n) if n else 0.0
+        self._idf = {
+            term: math.log(1 + (n - len(post) + 0.5) / (len(post) + 0.5))
+            for term, post in self._postings.items()
+        }
+
+    def search(self, query: str, k: int) -> List[ToolSpec]:
+        """Top-``k`` tools for ``query``; unmatched slots keep catalog order."""
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            post = self._postings.get(term)
+            if not post:
+                continue
+            idf = self._idf[term]
+            for i, tf in post:
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[i] / self._avg_len)
+                scores[i] = scores.get(i, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        picked = [i for i, _ in best]
+        if len(picked) < k:
+            chosen = set(picked)
+            picked.extend(i for i in range(len(self.tools)) if i not in chosen)
+            picked = picked[:k]
+        return [self.tools[i] for i in picked]
+
+class ToolShortlister:
+    """Keeps one ``ToolIndex`` per catalog view and shortlists tools per request."""
+
+    def __init__(self, max_indexes: int = 64):
+        self.max_indexes = max_indexes
+        self._indexes: "OrderedDict[str, ToolIndex]" = OrderedDict()
+
+    def index_for(self, fingerprint: str, tools: List[ToolSpec]) -> ToolIndex:
+        index = self._indexes.get(fingerprint)
+        if index is None:
+            index = ToolIndex(tools)
+            self._indexes[fingerprint] = index
+            while len(self._indexes) > self.max_indexes:
+                self._indexes.popitem(last=False)
+        else:
+            self._indexes.move_to_end(fingerprint)
+        return index
+
+    def shortlist(self, fingerprint: str, tools: List[ToolSpec], user_input: str, k: Optional[int]) -> List[ToolSpec]:
+        if k is None or len(tools) <= k:
+            return tools
+        return self.index_for(fingerprint, tools).search(user_input, k)
@@ -0,0 +1,378 @@
+from __future__ import annotations
+import abc
+import asyncio
+import importlib
+import logging
+from typing import Any, Callable, Dict, Optional, Set, Union
+from urllib.parse import urlsplit
+
+import httpx
+
+from host.codec import JSONCodec
+from host.sse import SSEParser
+
+logger = logging.getLogger(__name__)
+
+# Everything the server sends: responses and notifications
+MessageHandler = Callable[[Dict[str, Any]], None]
+# (error, request id): that request failed, or the whole session when the id is None
+ErrorHandler = Callable[[BaseException, Optional[str]], None]
+
+TRANSPORTS = ("sse", "http", "inproc")
+
+class SessionExpiredError(ConnectionError):
+    """The server no longer knows our session; the request was not processed."""
+
+    def __init__(self, message: str, session_id: Optional[str] = None):
+        super().__init__(message)
+        self.session_id = session_id
+
+class Transport(abc.ABC):
+    """Carries JSON-RPC messages between a ``FastMCPClient`` and one server.
+
+    ``open`` starts a session. Whatever the server sends back is handed to
+    ``on_message``, and ``on_error`` reports requests (or the whole session)
+    that will get no answer. ``send`` returns once the server accepted the
+    message, not when it answers. It raises ``SessionExpiredError`` when the
+    message was certainly not delivered, so callers may retry elsewhere.
+    """
+
+    name = ""
+    protocol_version = "2024-11-05"
+
+    def __init__(self, endpoint: str, codec: JSONCodec):
+        self.endpoint = endpoint
+        self.codec = codec
+        self.session_id: Optional[str] = None
+
+    @property
+    @abc.abstractmethod
+    def is_open(self) -> bool:
+        ...
+
+    @abc.abstractmethod
+    async def open(self, client: httpx.AsyncClient, on_message: MessageHandler, on_error: ErrorHandler) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def send(self, client: httpx.AsyncClient, message: Dict[str, Any], timeout: float) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def close(self) -> None:
+        ...
+
+class SSETransport(Transport):
+    """MCP's HTTP+SSE transport: one GET stream for all server messages and a POST per client message."""
+
+    name = "sse"
+    _JSON_HEADERS = {"content-type": "application/json"}
+
+    def __init__(self, endpoint: str, codec: JSONCodec):
+        super().__init__(endpoint, codec)
+        self.messages_endpoint: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._endpoint: Optional[asyncio.Future] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def open(self, client: httpx.AsyncClient, on_message: MessageHandler, on_error: ErrorHandler) -> None:
+        logger.info("  Starting SSE connection to %s...", self.endpoint)
+        self._endpoint = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._listen(client, on_message, on_error))
+        try:
+            await asyncio.wait_for(self._endpoint, timeout=5.0)
+        except asyncio.TimeoutError:
+            raise ConnectionError(f"Timeout waiting for endpoint from {self.endpoint}")
+
+    async def _listen(self, client: httpx.AsyncClient, on_message: MessageHandler, on_error: ErrorHandler) -> None:
+        """Read the SSE stream: the messages endpoint first, then JSON-RPC messages."""
+        parser = SSEParser()
+        try:
+            async with client.stream("GET", f"{self.endpoint}/sse", timeout=None) as response:
+                response.raise_for_status()
+
+                async for chunk in response.aiter_bytes():
+                    for event, data in parser.feed(chunk):
+                        if event == "endpoint":
+                            path = data.decode("utf-8").strip()
+                            self.messages_endpoint = f"{self.endpoint}{path}"
+                            self.session_id = path.split("session_id=")[1]
+                            logger.info("  Got session: %s", self.session_id)
+                            if self._endpoint is not None and not self._endpoint.done():
+                                self._endpoint.set_result(path)
+                            continue
+                        try:
+                            message = self.codec.loads(data)
+                        except ValueError:
+                            logger.warning("  Could not parse SSE data: %.200r", data)
+                            continue
+                        on_message(message)
+            error = ConnectionError(f"SSE stream from {self.endpoint} closed")
+        except Exception as e:
+            logger.error("  SSE listener error: %s", e)
+            error = ConnectionError(f"SSE stream from {self.endpoint} failed: {e}")
+        if self._endpoint is not None and not self._endpoint.done():
+            self._endpoint.set_exception(error)
+        on_error(error, None)
+
+    async def send(self, client: httpx.AsyncClient, message: Dict[str, Any], timeout: float) -> None:
+        try:
+            response = await client.post(
+                self.messages_endpoint,
+                content=self.codec.dumps(message),
+                headers=self._JSON_HEADERS,
+                timeout=timeout,
+            )
+        except httpx.ConnectError as e:
+            raise SessionExpiredError(f"Cannot reach {self.endpoint}: {e}", self.session_id) from e
+        if response.status_code == 404:
+            # Server restarted or dropped our session
+            raise SessionExpiredError(f"Session {self.session_id} expired on {self.endpoint}", self.session_id)
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._endpoint is not None and not self._endpoint.done():
+            self._endpoint.cancel()
+        self._task = None
+        self._endpoint = None
+        self.messages_endpoint = None
+        self.session_id = None
+
+class StreamableHTTPTransport(Transport):
+    """MCP's streamable HTTP transport: every message is a POST to one endpoint, answered on the same exchange.
+
+    A call costs one HTTP exchange on a kept-alive connection. The answer is
+    a JSON body, or a short SSE stream carrying the call's progress
+    notifications before its response. The session is the ``mcp-session-id``
+    header of the initialize response. The optional GET stream for
+    notifications outside a request is not opened, so ``tools/list_changed``
+    is not heard and the catalog relies on its TTL.
+    """
+
+    name = "http"
+    protocol_version = "2025-03-26"
+
+    def __init__(self, endpoint: str, codec: JSONCodec):
+        super().__init__(endpoint, codec)
+        # A bare base URL means FastMCP's default path
+        self.url = endpoint if urlsplit(endpoint).path not in ("", "/") else f"{endpoint.rstrip('/')}/mcp"
+        self._headers = {
+            "content-type": "application/json",
+            "accept": "application/json, text/event-stream",
+            "mcp-protocol-version": self.protocol_version,
+        }
+        self._client: Optional[httpx.AsyncClient] = None
+        self._on_message: Optional[MessageHandler] = None
+        self._on_error: Optional[ErrorHandler] = None
+        self._streams: Set[asyncio.Task] = set()
+
+    @property
+    def is_open(self) -> bool:
+        return self._on_message is not None
+
+    async def open(self, client: httpx.AsyncClient, on_message: MessageHandler, on_error: ErrorHandler) -> None:
+        # Nothing to connect: the initialize POST creates the session
+        self._client = client
+        self._on_message = on_message
+        self._on_error = on_error
+
+    async def send(self, client: httpx.AsyncClient, message: Dict[str, Any], timeout: float) -> None:
+        if self._on_message is None:
+            raise SessionExpiredError(f"No open session to {self.endpoint}", self.session_id)
+        headers = self._headers
+        if self.session_id is not None:
+            headers = {**headers, "mcp-session-id": self.session_id}
+        request = client.build_request("POST", self.url, content=self.codec.dumps(message), headers=headers, timeout=timeout)
+        try:
+            response = await client.send(request, stream=True)
+        except httpx.ConnectError as e:
+            raise SessionExpiredError(f"Cannot reach {self.endpoint}: {e}", self.session_id) from e
+
+        streaming = False
+        try:
+            if response.status_code == 404 and self.session_id is not None:
+                raise SessionExpiredError(f"Session {self.session_id} expired on {self.endpoint}", self.session_id)
+            response.raise_for_status()
+            self.session_id = response.headers.get("mcp-session-id", self.session_id)
+            request_id = message.get("id")
+            if request_id is None or response.status_code == 202:
+                return
+            if response.headers.get("content-type", "").startswith("text/event-stream"):
+                # Read on in the background, like the SSE transport's GET stream
+                task = asyncio.create_task(self._read_stream(response, str(request_id)))
+                self._streams.add(task)
+                task.add_done_callback(self._streams.discard)
+                streaming = True
+                return
+            self._deliver(self.codec.loads(await response.aread()))
+        finally:
+            if not streaming:
+                await response.aclose()
+
+    def _deliver(self, payload: Any) -> None:
+        if self._on_message is None:
+            return
+        for message in payload if isinstance(payload, list) else [payload]:
+            self._on_message(message)
+
+    async def _read_stream(self, response: httpx.Response, request_id: str) -> None:
+        parser = SSEParser()
+        error: BaseException = ConnectionError(f"Response stream from {self.endpoint} ended without a response")
+        try:
+            async for chunk in response.aiter_bytes():
+                for event, data in parser.feed(chunk):
+                    if event != "message":
+                        continue
+                    try:
+                        self._deliver(self.codec.loads(data))
+                    except ValueError:
+                        logger.warning("  Could not parse SSE data: %.200r", data)
+        except Exception as e:
+            error = ConnectionError(f"Response stream from {self.endpoint} failed: {e}")
+        finally:
+            await response.aclose()
+        if self._on_error is not None:
+            # A no-op when the response already arrived
+            self._on_error(error, request_id)
+
+    async def close(self) -> None:
+        for task in list(self._streams):
+            task.cancel()
+        self._streams.clear()
+        if self._client is not None and self.session_id is not None:
+            try:
+                # Let the server drop the session now rather than on its idle timeout
+                await self._client.delete(self.url, headers={"mcp-session-id": self.session_id}, timeout=2.0)
+            except (httpx.HTTPError, RuntimeError) as e:
+                logger.debug("  Could not end session %s: %s", self.session_id, e)
+        self._client = None
+        self._on_message = None
+        self._on_error = None
+        self.session_id = None
+
+class InProcessTransport(Transport):
+    """Calls a ``FastMCP`` server object in this process; nothing goes over a socket or through JSON.
+
+    ``endpoint`` is ``module:attribute`` (``servers.kb_server:mcp``), or the
+    server object itself. Requests are answered by the server's
+    ``list_tools``/``call_tool`` on the host's event loop, so a CPU-heavy
+    tool holds up everything else. Tool errors, unknown tools and invalid
+    arguments become ``isError`` results, as over the wire. Tools get no
+    progress token and the host hears no ``tools/list_changed``.
+    """
+
+    name = "inproc"
+    protocol_version = "2025-03-26"
+
+    def __init__(self, endpoint: Union[str, Any], codec: JSONCodec):
+        if isinstance(endpoint, str):
+            super().__init__(endpoint, codec)
+            self._server: Any = None
+        else:
+            super().__init__(f"inproc://{getattr(endpoint, 'name', 'server')}", codec)
+            self._server = endpoint
+        self._on_message: Optional[MessageHandler] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def is_open(self) -> bool:
+        return self._on_message is not None
+
+    def _load(self) -> Any:
+        module_name, _, attribute = self.endpoint.removeprefix("inproc://").partition(":")
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError as e:
+            raise ConnectionError(f"Cannot import MCP server module {module_name}: {e}") from e
+        server = getattr(module, attribute or "mcp", None)
+        if server is None:
+            raise ConnectionError(f"{module_name} has no MCP server named {attribute or 'mcp'}")
+        return server
+
+    async def open(self, client: httpx.AsyncClient, on_message: MessageHandler, on_error: ErrorHandler) -> None:
+        if self._server is None:
+            self._server = self._load()
+        self._on_message = on_message
+
+    async def send(self, client: httpx.AsyncClient, message: Dict[str, Any], timeout: float) -> None:
+        if self._on_message is None:
+            raise SessionExpiredError(f"No open session to {self.endpoint}")
+        request_id = message.get("id")
+        if request_id is None:
+            if message.get("method") == "notifications/cancelled":
+                task = self._tasks.get(str((message.get("params") or {}).get("requestId")))
+                if task is not None:
+                    task.cancel()
+            return
+        # Answered asynchronously, like a server would, so timeouts and cancellation behave the same
+        key = str(request_id)
+        task = asyncio.create_task(self._answer(request_id, message.get("method"), message.get("params") or {}))
+        self._tasks[key] = task
+        task.add_done_callback(lambda _: self._tasks.pop(key, None))
+
+    async def _answer(self, request_id: Any, method: Optional[str], params: Dict[str, Any]) -> None:
+        response: Dict[str, Any] = {"jsonrpc": "2.0", "id": request_id}
+        try:
+            response["result"] = await self._handle(method, params)
+        except LookupError:
+            response["error"] = {"code": -32601, "message": f"Method not found: {method}"}
+        except Exception as e:
+            response["error"] = {"code": -32603, "message": str(e)}
+        if self._on_message is not None:
+            self._on_message(response)
+
+    async def _handle(self, method: Optional[str], params: Dict[str, Any]) -> Dict[str, Any]:
+        if method == "tools/call":
+            return await self._call_tool(params.get("name", ""), params.get("arguments") or {})
+        if method == "tools/list":
+            tools = await self._server.list_tools()
+            return {"tools": [tool.to_mcp_tool().model_dump(by_alias=True, exclude_none=True, mode="json") for tool in tools]}
+        if method == "ping":
+            return {}
+        if method == "initialize":
+            return {
+                "protocolVersion": self.protocol_version,
+                "capabilities": {"tools": {}},
+                "serverInfo": {"name": getattr(self._server, "name", ""), "version": "in-process"},
+            }
+        raise LookupError(method)
+
+    async def _call_tool(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            result = await self._server.call_tool(name, arguments)
+        except Exception as e:
+            return {"content": [{"type": "text", "text": str(e)}], "isError": True}
+        answer: Dict[str, Any] = {
+            "content": [block.model_dump(by_alias=True, exclude_none=True, mode="json") for block in result.content],
+            "isError": result.is_error,
+        }
+        if result.structured_content is not None:
+            answer["structuredContent"] = result.structured_content
+        if result.meta:
+            answer["_meta"] = result.meta
+        return answer
+
+    async def close(self) -> None:
+        for task in list(self._tasks.values()):
+            task.cancel()
+        self._tasks.clear()
+        self._on_message = None
+
+def make_transport(kind: str, endpoint: Union[str, Any], codec: JSONCodec) -> Transport:
+    """Transport ``kind`` (one of ``TRANSPORTS``) to ``endpoint``."""
+    if kind == "sse":
+        return SSETransport(endpoint, codec)
+    if kind == "http":
+        return StreamableHTTPTransport(endpoint, codec)
+    if kind == "inproc":
+        return InProcessTransport(endpoint, codec)
+    raise ValueError(f"Unknown transport {kind!r}; expected one of {', '.join(TRANSPORTS)}")
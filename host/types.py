@@ -1,12 +1,14 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Optional
 
 @dataclass(frozen=True)
 class ToolSpec:
     tool_id: str          # e.g. "tickets.tickets_search"
     description: str
     input_schema: Dict[str, Any]
+    read_only: bool = False             # MCP annotations.readOnlyHint
+    cache_ttl: Optional[float] = None   # seconds results may be reused, from the tool's _meta
 
 @dataclass
 class ToolCallTrace:
@@ -14,4 +16,29 @@ class ToolCallTrace:
     args: Dict[str, Any]
     ok: bool
     error: Optional[str]
-    result_preview: str
\ No newline at end of file
+    result_preview: str
+    started_ms: float = 0.0   # offset from the start of the plan's execution
+    duration_ms: float = 0.0
+    cache_hit: bool = False
+    coalesced: bool = False   # joined an identical call already in flight
+
+@dataclass
+class RoutingTrace:
+    source: str               # "fast_path" or "router"
+    duration_ms: float
+    saved_ms: float           # estimate vs. the router's moving-average latency
+    fast_path_hit_rate: float
+    coalesced: bool = False   # joined an identical routing call already in flight
+    batch_size: int = 1       # requests planned by the same router call (invoke_many)
+
+@dataclass
+class StageTiming:
+    name: str                 # admission, connect, initialize, discovery, routing, repair, policy, tool_call
+    started_ms: float         # offset from the start of the invoke
+    duration_ms: float
+    detail: Optional[str] = None  # server URL or tool_id
+
+@dataclass
+class ToolEvent:
+    kind: str                 # "progress", "content" (one content block) or "result" (last)
+    data: Any                 # progress params, the content block, or the full tools/call result
@@ -0,0 +1,175 @@
+from __future__ import annotations
+import heapq
+import itertools
+import math
+import re
+from bisect import bisect_left
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Protocol, Sequence, Set, Tuple
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase whole-word tokens, so "cat" never matches "calibration"."""
+    return _TOKEN.findall(text.lower())
+
+def doc_terms(doc: Dict[str, Any]) -> List[str]:
+    return tokenize(f'{doc.get("title", "")} {doc.get("body", "")}')
+
+class Segment(Protocol):
+    """A searchable slice of the corpus (in-memory index or on-disk store)."""
+
+    lengths: Sequence[int]   # slot -> token count
+    deleted: Set[int]        # tombstoned slots
+
+    @property
+    def live_count(self) -> int: ...
+
+    @property
+    def total_length(self) -> int: ...
+
+    def df(self, term: str) -> int: ...
+
+    def postings(self, term: str) -> Optional[Tuple[Sequence[int], Sequence[int]]]: ...
+
+    def doc(self, slot: int) -> Dict[str, Any]: ...
+
+def search_segments(segments: Sequence[Segment], query: str, k: int, k1: float = 1.2, b: float = 0.75) -> List[Tuple[float, Dict[str, Any]]]:
+    """Top-``k`` (score, doc) pairs with a positive BM25 score, best first.
+
+    Corpus statistics (document count, average length, document frequency)
+    are global across segments. Terms are scored rarest first (MaxScore).
+    Once the remaining terms' upper bounds cannot lift a new document past the
+    current k-th score, common terms only update surviving candidates via
+    bisect instead of walking their whole postings list.
+    """
+    n = sum(seg.live_count for seg in segments)
+    total_length = sum(seg.total_length for seg in segments)
+    if n == 0 or k <= 0:
+        return []
+    c1 = k1 * (1 - b)
+    c2 = k1 * b * n / total_length if total_length else 0.0
+
+    terms = []
+    for term in set(tokenize(query)):
+        df = sum(seg.df(term) for seg in segments)
+        if df:
+            terms.append((math.log(1 + (n - df + 0.5) / (df + 0.5)), term))
+    terms.sort(reverse=True)
+    # remaining[i]: best possible score still obtainable from terms i..end
+    remaining = list(itertools.accumulate((idf * (k1 + 1) for idf, _ in reversed(terms))))[::-1]
+
+    # One score table per segment, keyed by slot
+    scores: List[Dict[int, float]] = [{} for _ in segments]
+    for i, (idf, term) in enumerate(terms):
+        candidates = sum(len(s) for s in scores)
+        threshold = heapq.nlargest(k, itertools.chain.from_iterable(s.values() for s in scores))[-1] if candidates >= k else 0.0
+        pruning = candidates >= k and remaining[i] <= threshold
+        for seg, seg_scores in zip(segments, scores):
+            post = seg.postings(term)
+            if post is None:
+                continue
+            slots, tfs = post
+            lengths = seg.lengths
+            if pruning:
+                # No unseen document can reach the top k any more
+                for slot in [s for s, score in seg_scores.items() if score + remaining[i] <= threshold]:
+                    del seg_scores[slot]
+                size = len(slots)
+                for slot in seg_scores:
+                    j = bisect_left(slots, slot)
+                    if j < size and slots[j] == slot:
+                        tf = tfs[j]
+                        seg_scores[slot] += idf * tf * (k1 + 1) / (tf + c1 + c2 * lengths[slot])
+                continue
+            deleted = seg.deleted
+            for slot, tf in zip(slots, tfs):
+                if slot in deleted:
+                    continue
+                seg_scores[slot] = seg_scores.get(slot, 0.0) + idf * tf * (k1 + 1) / (tf + c1 + c2 * lengths[slot])
+
+    ranked = (
+        (score, seg_no, slot)
+        for seg_no, seg_scores in enumerate(scores)
+        for slot, score in seg_scores.items()
+    )
+    best = heapq.nlargest(k, ranked, key=lambda item: item[0])
+    return [(score, segments[seg_no].doc(slot)) for score, seg_no, slot in best if score > 0]
+
+class KBIndex:
+    """In-memory inverted index with BM25 ranking over title + body.
+
+    Postings are compact ``array`` pairs (doc slot, term frequency). Adding a
+    document with an existing id replaces it: the old slot is tombstoned and
+    skipped at query time, so updates never rebuild the index.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._docs: List[Dict[str, Any]] = []         # slot -> document
+        self.lengths = array("I")                     # slot -> token count
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._df: Dict[str, int] = {}                 # live documents per term
+        self._slot_by_id: Dict[str, int] = {}
+        self.deleted: Set[int] = set()
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._slot_by_id)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._slot_by_id
+
+    @property
+    def live_count(self) -> int:
+        return len(self._slot_by_id)
+
+    @property
+    def total_length(self) -> int:
+        return self._total_length
+
+    def df(self, term: str) -> int:
+        return self._df.get(term, 0)
+
+    def postings(self, term: str) -> Optional[Tuple[array, array]]:
+        return self._postings.get(term)
+
+    def doc(self, slot: int) -> Dict[str, Any]:
+        return self._docs[slot]
+
+    def add(self, doc: Dict[str, Any]) -> None:
+        """Index one document (``id``, ``title``, ``body``), replacing any previous version."""
+        self.remove(doc["id"])
+        slot = len(self._docs)
+        terms = doc_terms(doc)
+        self._docs.append(doc)
+        self.lengths.append(len(terms))
+        self._slot_by_id[doc["id"]] = slot
+        self._total_length += len(terms)
+        for term, tf in Counter(terms).items():
+            self._df[term] = self._df.get(term, 0) + 1
+            post = self._postings.get(term)
+            if post is None:
+                post = self._postings[term] = (array("I"), array("I"))
+            post[0].append(slot)
+            post[1].append(tf)
+
+    def add_many(self, docs: Iterable[Dict[str, Any]]) -> None:
+        for doc in docs:
+            self.add(doc)
+
+    def remove(self, doc_id: str) -> bool:
+        slot = self._slot_by_id.pop(doc_id, None)
+        if slot is None:
+            return False
+        self.deleted.add(slot)
+        self._total_length -= self.lengths[slot]
+        for term in set(doc_terms(self._docs[slot])):
+            self._df[term] -= 1
+        return True
+
+    def search(self, query: str, k: int) -> List[Tuple[float, Dict[str, Any]]]:
+        """Top-``k`` (score, doc) pairs with a positive BM25 score, best first."""
+        return search_segments([self], query, k, self.k1, self.b)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import Any
 import json
+import os
 from fastmcp import FastMCP
 
 # In-memory demo data
@@ -10,27 +11,45 @@ _DOCS = [
     {"id": "KB-3", "title": "Sensor Calibration Procedure", "body": "Use reference probe, run calibration routine, confirm offsets."},
 ]
 
+try:
+    from servers.kb_index import KBIndex, search_segments
+    from servers.kb_store import KBStore
+except ImportError:  # run as a script: python servers/kb_server.py
+    from kb_index import KBIndex, search_segments
+    from kb_store import KBStore
+
+# KB_STORE_DIR points at a corpus built with `python -m servers.kb_store build`;
+# without it the demo documents above are served from memory.
+_STORE_DIR = os.getenv("KB_STORE_DIR")
+_STORE = KBStore(_STORE_DIR) if _STORE_DIR else None
+
+# Documents added at runtime (and the demo docs) live in an in-memory segment
+_INDEX = KBIndex()
+if _STORE is None:
+    _INDEX.add_many(_DOCS)
+_SEGMENTS = [seg for seg in (_STORE, _INDEX) if seg is not None]
+
+def add_document(doc: dict[str, Any]) -> None:
+    """Add or replace a document; the index is updated incrementally."""
+    if _STORE is not None:
+        _STORE.remove(doc["id"])
+    _INDEX.add(doc)
+
 # Create FastMCP server
 mcp = FastMCP("kb")
 
-@mcp.tool()
+@mcp.tool(annotations={"readOnlyHint": True}, meta={"cache_ttl": 60})
 def kb_query(query: str, k: int = 3) -> dict[str, Any]:
-    """Return top-k docs by naive keyword scoring.
+    """Return top-k docs ranked by BM25 over title and body.
     
     Args:
         query: Search query
         k: Number of results to return (default: 3)
     """
-    q = query.lower().split()
-    scored = []
-    for d in _DOCS:
-        text = (d["title"] + " " + d["body"]).lower()
-        score = sum(1 for token in q if token in text)
-        scored.append((score, d))
-    scored.sort(key=lambda x: x[0], reverse=True)
-    hits = [d for s, d in scored[:k] if s > 0]
+    hits = [d for _, d in search_segments(_SEGMENTS, query, k)]
     return {"count": len(hits), "docs": hits}
 
 if __name__ == "__main__":
-    # Run with SSE transport on port 8001
-    mcp.run(transport="sse", port=8001)
\ No newline at end of file
+    # Run with SSE transport on port 8001 (KB_PORT overrides, e.g. for benchmark replicas);
+    # MCP_TRANSPORT=http serves streamable HTTP at /mcp instead
+    mcp.run(transport=os.getenv("MCP_TRANSPORT", "sse"), port=int(os.getenv("KB_PORT", "8001")))
\ No newline at end of file
@@ -0,0 +1,281 @@
+"""Compact on-disk KB corpus, memory-mapped at startup.
+
+Build once from JSONL (or Parquet, when pyarrow is installed)::
+
+    python -m servers.kb_store build corpus.jsonl [more.jsonl ...] --out kb_store/
+
+then point ``kb_server`` at it with ``KB_STORE_DIR=kb_store/``. Opening a store
+only maps files, so startup is near-instant, resident memory stays flat, and
+several server processes share the same OS page cache.
+
+Layout (native-endian ``I`` = uint32, ``Q`` = uint64)::
+
+    meta.json      document/term counts and total token length
+    docs.dat       JSON records, concatenated; docs.off Q[n+1] byte offsets
+    lengths.dat    I[n] token count per document slot
+    terms.dat      sorted UTF-8 terms, concatenated; terms.off Q[t+1]
+    terms.post     Q[t] byte offset of each term's postings in postings.dat
+    terms.df       I[t] document frequency per term
+    postings.dat   per term: I[df] doc slots (ascending) then I[df] term frequencies
+    ids.dat        sorted UTF-8 doc ids, concatenated; ids.off Q[n+1]; ids.slot I[n]
+"""
+from __future__ import annotations
+import argparse
+import json
+import mmap
+import os
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    from servers.kb_index import doc_terms
+except ImportError:  # run as a script next to kb_index.py
+    from kb_index import doc_terms
+
+FORMAT_VERSION = 1
+
+def _read_records(path: str) -> Iterator[Dict[str, Any]]:
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Reading Parquet corpora requires pyarrow") from e
+        for batch in pq.ParquetFile(path).iter_batches(columns=["id", "title", "body"]):
+            yield from batch.to_pylist()
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def _write_string_table(out_dir: str, name: str, keys: List[str]) -> None:
+    offsets = array("Q", [0])
+    with open(os.path.join(out_dir, f"{name}.dat"), "wb") as f:
+        for key in keys:
+            data = key.encode("utf-8")
+            f.write(data)
+            offsets.append(offsets[-1] + len(data))
+    with open(os.path.join(out_dir, f"{name}.off"), "wb") as f:
+        offsets.tofile(f)
+
+def build_store(paths: Iterable[str], out_dir: str) -> Dict[str, int]:
+    """Stream documents into ``out_dir``; later records replace earlier ones with the same id."""
+    os.makedirs(out_dir, exist_ok=True)
+    slot_by_id: Dict[str, int] = {}
+    superseded: Set[int] = set()
+    lengths = array("I")
+    postings: Dict[str, Tuple[array, array]] = {}
+    doc_offsets = array("Q", [0])
+
+    with open(os.path.join(out_dir, "docs.dat"), "wb") as docs_f:
+        for path in paths:
+            for doc in _read_records(path):
+                doc = {"id": str(doc["id"]), "title": doc.get("title") or "", "body": doc.get("body") or ""}
+                slot = len(lengths)
+                if doc["id"] in slot_by_id:
+                    superseded.add(slot_by_id[doc["id"]])
+                slot_by_id[doc["id"]] = slot
+                data = json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                docs_f.write(data)
+                doc_offsets.append(doc_offsets[-1] + len(data))
+                terms = doc_terms(doc)
+                lengths.append(len(terms))
+                for term, tf in Counter(terms).items():
+                    post = postings.get(term)
+                    if post is None:
+                        post = postings[term] = (array("I"), array("I"))
+                    post[0].append(slot)
+                    post[1].append(tf)
+
+    with open(os.path.join(out_dir, "docs.off"), "wb") as f:
+        doc_offsets.tofile(f)
+    if superseded:
+        # Superseded versions stay in docs.dat but drop out of every statistic
+        for slot in superseded:
+            lengths[slot] = 0
+    with open(os.path.join(out_dir, "lengths.dat"), "wb") as f:
+        lengths.tofile(f)
+
+    terms = sorted(postings)
+    post_offsets = array("Q")
+    dfs = array("I")
+    with open(os.path.join(out_dir, "postings.dat"), "wb") as f:
+        offset = 0
+        for term in terms:
+            slots, tfs = postings.pop(term)
+            if superseded:
+                keep = [i for i, slot in enumerate(slots) if slot not in superseded]
+                slots = array("I", (slots[i] for i in keep))
+                tfs = array("I", (tfs[i] for i in keep))
+            post_offsets.append(offset)
+            dfs.append(len(slots))
+            slots.tofile(f)
+            tfs.tofile(f)
+            offset += 8 * len(slots)
+    _write_string_table(out_dir, "terms", terms)
+    with open(os.path.join(out_dir, "terms.post"), "wb") as f:
+        post_offsets.tofile(f)
+    with open(os.path.join(out_dir, "terms.df"), "wb") as f:
+        dfs.tofile(f)
+
+    ids = sorted(slot_by_id)
+    _write_string_table(out_dir, "ids", ids)
+    with open(os.path.join(out_dir, "ids.slot"), "wb") as f:
+        array("I", (slot_by_id[i] for i in ids)).tofile(f)
+
+    meta = {
+        "version": FORMAT_VERSION,
+        "n_docs": len(slot_by_id),
+        "n_slots": len(lengths),
+        "n_terms": len(terms),
+        "total_length": sum(lengths),
+    }
+    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return meta
+
+class _Mapped:
+    """Read-only mmap of one file, viewable as a typed array."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.bytes = memoryview(self._map) if self._map is not None else memoryview(b"")
+
+    def typed(self, code: str) -> memoryview:
+        return self.bytes.cast(code) if len(self.bytes) else memoryview(array(code))
+
+    def close(self) -> None:
+        self.bytes.release()
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+class _StringTable:
+    """Sorted strings with binary-search lookup directly on the mapped bytes."""
+
+    def __init__(self, data: memoryview, offsets: memoryview):
+        self._data = data
+        self._offsets = offsets
+        self.size = len(offsets) - 1
+
+    def key(self, i: int) -> bytes:
+        return bytes(self._data[self._offsets[i]:self._offsets[i + 1]])
+
+    def find(self, key: str) -> int:
+        target = key.encode("utf-8")
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self.size and self.key(lo) == target else -1
+
+class KBStore:
+    """Memory-mapped, read-mostly corpus segment for ``search_segments``.
+
+    Postings, lengths and offsets are zero-copy views over the mapped files;
+    a document is only decoded from JSON when it lands in a result. Removing
+    a document (e.g. because a newer version was added in memory) tombstones
+    its slot without touching the files.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported KB store version {self.meta.get('version')} in {path}")
+
+        self._files = {
+            name: _Mapped(os.path.join(path, name))
+            for name in ("docs.dat", "docs.off", "lengths.dat", "terms.dat", "terms.off",
+                         "terms.post", "terms.df", "postings.dat", "ids.dat", "ids.off", "ids.slot")
+        }
+        f = self._files
+        self._docs = f["docs.dat"].bytes
+        self._doc_offsets = f["docs.off"].typed("Q")
+        self.lengths = f["lengths.dat"].typed("I")
+        self._terms = _StringTable(f["terms.dat"].bytes, f["terms.off"].typed("Q"))
+        self._term_post = f["terms.post"].typed("Q")
+        self._term_df = f["terms.df"].typed("I")
+        self._postings = f["postings.dat"].bytes
+        self._ids = _StringTable(f["ids.dat"].bytes, f["ids.off"].typed("Q"))
+        self._id_slots = f["ids.slot"].typed("I")
+
+        self.deleted: Set[int] = set()
+        self._removed_ids: Set[str] = set()
+        self._df_removed: Counter = Counter()
+        self._live = self.meta["n_docs"]
+        self._total_length = self.meta["total_length"]
+
+    def __len__(self) -> int:
+        return self._live
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id not in self._removed_ids and self._ids.find(doc_id) >= 0
+
+    @property
+    def live_count(self) -> int:
+        return self._live
+
+    @property
+    def total_length(self) -> int:
+        return self._total_length
+
+    def df(self, term: str) -> int:
+        i = self._terms.find(term)
+        return self._term_df[i] - self._df_removed[term] if i >= 0 else 0
+
+    def postings(self, term: str) -> Optional[Tuple[memoryview, memoryview]]:
+        i = self._terms.find(term)
+        if i < 0:
+            return None
+        start, df = self._term_post[i], self._term_df[i]
+        slots = self._postings[start:start + 4 * df].cast("I")
+        tfs = self._postings[start + 4 * df:start + 8 * df].cast("I")
+        return slots, tfs
+
+    def doc(self, slot: int) -> Dict[str, Any]:
+        return json.loads(bytes(self._docs[self._doc_offsets[slot]:self._doc_offsets[slot + 1]]))
+
+    def remove(self, doc_id: str) -> bool:
+        if doc_id in self._removed_ids:
+            return False
+        i = self._ids.find(doc_id)
+        if i < 0:
+            return False
+        slot = self._id_slots[i]
+        self._removed_ids.add(doc_id)
+        self.deleted.add(slot)
+        self._live -= 1
+        self._total_length -= self.lengths[slot]
+        self._df_removed.update(set(doc_terms(self.doc(slot))))
+        return True
+
+    def close(self) -> None:
+        # Views must be released before their mappings can close
+        for name in ("_docs", "_doc_offsets", "lengths", "_term_post", "_term_df", "_postings", "_id_slots"):
+            getattr(self, name).release()
+        for table in (self._terms, self._ids):
+            table._data.release()
+            table._offsets.release()
+        for mapped in self._files.values():
+            mapped.close()
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build a memory-mapped KB store from JSONL/Parquet files.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build")
+    build.add_argument("inputs", nargs="+", help="JSONL (or .parquet) files with id, title, body")
+    build.add_argument("--out", required=True, help="Output directory")
+    args = parser.parse_args(argv)
+    meta = build_store(args.inputs, args.out)
+    print(f"Wrote {meta['n_docs']} docs, {meta['n_terms']} terms to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Durable ticket log: append-only WAL with group commit and snapshots.
+
+Files in the data directory::
+
+    snapshot.jsonl   header line {"format", "seq"} then one ticket per line
+    wal.log          "<seq>\\t<ticket json>" per created ticket, fsynced in batches
+
+Sequence numbers are allocated in memory, in order, before a write is queued,
+so ids never collide between interleaved creates and never go backwards
+after a restart. A single writer thread drains everything queued since its
+last write and commits it with one ``fsync`` (group commit); callers await
+their record's batch. Every ``snapshot_every`` records the WAL is folded
+into the snapshot by copying lines, without re-encoding tickets.
+"""
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+SNAPSHOT = "snapshot.jsonl"
+WAL = "wal.log"
+
+_Pending = Tuple[int, str, "asyncio.Future[None]", asyncio.AbstractEventLoop]
+
+class TicketLog:
+    """Append-only ticket log in ``path``; replay it once at startup, then ``append``."""
+
+    def __init__(self, path: str, snapshot_every: int = 50_000, fsync: bool = True):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.seq = 0                  # last allocated sequence number
+        self.batches = 0
+        self.records = 0
+        self._snapshot_seq = 0
+        self._wal_records = 0
+        self._queue: "queue.Queue[Optional[_Pending]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._wal = None
+        os.makedirs(path, exist_ok=True)
+
+    def replay(self) -> Iterator[Dict[str, Any]]:
+        """Yield every committed ticket in sequence order and restore the allocator."""
+        snapshot_path = os.path.join(self.path, SNAPSHOT)
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                if header.get("format") != FORMAT_VERSION:
+                    raise ValueError(f"Unsupported ticket snapshot format {header.get('format')} in {self.path}")
+                self._snapshot_seq = self.seq = header["seq"]
+                for line in f:
+                    yield json.loads(line)
+
+        wal_path = os.path.join(self.path, WAL)
+        if not os.path.exists(wal_path):
+            return
+        with open(wal_path, "r+b") as f:
+            good = 0
+            for line in f:
+                seq_text, sep, data = line.partition(b"\t")
+                if not sep or not line.endswith(b"\n"):
+                    # Torn final write from a crash; it was never acknowledged
+                    logger.warning(f"Dropping incomplete WAL record in {wal_path}")
+                    f.truncate(good)
+                    break
+                good += len(line)
+                seq = int(seq_text)
+                if seq <= self._snapshot_seq:
+                    continue  # already folded into the snapshot
+                self._wal_records += 1
+                self.seq = max(self.seq, seq)
+                yield json.loads(data)
+
+    def write_snapshot(self, tickets: List[Dict[str, Any]]) -> None:
+        """Start a fresh log from ``tickets`` (used to seed an empty directory)."""
+        self._replace_snapshot([json.dumps(t, ensure_ascii=False) + "\n" for t in tickets], len(tickets))
+        self.seq = len(tickets)
+
+    def allocate(self) -> int:
+        """Next sequence number; call from the event loop thread."""
+        self.seq += 1
+        return self.seq
+
+    async def append(self, seq: int, record: Dict[str, Any]) -> None:
+        """Queue ``record`` and wait until its batch is durable on disk."""
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[None]" = loop.create_future()
+        line = f"{seq}\t{json.dumps(record, ensure_ascii=False)}\n"
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="ticket-log-writer", daemon=True)
+            self._writer.start()
+        self._queue.put((seq, line, future, loop))
+        await future
+
+    def _write_loop(self) -> None:
+        self._wal = open(os.path.join(self.path, WAL), "a", encoding="utf-8")
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)  # stop after committing this batch
+                    break
+                batch.append(item)
+
+            error: Optional[BaseException] = None
+            try:
+                self._wal.write("".join(line for _, line, _, _ in batch))
+                self._wal.flush()
+                if self.fsync:
+                    os.fsync(self._wal.fileno())
+            except OSError as e:
+                logger.error(f"✗ Ticket log write failed: {e}")
+                error = e
+            else:
+                self.batches += 1
+                self.records += len(batch)
+                self._wal_records += len(batch)
+
+            for _, _, future, loop in batch:
+                loop.call_soon_threadsafe(_resolve, future, error)
+
+            if error is None and self._wal_records >= self.snapshot_every:
+                try:
+                    self._compact(batch[-1][0])
+                except OSError as e:
+                    logger.error(f"✗ Ticket snapshot failed: {e}")
+        self._wal.close()
+        self._wal = None
+
+    def _compact(self, upto_seq: int) -> None:
+        """Fold the WAL into a new snapshot, then start an empty WAL."""
+        snapshot_path = os.path.join(self.path, SNAPSHOT)
+
+        def lines() -> Iterator[str]:
+            if os.path.exists(snapshot_path):
+                with open(snapshot_path, "r", encoding="utf-8") as f:
+                    f.readline()
+                    yield from f
+            with open(os.path.join(self.path, WAL), "r", encoding="utf-8") as f:
+                for line in f:
+                    seq_text, _, data = line.partition("\t")
+                    if int(seq_text) > self._snapshot_seq:
+                        yield data
+
+        self._replace_snapshot(lines(), upto_seq)
+        # Records up to upto_seq are in the snapshot; replay skips them if the
+        # WAL truncation below is lost in a crash
+        self._wal.truncate(0)
+        self._wal.seek(0)
+        self._wal_records = 0
+        logger.info(f"✓ Ticket snapshot written at seq {upto_seq}")
+
+    def _replace_snapshot(self, lines, seq: int) -> None:
+        snapshot_path = os.path.join(self.path, SNAPSHOT)
+        tmp_path = f"{snapshot_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"format": FORMAT_VERSION, "seq": seq}) + "\n")
+            f.writelines(lines)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, snapshot_path)
+        self._snapshot_seq = seq
+
+    def close(self) -> None:
+        """Commit anything queued and stop the writer thread."""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+
+def _resolve(future: "asyncio.Future[None]", error: Optional[BaseException]) -> None:
+    if future.done():
+        return  # the caller was cancelled; the record is still committed
+    if error is None:
+        future.set_result(None)
+    else:
+        future.set_exception(error)
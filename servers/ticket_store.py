@@ -0,0 +1,158 @@
+from __future__ import annotations
+import re
+from array import array
+from bisect import bisect_left, insort
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Shorter query tokens must match a word exactly; longer ones match anywhere in a word
+MIN_PREFIX = 3
+# Query token -> vocabulary words containing it; dropped whenever a new word is indexed
+_INFIX_CACHE_SIZE = 4096
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+def _ordinal(created_at: str) -> int:
+    return date.fromisoformat(created_at[:10]).toordinal()
+
+class TicketStore:
+    """In-memory tickets with dates parsed once and secondary indexes.
+
+    ``search`` answers the ``days`` window with a bisect over a sorted date
+    index and intersects per-term candidate sets built from exact indexes
+    (id, asset, status) and a token index over summaries and asset names,
+    so a query never touches tickets that cannot match. Substring matches
+    within words scan the vocabulary of distinct words, never the tickets.
+    """
+
+    def __init__(self, tickets: Iterable[Dict[str, Any]] = ()):
+        self._tickets: List[Dict[str, Any]] = []       # slot -> ticket
+        self._ordinals = array("i")                    # slot -> created_at as a date ordinal
+        self._dates = array("i")                       # sorted ordinals ...
+        self._date_slots = array("I")                  # ... and their slots
+        self._by_id: Dict[str, int] = {}
+        self._by_asset: Dict[str, array] = {}
+        self._by_status: Dict[str, array] = {}
+        self._tokens: Dict[str, array] = {}            # word -> ascending slots
+        self._vocab: List[str] = []                    # sorted words, for prefix lookups
+        self._infix: Dict[str, List[str]] = {}          # query token -> vocabulary words containing it
+        self.add_many(tickets)
+
+    def __len__(self) -> int:
+        return len(self._tickets)
+
+    def __contains__(self, ticket_id: str) -> bool:
+        return ticket_id.lower() in self._by_id
+
+    def get(self, ticket_id: str) -> Optional[Dict[str, Any]]:
+        slot = self._by_id.get(ticket_id.lower())
+        return self._tickets[slot] if slot is not None else None
+
+    def add(self, ticket: Dict[str, Any]) -> None:
+        """Index one ticket (``id``, ``asset``, ``status``, ``created_at``, ``summary``)."""
+        key = ticket["id"].lower()
+        if key in self._by_id:
+            raise ValueError(f"Duplicate ticket id {ticket['id']}")
+        slot = len(self._tickets)
+        ordinal = _ordinal(ticket["created_at"])
+        self._tickets.append(ticket)
+        self._ordinals.append(ordinal)
+        if not self._dates or ordinal >= self._dates[-1]:
+            self._dates.append(ordinal)
+            self._date_slots.append(slot)
+        else:
+            i = bisect_left(self._dates, ordinal + 1)
+            self._dates.insert(i, ordinal)
+            self._date_slots.insert(i, slot)
+
+        self._by_id[key] = slot
+        self._posting(self._by_asset, ticket["asset"].lower()).append(slot)
+        self._posting(self._by_status, ticket["status"].lower()).append(slot)
+        for word in set(tokenize(f'{ticket["asset"]} {ticket["summary"]}')):
+            post = self._tokens.get(word)
+            if post is None:
+                post = self._tokens[word] = array("I")
+                insort(self._vocab, word)
+                self._infix.clear()
+            post.append(slot)
+
+    def add_many(self, tickets: Iterable[Dict[str, Any]]) -> None:
+        for ticket in tickets:
+            self.add(ticket)
+
+    @staticmethod
+    def _posting(index: Dict[str, array], key: str) -> array:
+        post = index.get(key)
+        if post is None:
+            post = index[key] = array("I")
+        return post
+
+    def _word_slots(self, word: str) -> Set[int]:
+        if len(word) < MIN_PREFIX:
+            return set(self._tokens.get(word, ()))
+        matches = self._infix.get(word)
+        if matches is None:
+            # Substring of a word, as the old scan matched: "heat" finds "overheating"
+            if len(self._infix) >= _INFIX_CACHE_SIZE:
+                self._infix.clear()
+            matches = self._infix[word] = [w for w in self._vocab if word in w]
+        if len(matches) == 1:
+            return set(self._tokens[matches[0]])
+        slots: Set[int] = set()
+        for match in matches:
+            slots.update(self._tokens[match])
+        return slots
+
+    def _term_slots(self, term: str) -> Set[int]:
+        """Tickets matching one whitespace-separated query term: exact keys or summary/asset words."""
+        slots: Set[int] = set()
+        if term in self._by_id:
+            slots.add(self._by_id[term])
+        if term.isdigit() and f"t-{term}" in self._by_id:
+            slots.add(self._by_id[f"t-{term}"])
+        for index in (self._by_asset, self._by_status):
+            if term in index:
+                slots.update(index[term])
+        words = tokenize(term)
+        if words:
+            # Every word of the term must appear (within a word, from MIN_PREFIX chars)
+            groups = sorted((self._word_slots(w) for w in words), key=len)
+            matched = groups[0]
+            for other in groups[1:]:
+                matched = matched & other
+            slots |= matched
+        return slots
+
+    def search(self, query: str, since: date) -> List[Dict[str, Any]]:
+        """Tickets created on or after ``since`` that match every term of ``query``.
+
+        A term matches a ticket id (``T-1001`` or ``1001``), an asset, a status,
+        or words of the summary/asset (substring of a word from ``MIN_PREFIX``
+        chars, e.g. ``heat`` in "overheating"). Unlike the old scan, which
+        matched the whole query as one substring, terms are matched separately
+        and all must match, and ids must be given whole. An empty query returns
+        the whole window. Results keep insertion order.
+        """
+        cutoff = since.toordinal()
+        start = bisect_left(self._dates, cutoff)
+        window = len(self._dates) - start
+        terms = query.lower().split()
+        if not terms:
+            slots = sorted(self._date_slots[start:])
+            return [self._tickets[s] for s in slots]
+
+        candidates: Optional[Set[int]] = None
+        for term_slots in sorted((self._term_slots(t) for t in dict.fromkeys(terms)), key=len):
+            candidates = term_slots if candidates is None else candidates & term_slots
+            if not candidates:
+                return []
+
+        if len(candidates) <= window:
+            ordinals = self._ordinals
+            slots = sorted(s for s in candidates if ordinals[s] >= cutoff)
+        else:
+            slots = sorted(s for s in self._date_slots[start:] if s in candidates)
+        return [self._tickets[s] for s in slots]
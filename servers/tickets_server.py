@@ -2,60 +2,77 @@ from __future__ import annotations
 from datetime import datetime, timedelta
 from typing import Any
 import json
+import os
 from fastmcp import FastMCP
 
-# In-memory demo data
+# Demo data, seeded into an empty data directory
 _TICKETS = [
     {"id": "T-1001", "asset": "CVX-12", "status": "open", "created_at": "2026-01-15", "summary": "Overheating alarm"},
     {"id": "T-1002", "asset": "CVX-12", "status": "closed", "created_at": "2026-01-10", "summary": "Sensor calibration"},
     {"id": "T-1003", "asset": "QRT-9", "status": "open", "created_at": "2026-01-18", "summary": "Vibration anomaly"},
 ]
 
+try:
+    from servers.ticket_log import TicketLog
+    from servers.ticket_store import TicketStore
+except ImportError:  # run as a script: python servers/tickets_server.py
+    from ticket_log import TicketLog
+    from ticket_store import TicketStore
+
+# Tickets persist in TICKETS_DATA_DIR (default: data/tickets in the repo root)
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_DATA_DIR = os.getenv("TICKETS_DATA_DIR", os.path.join(_REPO_ROOT, "data", "tickets"))
+_LOG = TicketLog(_DATA_DIR)
+
+# Dates are parsed and fields indexed once, at insert time
+_STORE = TicketStore(_LOG.replay())
+if not len(_STORE):
+    _LOG.write_snapshot(_TICKETS)
+    _STORE.add_many(_TICKETS)
+
 # Create FastMCP server
 mcp = FastMCP("tickets")
 
-@mcp.tool()
+# readOnlyHint + _meta.cache_ttl let hosts cache results; creates invalidate them
+@mcp.tool(annotations={"readOnlyHint": True}, meta={"cache_ttl": 30})
 def tickets_search(query: str, days: int = 30) -> dict[str, Any]:
-    """Search tickets by naive keyword matching and a 'days' time window.
+    """Search tickets by id, asset, status or summary words within a 'days' time window.
+
+    Every whitespace-separated term must match: a whole ticket id, an asset, a
+    status, or part of a summary word (3+ chars, e.g. 'heat' finds 'overheating').
     
     Args:
         query: Search query
         days: Days to search back (default: 30)
     """
     cutoff = datetime.utcnow().date() - timedelta(days=days)
-    q = query.lower()
-
-    def keep(t: dict[str, Any]) -> bool:
-        created = datetime.strptime(t["created_at"], "%Y-%m-%d").date()
-        if created < cutoff:
-            return False
-        blob = f'{t["id"]} {t["asset"]} {t["status"]} {t["summary"]}'.lower()
-        return q in blob
-
-    hits = [t for t in _TICKETS if keep(t)]
+    hits = _STORE.search(query, cutoff)
     return {"count": len(hits), "tickets": hits}
 
-@mcp.tool()
-def tickets_create(asset: str, summary: str, priority: str = "medium") -> dict[str, Any]:
-    """Create a ticket (in-memory).
+@mcp.tool(annotations={"readOnlyHint": False})
+async def tickets_create(asset: str, summary: str, priority: str = "medium") -> dict[str, Any]:
+    """Create a ticket (persisted before it is returned).
     
     Args:
         asset: Asset ID
         summary: Ticket summary
         priority: Priority level (default: medium)
     """
-    new_id = f"T-{1000 + len(_TICKETS) + 1}"
+    # Allocated before any await, so concurrent creates never share an id
+    seq = _LOG.allocate()
     ticket = {
-        "id": new_id,
+        "id": f"T-{1000 + seq}",
         "asset": asset,
         "status": "open",
         "created_at": datetime.utcnow().date().isoformat(),
         "summary": summary,
         "priority": priority,
     }
-    _TICKETS.append(ticket)
+    await _LOG.append(seq, ticket)
+    _STORE.add(ticket)
     return {"created": True, "ticket": ticket}
 
 if __name__ == "__main__":
-    # Run with SSE transport on port 8000
-    mcp.run(transport="sse", port=8000)
\ No newline at end of file
+    # Run with SSE transport on port 8000 (TICKETS_PORT overrides, e.g. for benchmark replicas);
+    # MCP_TRANSPORT=http serves streamable HTTP at /mcp instead
+    mcp.run(transport=os.getenv("MCP_TRANSPORT", "sse"), port=int(os.getenv("TICKETS_PORT", "8000")))
\ No newline at end of file